@@ -0,0 +1,50 @@
+from functools import wraps
+
+from django.contrib import messages
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+from django.shortcuts import redirect
+
+from .models import UserProfile
+
+
+class ProfileModelBackend(ModelBackend):
+    """تحميل المستخدم مع ملفه الشخصي باستعلام واحد (JOIN) في كل طلب"""
+
+    def get_user(self, user_id):
+        try:
+            user = User._default_manager.select_related('userprofile').get(pk=user_id)
+        except User.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+
+def get_user_role(request):
+    """نوع المستخدم الحالي (admin, organizer, ...) أو None إن لم يكن له ملف شخصي
+
+    يُقرأ من الملف الشخصي المحمّل مع المستخدم (ProfileModelBackend) في كل طلب، فلا
+    استعلام إضافي، وتغيير الدور يسري فوراً في كل العمليات.
+    """
+    user = request.user
+    if not user.is_authenticated:
+        return None
+    try:
+        return user.userprofile.user_type
+    except UserProfile.DoesNotExist:
+        return None
+
+def role_required(*roles):
+    """السماح بالصفحة لأنواع المستخدمين المحددة فقط (يُستخدم بعد login_required)"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            role = get_user_role(request)
+            if role is None:
+                messages.error(request, 'يرجى تحديث الملف الشخصي')
+                return redirect('home')
+            if role not in roles:
+                messages.error(request, 'ليس لديك صلاحية للوصول إلى هذه الصفحة')
+                return redirect('home')
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,8 +1,13 @@
 from django.contrib import admin
 from .models import (
     UserProfile, Conference, Category, ConferenceRequest,
-    Rating, Attendance, SystemSetting, SyrianCity
+    Rating, Attendance, SystemSetting, SyrianCity, ExportJob, ConferenceRatingSummary,
+    NotificationDelivery
 )
+from .search import is_search_available, search_conference_ids
+
+# أقصى عدد لنتائج البحث في لوحة الإدارة
+ADMIN_SEARCH_MAX_RESULTS = 1000
 
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
@@ -15,6 +20,13 @@ class ConferenceAdmin(admin.ModelAdmin):
     list_display = ['title', 'organizer', 'category', 'start_date', 'status', 'city']
     list_filter = ['status', 'category', 'city', 'start_date']
     search_fields = ['title', 'description', 'location']
+    
+    def get_search_results(self, request, queryset, search_term):
+        """البحث عبر فهرس FTS5 مع التطبيع العربي بدلاً من LIKE على كل الصفوف"""
+        if not search_term or not is_search_available():
+            return super().get_search_results(request, queryset, search_term)
+        ids = search_conference_ids(search_term, within=queryset, limit=ADMIN_SEARCH_MAX_RESULTS)
+        return queryset.filter(id__in=ids), False
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -48,4 +60,22 @@ class SystemSettingAdmin(admin.ModelAdmin):
 class SyrianCityAdmin(admin.ModelAdmin):
     list_display = ['name', 'governorate']
     list_filter = ['governorate']
-    search_fields = ['name']
\ No newline at end of file
+    search_fields = ['name']
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ['report_type', 'format', 'status', 'requested_by', 'processed_rows', 'total_rows', 'created_at', 'expires_at']
+    list_filter = ['status', 'report_type', 'format']
+    readonly_fields = ['created_at', 'started_at', 'heartbeat_at', 'finished_at']
+
+@admin.register(ConferenceRatingSummary)
+class ConferenceRatingSummaryAdmin(admin.ModelAdmin):
+    list_display = ['conference', 'rating_count', 'average', 'updated_at']
+    readonly_fields = ['rating_count', 'rating_sum', 'stars_1', 'stars_2', 'stars_3', 'stars_4', 'stars_5', 'updated_at']
+
+@admin.register(NotificationDelivery)
+class NotificationDeliveryAdmin(admin.ModelAdmin):
+    list_display = ['notification', 'user', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status', 'notification__event']
+    raw_id_fields = ['notification', 'user']
+    readonly_fields = ['last_error', 'sent_at']
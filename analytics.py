@@ -0,0 +1,149 @@
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Attendance, Conference, ConferenceRatingSummary
+
+# مدة بقاء نتيجة كل مجموعة معاملات في الذاكرة (بالثواني)
+ANALYTICS_CACHE_TIMEOUT = getattr(settings, 'ANALYTICS_CACHE_TIMEOUT', 300)
+
+# الأبعاد المتاحة للتجميع (يمكن الجمع بين بعدين)
+ANALYTICS_DIMENSIONS = ['category', 'city', 'governorate', 'organizer', 'month']
+MAX_GROUP_BY = 2
+
+# الأبعاد التي تُجمع بالمعرف (الأسماء قد تتكرر) وتُعرض معه باسمها؛ البقية تُجمع بالقيمة نفسها
+DIMENSION_KEYS = {'category': 'category_id', 'city': 'city_id', 'organizer': 'organizer_id'}
+
+# اسم البعد للمؤتمرات دون تصنيف أو مدينة
+UNSPECIFIED = 'غير محدد'
+
+# أعمدة المؤتمرات: استعلام واحد بأعمدة مسطحة بدلاً من كائنات
+_CONFERENCE_COLUMNS = {
+    'id': 'id',
+    'category_id': 'category_id',
+    'category': 'category__name',
+    'city_id': 'city_id',
+    'city': 'city__name',
+    'governorate': 'city__governorate',
+    'organizer_id': 'organizer_id',
+    'organizer_username': 'organizer__user__username',
+    'organizer_first_name': 'organizer__user__first_name',
+    'organizer_last_name': 'organizer__user__last_name',
+    'start_date': 'start_date',
+    'current_attendees': 'current_attendees',
+    'max_attendees': 'max_attendees',
+}
+
+
+def analytics_cache_key(params):
+    digest = hashlib.md5(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+    return f'conference:analytics:{digest}'
+
+def _frame(queryset, columns):
+    return pd.DataFrame.from_records(list(queryset.values_list(*columns.values())), columns=list(columns))
+
+def load_conference_frame(status=None, start=None, end=None):
+    """جدول المؤتمرات مع أعداد التسجيل والحضور والتقييمات: استعلام واحد لكل نموذج
+
+    التسجيل والحضور يُجمعان لكل مؤتمر في SQL (على فهرس conference) فلا تُنقل
+    صفوف الحضور نفسها إلى Python.
+    """
+    conferences = Conference.objects.order_by()
+    if status:
+        conferences = conferences.filter(status=status)
+    if start:
+        conferences = conferences.filter(start_date__date__gte=start)
+    if end:
+        conferences = conferences.filter(start_date__date__lte=end)
+
+    frame = _frame(conferences, _CONFERENCE_COLUMNS).set_index('id')
+    attendance = _frame(
+        Attendance.objects.filter(conference__in=conferences.values('id'))
+        .values('conference_id')
+        .annotate(registered=Count('id'), attended=Count('id', filter=Q(attended=True)))
+        .order_by(),
+        {'id': 'conference_id', 'registered': 'registered', 'attended': 'attended'},
+    ).set_index('id')
+    ratings = _frame(
+        ConferenceRatingSummary.objects.filter(conference__in=conferences.values('id')),
+        {'id': 'conference_id', 'rating_count': 'rating_count', 'rating_sum': 'rating_sum'},
+    ).set_index('id')
+
+    frame = frame.join(attendance).join(ratings)
+    counts = ['registered', 'attended', 'rating_count', 'rating_sum']
+    frame[counts] = frame[counts].fillna(0).astype(np.int64)
+    return frame
+
+def _add_dimensions(frame, group_by):
+    if 'organizer' in group_by:
+        full_name = (frame['organizer_first_name'] + ' ' + frame['organizer_last_name']).str.strip()
+        frame['organizer'] = full_name.mask(full_name == '', frame['organizer_username'])
+    if 'month' in group_by:
+        local = pd.to_datetime(frame['start_date'], utc=True).dt.tz_convert(settings.TIME_ZONE)
+        frame['month'] = local.dt.strftime('%Y-%m')
+    for dimension in group_by:
+        frame[dimension] = frame[dimension].fillna(UNSPECIFIED)
+    return frame
+
+def _ratio(numerator, denominator, digits):
+    """قسمة عمودين؛ NaN (null في JSON) عندما يكون المقام صفراً"""
+    numerator = numerator.to_numpy(dtype=float)
+    denominator = denominator.to_numpy(dtype=float)
+    result = np.full(len(numerator), np.nan)
+    np.divide(numerator, denominator, out=result, where=denominator > 0)
+    return np.round(result, digits)
+
+def compute_breakdown(group_by, status=None, start=None, end=None):
+    """نسبة الحضور ومتوسط التقييم ونسبة الامتلاء مجمعة حسب بعد أو بعدين"""
+    frame = load_conference_frame(status, start, end)
+    if frame.empty:
+        return []
+    frame = _add_dimensions(frame, group_by)
+
+    keys = [DIMENSION_KEYS.get(dimension, dimension) for dimension in group_by]
+    labels = {dimension: (dimension, 'first') for dimension in group_by if dimension in DIMENSION_KEYS}
+    grouped = frame.groupby(keys, sort=True, dropna=False).agg(
+        **labels,
+        conferences=('max_attendees', 'size'),
+        registered=('registered', 'sum'),
+        attended=('attended', 'sum'),
+        rating_count=('rating_count', 'sum'),
+        rating_sum=('rating_sum', 'sum'),
+        current_attendees=('current_attendees', 'sum'),
+        max_attendees=('max_attendees', 'sum'),
+    ).reset_index()
+    for dimension in labels:
+        grouped[DIMENSION_KEYS[dimension]] = grouped[DIMENSION_KEYS[dimension]].astype('Int64')
+
+    grouped['attendance_rate'] = _ratio(grouped['attended'], grouped['registered'], 4)
+    grouped['avg_rating'] = _ratio(grouped['rating_sum'], grouped['rating_count'], 2)
+    grouped['fill_ratio'] = _ratio(grouped['current_attendees'], grouped['max_attendees'], 4)
+    grouped = grouped.drop(columns=['rating_sum', 'current_attendees', 'max_attendees'])
+
+    # أنواع numpy إلى أنواع Python حتى تُحوّل إلى JSON
+    return json.loads(grouped.to_json(orient='records', force_ascii=False))
+
+def get_breakdown(group_by, status=None, start=None, end=None):
+    """compute_breakdown مع تخزين النتيجة لكل مجموعة معاملات"""
+    params = {
+        'group_by': list(group_by),
+        'status': status,
+        'start': start.isoformat() if start else None,
+        'end': end.isoformat() if end else None,
+    }
+    key = analytics_cache_key(params)
+    result = cache.get(key)
+    if result is None:
+        result = {
+            **params,
+            'rows': compute_breakdown(list(group_by), status, start, end),
+            'generated_at': timezone.now().isoformat(),
+        }
+        cache.set(key, result, ANALYTICS_CACHE_TIMEOUT)
+    return result
@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class ConferenceConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "conference"
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_migrate
+
+        from . import signals  # noqa: F401
+        from .search import create_search_index
+        from .sqlite_profile import configure_sqlite_connection
+
+        connection_created.connect(configure_sqlite_connection, dispatch_uid='sqlite_profile')
+        post_migrate.connect(create_search_index, sender=self)
@@ -0,0 +1,135 @@
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .models import UserProfile
+
+logger = logging.getLogger(__name__)
+
+# أحجام الصورة الشخصية المعروضة في القوالب (بالبكسل): تُولد كل منها بدقة 1x و2x
+AVATAR_SIZES = getattr(settings, 'AVATAR_SIZES', {'small': 48, 'medium': 150})
+
+# الصيغ المولدة: (الامتداد، صيغة Pillow، خيارات الحفظ)
+AVATAR_FORMATS = [
+    ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    ('jpg', 'JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+]
+
+# مجلد النسخ المصغرة داخل MEDIA_ROOT (تُخدم بترويسات تخزين طويلة لأن أسماءها لا تتكرر)
+AVATAR_DIR = 'avatars'
+
+# عدد خيوط المعالجة في عملية الويب
+AVATAR_THREADS = getattr(settings, 'AVATAR_THREADS', 1)
+
+_executor = None
+
+
+def avatar_pixel_sizes():
+    """جميع الأبعاد المولدة (1x و2x لكل حجم) مرتبة تصاعدياً"""
+    return sorted({px * scale for px in AVATAR_SIZES.values() for scale in (1, 2)})
+
+def avatar_variant_name(original_name, px, ext):
+    """اسم النسخة المصغرة: مشتق من اسم الأصل، فكل رفع جديد يحصل على أسماء جديدة"""
+    stem = os.path.splitext(os.path.basename(original_name))[0]
+    digest = hashlib.md5(original_name.encode('utf-8')).hexdigest()[:10]
+    return f'{AVATAR_DIR}/{stem}-{digest}-{px}.{ext}'
+
+def avatar_variant_urls(profile, size):
+    """روابط النسخ المصغرة {الامتداد: (رابط 1x، رابط 2x)}، أو None قبل انتهاء المعالجة"""
+    if not profile.profile_picture or profile.avatar_processed_at is None:
+        return None
+    px = AVATAR_SIZES[size]
+    name = profile.profile_picture.name
+    return {
+        ext: tuple(default_storage.url(avatar_variant_name(name, px * scale, ext)) for scale in (1, 2))
+        for ext, _, _ in AVATAR_FORMATS
+    }
+
+def render_avatar_variants(source):
+    """تصغير صورة إلى جميع الأبعاد والصيغ: {(البعد، الامتداد): البايتات}
+
+    يُصحح الاتجاه حسب EXIF ثم تُحفظ النسخ دون أي بيانات وصفية.
+    """
+    sizes = avatar_pixel_sizes()
+    with Image.open(source) as image:
+        # فك ترميز JPEG بدقة مخفضة مباشرة: صور الهواتف أكبر بكثير من أكبر نسخة
+        image.draft('RGB', (sizes[-1] * 2, sizes[-1] * 2))
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, 'white')
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+
+        variants = {}
+        for px in sizes:
+            thumbnail = ImageOps.fit(image, (px, px), Image.Resampling.LANCZOS)
+            for ext, image_format, options in AVATAR_FORMATS:
+                buffer = BytesIO()
+                thumbnail.save(buffer, image_format, **options)
+                variants[(px, ext)] = buffer.getvalue()
+    return variants
+
+def delete_avatar_variants(original_name):
+    for px in avatar_pixel_sizes():
+        for ext, _, _ in AVATAR_FORMATS:
+            default_storage.delete(avatar_variant_name(original_name, px, ext))
+
+def process_avatar(profile_id):
+    """توليد النسخ المصغرة لصورة مستخدم وتعليمها كجاهزة؛ تعيد True عند النجاح"""
+    profile = UserProfile.objects.filter(pk=profile_id).only('id', 'profile_picture').first()
+    if profile is None or not profile.profile_picture:
+        return False
+    name = profile.profile_picture.name
+    try:
+        with profile.profile_picture.open('rb') as source:
+            variants = render_avatar_variants(source)
+    except (OSError, Image.DecompressionBombError):
+        logger.warning('تعذرت معالجة الصورة الشخصية %s', name, exc_info=True)
+        return False
+
+    for (px, ext), content in variants.items():
+        variant = avatar_variant_name(name, px, ext)
+        # save() يضيف لاحقة عشوائية إن وُجد الملف، والمطلوب اسم ثابت
+        default_storage.delete(variant)
+        default_storage.save(variant, ContentFile(content))
+
+    # لا نعلم الصورة كجاهزة إذا استُبدلت أثناء المعالجة
+    return bool(
+        UserProfile.objects.filter(pk=profile_id, profile_picture=name)
+        .update(avatar_processed_at=timezone.now())
+    )
+
+def _process_in_background(profile_id, previous_name):
+    try:
+        if previous_name:
+            delete_avatar_variants(previous_name)
+        process_avatar(profile_id)
+    except Exception:
+        logger.exception('فشلت معالجة الصورة الشخصية للملف %s', profile_id)
+    finally:
+        # لكل خيط اتصاله الخاص بقاعدة البيانات
+        connection.close()
+
+def queue_avatar_processing(profile_id, previous_name=None):
+    """معالجة الصورة في خيط خلفي بعد نجاح المعاملة، دون تأخير الاستجابة
+
+    ما يضيع عند إيقاف العملية تلتقطه الأمر process_avatars.
+    """
+    def submit():
+        global _executor
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=AVATAR_THREADS, thread_name_prefix='avatars')
+        _executor.submit(_process_in_background, profile_id, previous_name)
+    transaction.on_commit(submit)
@@ -0,0 +1,59 @@
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import (
+    UserProfile, Conference, ConferenceRequest, Rating, Attendance, PlatformCounters
+)
+
+COUNTERS_PK = 1
+
+# حقل العداد المقابل لكل نوع مستخدم ولكل حالة مؤتمر
+USER_TYPE_FIELDS = {user_type: f'{user_type}_users' for user_type, _ in UserProfile.USER_TYPES}
+CONFERENCE_STATUS_FIELDS = {status: f'{status}_conferences' for status, _ in Conference.STATUS_CHOICES}
+
+
+def compute_counters():
+    """حساب جميع العدادات من الجداول مباشرة"""
+    values = UserProfile.objects.aggregate(
+        total_users=Count('id'),
+        approved_users=Count('id', filter=Q(is_approved=True)),
+        **{field: Count('id', filter=Q(user_type=user_type)) for user_type, field in USER_TYPE_FIELDS.items()}
+    )
+    values.update(Conference.objects.aggregate(
+        total_conferences=Count('id'),
+        **{field: Count('id', filter=Q(status=status)) for status, field in CONFERENCE_STATUS_FIELDS.items()}
+    ))
+    values.update(Attendance.objects.aggregate(
+        total_attendances=Count('id'),
+        total_attended=Count('id', filter=Q(attended=True)),
+    ))
+    values['total_ratings'] = Rating.objects.count()
+    values['pending_requests'] = ConferenceRequest.objects.filter(status='pending').count()
+    return values
+
+def reconcile_counters():
+    """إعادة حساب صف العدادات بالكامل"""
+    values = compute_counters()
+    values['reconciled_at'] = timezone.now()
+    counters, _ = PlatformCounters.objects.update_or_create(pk=COUNTERS_PK, defaults=values)
+    return counters
+
+def get_counters():
+    """قراءة صف العدادات (يُنشأ عند أول استخدام)"""
+    try:
+        return PlatformCounters.objects.get(pk=COUNTERS_PK)
+    except PlatformCounters.DoesNotExist:
+        return reconcile_counters()
+
+def bump_counters(deltas):
+    """زيادة/إنقاص العدادات ذرياً بتحديث واحد"""
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    updated = PlatformCounters.objects.filter(pk=COUNTERS_PK).update(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+    if not updated:
+        # أول تغيير قبل إنشاء الصف: نحسب كل شيء من الجداول (يشمل هذا التغيير)
+        reconcile_counters()
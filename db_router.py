@@ -0,0 +1,153 @@
+import contextvars
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# اسم قاعدة القراءة (نسخة من القاعدة الأساسية) في DATABASES
+REPLICA_DB_ALIAS = getattr(settings, 'REPLICA_DB_ALIAS', 'replica')
+
+# تجاوز لكل view: {اسم الدالة: True/False} لتشغيل توجيه القراءة إلى النسخة أو إيقافه
+REPLICA_VIEW_OVERRIDES = getattr(settings, 'REPLICA_VIEW_OVERRIDES', {})
+
+# بعد أي كتابة يقرأ المتصفح من القاعدة الأساسية طوال هذه المدة (بالثواني)،
+# فيرى ما كتبه حتى لو كانت النسخة متأخرة. يجب ألا تقل عن تأخر النسخة
+REPLICA_PIN_SECONDS = getattr(settings, 'REPLICA_PIN_SECONDS', 300)
+
+REPLICA_PIN_COOKIE = 'read_primary'
+
+_use_replica = contextvars.ContextVar('use_replica', default=False)
+_request_state = contextvars.ContextVar('replica_request_state', default=None)
+
+
+def replica_available():
+    """هل النسخة معرفة ومنفصلة عن القاعدة الأساسية وجاهزة للقراءة"""
+    if REPLICA_DB_ALIAS not in settings.DATABASES:
+        return False
+    replica = connections[REPLICA_DB_ALIAS].settings_dict
+    # في الاختبارات تكون النسخة مرآة للقاعدة الأساسية (TEST: MIRROR)
+    if replica['NAME'] == connections[DEFAULT_DB_ALIAS].settings_dict['NAME']:
+        return False
+    if replica['ENGINE'] == 'django.db.backends.sqlite3':
+        # نسخة SQLite لم تُنشأ بعد بالأمر snapshot_replica
+        return os.path.exists(replica['NAME'])
+    return True
+
+def pin_read_database(queryset):
+    """تثبيت قاعدة القراءة التي يختارها الموجّه الآن
+
+    QuerySet يسأل الموجّه عند التنفيذ، والصفوف المتدفقة تُقرأ بعد انتهاء الـ view
+    وخروجه من سياق replica_reads.
+    """
+    return queryset.using(queryset.db)
+
+def snapshot_sqlite_replica():
+    """نسخ القاعدة الأساسية إلى ملف نسخة القراءة بواجهة النسخ الاحتياطي في SQLite
+
+    النسخة متسقة (لقطة واحدة) ولا توقف الكتابة في القاعدة الأساسية (WAL)،
+    والقراء المتصلون بالنسخة ينتظرون لحظة الاستبدال فقط. تعيد المدة بالثواني.
+    """
+    source = connections[DEFAULT_DB_ALIAS]
+    source.ensure_connection()
+    started = time.monotonic()
+    target = sqlite3.connect(str(settings.DATABASES[REPLICA_DB_ALIAS]['NAME']), timeout=60)
+    try:
+        source.connection.backup(target)
+    finally:
+        target.close()
+    return time.monotonic() - started
+
+def _pinned_to_primary():
+    state = _request_state.get()
+    return state is not None and state['pinned']
+
+@contextmanager
+def use_replica():
+    """توجيه قراءات الكتلة إلى النسخة"""
+    token = _use_replica.set(not _pinned_to_primary())
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+@contextmanager
+def use_primary():
+    """إبقاء قراءات الكتلة على القاعدة الأساسية"""
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+def replica_reads(view=None, *, anonymous_only=False):
+    """توجيه قراءات الـ view إلى النسخة (طلبات GET فقط)
+
+    anonymous_only: للصفحات العامة؛ المستخدم المسجل يقرأ من القاعدة الأساسية.
+    يمكن إيقافه أو تشغيله لكل view عبر REPLICA_VIEW_OVERRIDES.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            enabled = REPLICA_VIEW_OVERRIDES.get(view.__name__, True)
+            if (
+                not enabled
+                or request.method not in ('GET', 'HEAD')
+                or (anonymous_only and request.user.is_authenticated)
+            ):
+                return view(request, *args, **kwargs)
+            with use_replica():
+                return view(request, *args, **kwargs)
+        return wrapper
+    return decorator if view is None else decorator(view)
+
+
+class ReplicaRouter:
+    """الكتابة دائماً إلى القاعدة الأساسية، والقراءة إلى النسخة داخل use_replica فقط"""
+
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and replica_available():
+            return REPLICA_DB_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        # القراءة بعد الكتابة في نفس الطلب تعود إلى القاعدة الأساسية
+        _use_replica.set(False)
+        state = _request_state.get()
+        if state is not None:
+            state['wrote'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # النسخة تحمل نفس البيانات
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # النسخة تُنسخ من القاعدة الأساسية ولا تُرحّل مباشرة
+        if db == REPLICA_DB_ALIAS:
+            return False
+        return None
+
+
+class ReplicaPinMiddleware:
+    """القراءة بعد الكتابة: المتصفح الذي كتب للتو يقرأ من القاعدة الأساسية لفترة قصيرة"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = {'pinned': REPLICA_PIN_COOKIE in request.COOKIES, 'wrote': False}
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+
+        if state['wrote']:
+            response.set_cookie(
+                REPLICA_PIN_COOKIE, '1', max_age=REPLICA_PIN_SECONDS, httponly=True, samesite='Lax'
+            )
+        return response
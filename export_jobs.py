@@ -0,0 +1,159 @@
+import logging
+import tempfile
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+
+from .db_router import use_replica
+from .exports import EXPORT_CHUNK_SIZE, REPORTS, count_report_rows, write_csv, write_xlsx
+from .models import ExportJob
+
+logger = logging.getLogger(__name__)
+
+# مدة الاحتفاظ بملف التقرير بعد إنشائه
+EXPORT_FILE_TTL = timedelta(hours=getattr(settings, 'EXPORT_FILE_TTL_HOURS', 24))
+
+# التقرير الذي طُلب خلال هذه المدة يُعاد استخدامه بدلاً من بنائه من جديد
+EXPORT_REUSE_WINDOW = timedelta(minutes=getattr(settings, 'EXPORT_REUSE_MINUTES', 15))
+
+# المهمة التي لم يسجل عاملها أي تقدم خلال هذه المدة تُعاد إلى قائمة الانتظار
+EXPORT_JOB_TIMEOUT = timedelta(minutes=getattr(settings, 'EXPORT_JOB_TIMEOUT_MINUTES', 60))
+
+FILE_EXTENSIONS = {
+    'excel': 'xlsx',
+    'csv': 'csv',
+}
+
+
+def request_export(user, report_type, format_type):
+    """طلب تقرير في الخلفية، مع إعادة استخدام تقرير حديث إن وجد
+
+    تعيد (المهمة، هل هي جديدة).
+    """
+    now = timezone.now()
+    fresh_job = (
+        ExportJob.objects
+        .filter(
+            report_type=report_type,
+            format=format_type,
+            status__in=['pending', 'running', 'completed'],
+            created_at__gte=now - EXPORT_REUSE_WINDOW,
+        )
+        .exclude(status='completed', expires_at__lte=now)
+        .order_by('-created_at')
+        .first()
+    )
+    if fresh_job:
+        return fresh_job, False
+
+    job = ExportJob.objects.create(
+        report_type=report_type,
+        format=format_type,
+        requested_by=user,
+    )
+    return job, True
+
+def claim_next_job():
+    """حجز أقدم مهمة في قائمة الانتظار (آمن مع عدة عمال)"""
+    while True:
+        job_id = (
+            ExportJob.objects
+            .filter(status='pending')
+            .order_by('created_at')
+            .values_list('id', flat=True)
+            .first()
+        )
+        if job_id is None:
+            return None
+
+        # التحديث المشروط يضمن أن عاملاً واحداً فقط يحجز المهمة
+        now = timezone.now()
+        claimed = ExportJob.objects.filter(id=job_id, status='pending').update(
+            status='running',
+            started_at=now,
+            heartbeat_at=now,
+            processed_rows=0,
+        )
+        if claimed:
+            return job_id
+
+def requeue_stale_jobs():
+    """إعادة المهام العالقة (مثلاً بعد توقف العامل) إلى قائمة الانتظار
+
+    بحسب آخر تقدم وليس وقت البدء: التقرير الكبير الذي يتقدم لا يُعاد مهما طال.
+    """
+    return ExportJob.objects.filter(
+        status='running',
+        heartbeat_at__lt=timezone.now() - EXPORT_JOB_TIMEOUT,
+    ).update(status='pending')
+
+def purge_expired_exports():
+    """حذف ملفات التقارير المنتهية الصلاحية"""
+    expired = ExportJob.objects.filter(status='completed', expires_at__lte=timezone.now())
+    count = 0
+    for job in expired.iterator():
+        if job.file:
+            job.file.delete(save=False)
+        job.status = 'expired'
+        job.save(update_fields=['file', 'status'])
+        count += 1
+    return count
+
+def _track_progress(job_id, rows, every=EXPORT_CHUNK_SIZE):
+    """تمرير الصفوف مع تحديث عدد الصفوف المعالجة (ونبض العامل) كل دفعة"""
+    processed = 0
+    for row in rows:
+        yield row
+        processed += 1
+        if processed % every == 0:
+            ExportJob.objects.filter(id=job_id).update(processed_rows=processed, heartbeat_at=timezone.now())
+    ExportJob.objects.filter(id=job_id).update(processed_rows=processed, heartbeat_at=timezone.now())
+
+def run_export_job(job_id):
+    """بناء ملف التقرير لمهمة محجوزة وحفظه في MEDIA_ROOT"""
+    job = ExportJob.objects.get(id=job_id)
+    iter_rows, columns, _ = REPORTS[job.report_type]
+
+    try:
+        # التقارير تقبل تأخراً بسيطاً: تُقرأ من نسخة القراءة (الكتابة تعيد الموجّه إلى الأساسية،
+        # لذا يُحدد مصدر الصفوف قبل تحديث المهمة)
+        with use_replica():
+            rows = _track_progress(job.id, iter_rows())
+            job.total_rows = count_report_rows(job.report_type)
+        job.save(update_fields=['total_rows'])
+
+        with tempfile.TemporaryFile() as output:
+            if job.format == 'excel':
+                write_xlsx(rows, columns, output)
+            else:
+                write_csv(rows, columns, output)
+            output.seek(0)
+            # الاسم على القرص عشوائي (export_file_path)، واسم التحميل من download_filename
+            job.file.save(f'{job.report_type}.{FILE_EXTENSIONS[job.format]}', File(output), save=False)
+
+        now = timezone.now()
+        job.status = 'completed'
+        job.finished_at = now
+        job.expires_at = now + EXPORT_FILE_TTL
+        job.save(update_fields=['file', 'status', 'finished_at', 'expires_at'])
+    except Exception as e:
+        logger.exception('فشل تنفيذ مهمة التصدير %s', job_id)
+        job.status = 'failed'
+        job.error = str(e)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'finished_at'])
+
+    return job_id
+
+def download_filename(job):
+    """اسم ملف التقرير عند التحميل (الاسم المخزن عشوائي)"""
+    _, _, filename_prefix = REPORTS[job.report_type]
+    created = timezone.localtime(job.finished_at or job.created_at)
+    return f"{filename_prefix}_{created.strftime('%Y-%m-%d_%H-%M-%S')}.{FILE_EXTENSIONS[job.format]}"
+
+def init_worker_process():
+    """تهيئة عملية فرعية في مجمع العمليات"""
+    django.setup()
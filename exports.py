@@ -0,0 +1,258 @@
+import csv
+import pickle
+import tempfile
+from io import StringIO
+from itertools import islice
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+from .counters import get_counters
+from .db_router import pin_read_database
+from .models import UserProfile, Conference, Rating
+
+# عدد الصفوف التي تُجلب من قاعدة البيانات في كل دفعة
+EXPORT_CHUNK_SIZE = 2000
+
+# أقصى عرض لعمود في ملف Excel
+EXCEL_MAX_COLUMN_WIDTH = 50
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+USERS_REPORT_COLUMNS = [
+    'اسم المستخدم', 'الاسم الأول', 'الاسم الأخير', 'الاسم الكامل',
+    'البريد الإلكتروني', 'نوع المستخدم', 'رقم الهاتف', 'المدينة',
+    'المحافظة', 'مفعل', 'تاريخ التسجيل',
+]
+
+CONFERENCES_REPORT_COLUMNS = [
+    'عنوان المؤتمر', 'وصف المؤتمر', 'اسم المنظم', 'الاسم الكامل للمنظم',
+    'التصنيف', 'تاريخ البدء', 'تاريخ الانتهاء', 'المكان', 'المدينة',
+    'الحالة', 'الحد الأقصى', 'عدد المشاركين الحالي', 'مميز', 'تاريخ الإنشاء',
+    'متوسط التقييم', 'عدد التقييمات',
+]
+
+RATINGS_REPORT_COLUMNS = [
+    'عنوان المؤتمر', 'اسم المستخدم', 'الاسم الكامل', 'التقييم',
+    'النجوم', 'التعليق', 'تاريخ التقييم',
+]
+
+
+def get_user_type_arabic(user_type):
+    """تحويل نوع المستخدم إلى عربي"""
+    user_type_map = {
+        'admin': 'مدير النظام',
+        'organizer': 'منظم المؤتمر',
+        'speaker': 'متحدث',
+        'attendee': 'مشارك',
+    }
+    return user_type_map.get(user_type, user_type)
+
+def get_status_arabic(status):
+    """تحويل حالة المؤتمر إلى عربي"""
+    status_map = {
+        'pending': 'قيد الانتظار',
+        'approved': 'مقبول',
+        'rejected': 'مرفوض',
+        'active': 'نشط',
+        'completed': 'منتهي',
+        'cancelled': 'ملغي',
+    }
+    return status_map.get(status, status)
+
+def _naive(value):
+    """إزالة المنطقة الزمنية من التاريخ (كما في ملفات Excel)"""
+    return value.replace(tzinfo=None) if value else ''
+
+def iter_users_report_rows(chunk_size=EXPORT_CHUNK_SIZE):
+    """توليد صفوف تقرير المستخدمين دفعة بدفعة"""
+    # قاعدة القراءة يختارها الموجّه عند الاستدعاء (replica_reads ومهلة القراءة بعد الكتابة)
+    rows = pin_read_database(UserProfile.objects.order_by('id')).values_list(
+        'user__username', 'user__first_name', 'user__last_name', 'user__email',
+        'user_type', 'phone', 'city__name', 'city__governorate',
+        'is_approved', 'created_at',
+    ).iterator(chunk_size=chunk_size)
+    return _users_report_rows(rows)
+
+def _users_report_rows(rows):
+    for (username, first_name, last_name, email, user_type, phone,
+         city_name, governorate, is_approved, created_at) in rows:
+        yield [
+            username,
+            first_name or '',
+            last_name or '',
+            f"{first_name or ''} {last_name or ''}".strip(),
+            email or '',
+            get_user_type_arabic(user_type),
+            phone or '',
+            city_name or '',
+            governorate or '',
+            'نعم' if is_approved else 'لا',
+            _naive(created_at),
+        ]
+
+def iter_conferences_report_rows(chunk_size=EXPORT_CHUNK_SIZE):
+    """توليد صفوف تقرير المؤتمرات دفعة بدفعة"""
+    rows = pin_read_database(Conference.objects.order_by('id')).values_list(
+        'title', 'description', 'organizer__user__username',
+        'organizer__user__first_name', 'organizer__user__last_name',
+        'category__name', 'start_date', 'end_date', 'location', 'city__name',
+        'status', 'max_attendees', 'current_attendees', 'is_featured', 'created_at',
+        'rating_summary__rating_count', 'rating_summary__rating_sum',
+    ).iterator(chunk_size=chunk_size)
+    return _conferences_report_rows(rows)
+
+def _conferences_report_rows(rows):
+    for (title, description, organizer_username, organizer_first_name,
+         organizer_last_name, category_name, start_date, end_date, location,
+         city_name, status, max_attendees, current_attendees, is_featured,
+         created_at, rating_count, rating_sum) in rows:
+        yield [
+            title,
+            description[:100] + '...' if description else '',
+            organizer_username or '',
+            f"{organizer_first_name or ''} {organizer_last_name or ''}".strip(),
+            category_name or '',
+            _naive(start_date),
+            _naive(end_date),
+            location,
+            city_name or '',
+            get_status_arabic(status),
+            max_attendees,
+            current_attendees,
+            'نعم' if is_featured else 'لا',
+            _naive(created_at),
+            round(rating_sum / rating_count, 1) if rating_count else '',
+            rating_count or 0,
+        ]
+
+def iter_ratings_report_rows(chunk_size=EXPORT_CHUNK_SIZE):
+    """توليد صفوف تقرير التقييمات دفعة بدفعة"""
+    rows = pin_read_database(Rating.objects.order_by('id')).values_list(
+        'conference__title', 'user__user__username', 'user__user__first_name',
+        'user__user__last_name', 'rating', 'comment', 'created_at',
+    ).iterator(chunk_size=chunk_size)
+    return _ratings_report_rows(rows)
+
+def _ratings_report_rows(rows):
+    for (conference_title, username, first_name, last_name, rating,
+         comment, created_at) in rows:
+        yield [
+            conference_title,
+            username,
+            f"{first_name or ''} {last_name or ''}".strip(),
+            rating,
+            '★' * rating + '☆' * (5 - rating),
+            comment or '',
+            _naive(created_at),
+        ]
+
+def count_report_rows(report_type):
+    """عدد الصفوف المتوقعة في التقرير (لحساب نسبة الإنجاز)"""
+    counters = get_counters()
+    fields = {
+        'users': 'total_users',
+        'conferences': 'total_conferences',
+        'ratings': 'total_ratings',
+    }
+    return getattr(counters, fields[report_type])
+
+# أنواع التقارير المتاحة: (مولد الصفوف، أسماء الأعمدة، بادئة اسم الملف)
+REPORTS = {
+    'users': (iter_users_report_rows, USERS_REPORT_COLUMNS, 'تقرير_المستخدمين'),
+    'conferences': (iter_conferences_report_rows, CONFERENCES_REPORT_COLUMNS, 'تقرير_المؤتمرات'),
+    'ratings': (iter_ratings_report_rows, RATINGS_REPORT_COLUMNS, 'تقرير_التقييمات'),
+}
+
+def _iter_batches(rows, chunk_size):
+    """تقسيم الصفوف إلى دفعات"""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, chunk_size))
+        if not batch:
+            return
+        yield batch
+
+def iter_csv(rows, columns, chunk_size=EXPORT_CHUNK_SIZE):
+    """تحويل الصفوف إلى نص CSV على دفعات (مع BOM ليفتحه Excel بالعربية)"""
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+
+    # نرسل الترويسة فوراً قبل أول استعلام
+    buffer.write('\ufeff')
+    writer.writerow(columns)
+    yield buffer.getvalue()
+
+    for batch in _iter_batches(rows, chunk_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue()
+
+def export_to_csv_stream(rows, columns, filename):
+    """تصدير متدفق إلى CSV دون تحميل الجدول كاملاً في الذاكرة"""
+    response = StreamingHttpResponse(
+        iter_csv(rows, columns),
+        content_type='text/csv; charset=utf-8'
+    )
+    # اسم الملف عربي: يُرمَّز بصيغة filename* وإلا رمّز Django الترويسة كلها فلا يراها المتصفح مرفقاً
+    response['Content-Disposition'] = content_disposition_header(True, f'{filename}.csv')
+
+    return response
+
+def write_csv(rows, columns, output, chunk_size=EXPORT_CHUNK_SIZE):
+    """كتابة الصفوف إلى ملف CSV ثنائي مفتوح"""
+    for chunk in iter_csv(rows, columns, chunk_size):
+        output.write(chunk.encode('utf-8'))
+
+def write_xlsx(rows, columns, output, chunk_size=EXPORT_CHUNK_SIZE):
+    """كتابة الصفوف إلى ملف Excel بذاكرة ثابتة
+
+    openpyxl في وضع write_only يكتب عرض الأعمدة قبل أول صف، لذلك نمرّ على
+    الصفوف مرة واحدة ونحفظها مؤقتاً على القرص مع حساب عرض كل عمود، ثم
+    نكتبها إلى الورقة.
+    """
+    widths = [len(column) for column in columns]
+
+    with tempfile.TemporaryFile() as spool:
+        for batch in _iter_batches(rows, chunk_size):
+            for row in batch:
+                for col_idx, value in enumerate(row):
+                    length = len(str(value))
+                    if length > widths[col_idx]:
+                        widths[col_idx] = length
+            pickle.dump(batch, spool, pickle.HIGHEST_PROTOCOL)
+
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet('تقرير')
+        for col_idx, width in enumerate(widths, start=1):
+            worksheet.column_dimensions[get_column_letter(col_idx)].width = min(
+                width + 2, EXCEL_MAX_COLUMN_WIDTH
+            )
+
+        worksheet.append(columns)
+        spool.seek(0)
+        while True:
+            try:
+                batch = pickle.load(spool)
+            except EOFError:
+                break
+            for row in batch:
+                worksheet.append(row)
+
+        workbook.save(output)
+
+def export_to_excel_stream(rows, columns, filename):
+    """تصدير إلى Excel عبر ملف مؤقت دون بناء الجدول في الذاكرة"""
+    output = tempfile.TemporaryFile()
+    write_xlsx(rows, columns, output)
+    output.seek(0)
+
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=f'{filename}.xlsx',
+        content_type=XLSX_CONTENT_TYPE,
+    )
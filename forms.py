@@ -1,7 +1,23 @@
+import os
+
 from django import forms
 from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
 from django.contrib.auth.models import User
-from .models import UserProfile, Conference, Category, ConferenceRequest
+from .imports import READERS
+from .models import UserProfile, Conference, Category, ConferenceRequest, ImportJob
+from .reference_data import get_categories, get_cities
+
+class ReferenceChoicesMixin:
+    """خيارات المدن والتصنيفات من ذاكرة البيانات المرجعية بدلاً من استعلام في كل عرض"""
+    reference_choices = {'city': get_cities, 'category': get_categories}
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name, load in self.reference_choices.items():
+            field = self.fields.get(name)
+            if field is not None:
+                empty = [('', field.empty_label)] if field.empty_label is not None else []
+                field.choices = empty + [(obj.pk, field.label_from_instance(obj)) for obj in load()]
 
 class LoginForm(AuthenticationForm):
     username = forms.CharField(
@@ -25,7 +41,7 @@ class UserRegistrationForm(UserCreationForm):
         for field in self.fields:
             self.fields[field].widget.attrs.update({'class': 'form-control'})
 
-class UserProfileForm(forms.ModelForm):
+class UserProfileForm(ReferenceChoicesMixin, forms.ModelForm):
     class Meta:
         model = UserProfile
         fields = ['user_type', 'phone', 'address', 'city', 'bio', 'profile_picture']
@@ -37,7 +53,7 @@ class UserProfileForm(forms.ModelForm):
             'city': forms.Select(attrs={'class': 'form-control'}),
         }
 
-class ConferenceForm(forms.ModelForm):
+class ConferenceForm(ReferenceChoicesMixin, forms.ModelForm):
     class Meta:
         model = Conference
         fields = ['title', 'description', 'category', 'start_date', 'end_date', 
@@ -69,4 +85,24 @@ class ConferenceRequestForm(forms.ModelForm):
         widgets = {
             'request_type': forms.Select(attrs={'class': 'form-control'}),
             'details': forms.Textarea(attrs={'rows': 3, 'class': 'form-control'}),
-        }
\ No newline at end of file
+        }
+
+class ImportForm(forms.Form):
+    kind = forms.ChoiceField(
+        label='نوع البيانات', choices=ImportJob.KIND_CHOICES,
+        widget=forms.Select(attrs={'class': 'form-control'}),
+    )
+    file = forms.FileField(
+        label='الملف (CSV أو XLSX)',
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,.xlsx'}),
+    )
+    dry_run = forms.BooleanField(
+        label='تحقق فقط دون حفظ', required=False,
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+    )
+    
+    def clean_file(self):
+        upload = self.cleaned_data['file']
+        if os.path.splitext(upload.name)[1].lower() not in READERS:
+            raise forms.ValidationError('نوع الملف غير مدعوم (CSV أو XLSX فقط)')
+        return upload
@@ -0,0 +1,652 @@
+import csv
+import io
+import logging
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.validators import validate_email
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from openpyxl import load_workbook
+
+from .counters import CONFERENCE_STATUS_FIELDS, USER_TYPE_FIELDS, bump_counters
+from .export_jobs import init_worker_process
+from .models import Attendance, Conference, ConferenceRatingSummary, ImportJob, UserProfile
+from .page_cache import bump_listings_version
+from .reference_data import get_categories, get_cities
+from .search import index_conferences
+
+logger = logging.getLogger(__name__)
+
+# عدد الصفوف التي يُتحقق منها وتُحفظ معاً (معاملة واحدة لكل دفعة)
+IMPORT_CHUNK_SIZE = getattr(settings, 'IMPORT_CHUNK_SIZE', 1000)
+
+# عدد العمليات التي تجزّئ كلمات المرور (PBKDF2 نحو ثلث ثانية لكل كلمة على نواة واحدة)
+IMPORT_HASH_WORKERS = getattr(settings, 'IMPORT_HASH_WORKERS', os.cpu_count() or 1)
+
+# دفعة بكلمات مرور أقل من هذا العدد تُجزّأ في العملية نفسها (تشغيل المجمع له كلفته)
+IMPORT_POOL_MIN_PASSWORDS = 16
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'نعم'}
+FALSE_VALUES = {'', '0', 'false', 'no', 'n', 'لا'}
+
+
+class ImportFileError(Exception):
+    """خطأ في الملف كله (النوع، الترميز، الأعمدة): لا يُستورد شيء"""
+
+class RowError(Exception):
+    """خطأ في صف واحد: يُسجل في التقرير ويُتجاوز الصف"""
+
+
+# ====== قراءة الملفات ======
+
+def _read_csv(file):
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.reader(text)
+    finally:
+        # لا يُغلق الملف الأصلي مع الغلاف
+        text.detach()
+
+def _read_xlsx(file):
+    # read_only: الصفوف تُقرأ من ملف XML تدريجياً دون تحميل الورقة كاملة
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+READERS = {
+    '.csv': _read_csv,
+    '.xlsx': _read_xlsx,
+}
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, float) and value.is_integer():
+        # الأرقام في Excel (الهاتف، المعرفات) تُقرأ كأعداد عشرية
+        return str(int(value))
+    if isinstance(value, (datetime, date)):
+        return value
+    return str(value)
+
+def _iter_records(rows, positions):
+    try:
+        for number, row in enumerate(rows, start=2):
+            values = {field: _cell(row[i]) if i < len(row) else '' for field, i in positions.items()}
+            if any(value != '' for value in values.values()):
+                yield number, values
+    finally:
+        rows.close()
+
+def open_rows(file, filename, columns, required=()):
+    """قراءة ملف CSV أو XLSX صفاً صفاً دون تحميله كاملاً
+
+    columns: {الحقل: [أسماء العمود المقبولة]}. تعيد مولداً لـ (رقم الصف في الملف، {الحقل: القيمة}).
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in READERS:
+        raise ImportFileError('نوع الملف غير مدعوم (CSV أو XLSX فقط)')
+    try:
+        rows = READERS[extension](file)
+        header = next(rows, None)
+    except UnicodeDecodeError:
+        raise ImportFileError('ترميز الملف غير مدعوم (احفظه بترميز UTF-8)')
+    except Exception as e:
+        raise ImportFileError(f'تعذرت قراءة الملف: {e}')
+    if header is None:
+        raise ImportFileError('الملف فارغ')
+
+    aliases = {alias.lower(): field for field, names in columns.items() for alias in names}
+    positions = {}
+    for i, name in enumerate(header):
+        field = aliases.get(str(name or '').strip().lower())
+        if field and field not in positions:
+            positions[field] = i
+    missing = [columns[field][0] for field in required if field not in positions]
+    if missing:
+        rows.close()
+        raise ImportFileError(f"أعمدة مفقودة: {'، '.join(missing)}")
+    return _iter_records(rows, positions)
+
+# ====== تحويل القيم ======
+
+def _text(values, field, label, max_length=None, required=False):
+    value = values.get(field, '')
+    value = value if isinstance(value, str) else str(value)
+    if required and not value:
+        raise RowError(f'{label} مطلوب')
+    if max_length and len(value) > max_length:
+        raise RowError(f'{label} أطول من {max_length} حرفاً')
+    return value
+
+def _bool(values, field, label, default=False):
+    if field not in values:
+        return default
+    value = str(values[field]).lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise RowError(f'{label}: قيمة غير صالحة "{values[field]}"')
+
+def _int(values, field, label, default=None):
+    value = values.get(field, '')
+    if value == '':
+        if default is None:
+            raise RowError(f'{label} مطلوب')
+        return default
+    try:
+        return int(value if isinstance(value, str) else str(value))
+    except ValueError:
+        raise RowError(f'{label}: رقم غير صالح "{value}"')
+
+def _choice(values, field, label, choices, default):
+    """القيمة بالرمز (attendee) أو بالاسم المعروض (مشارك) كما في ملفات التصدير"""
+    value = values.get(field, '')
+    if value == '':
+        return default
+    # خلايا التاريخ في XLSX تصل كـ datetime
+    value = value if isinstance(value, str) else str(value)
+    for code, display in choices:
+        if value.lower() == code or value == display:
+            return code
+    raise RowError(f'{label}: قيمة غير صالحة "{value}"')
+
+def _datetime(values, field, label):
+    value = values.get(field, '')
+    if value == '':
+        raise RowError(f'{label} مطلوب')
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, date):
+        parsed = datetime.combine(value, time.min)
+    else:
+        try:
+            parsed = parse_datetime(value)
+            if parsed is None and parse_date(value):
+                parsed = datetime.combine(parse_date(value), time.min)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise RowError(f'{label}: تاريخ غير صالح "{value}" (الصيغة YYYY-MM-DD HH:MM)')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+def build_lookup(objects):
+    """{الاسم: المعرف} من قائمة بيانات مرجعية؛ الاسم المكرر يُعلّم None (غامض)
+
+    المدينة تُقبل أيضاً بصيغة "المدينة - المحافظة" للتمييز بين الأسماء المكررة.
+    """
+    lookup = {}
+    for obj in objects:
+        for key in {obj.name.strip().lower(), str(obj).strip().lower()}:
+            lookup[key] = None if key in lookup and lookup[key] != obj.pk else obj.pk
+    return lookup
+
+def _resolve(lookup, values, field, label):
+    value = values.get(field, '')
+    if value == '':
+        return None
+    value = value if isinstance(value, str) else str(value)
+    key = value.lower()
+    if key not in lookup:
+        raise RowError(f'{label}: لا يوجد سجل باسم "{value}"')
+    if lookup[key] is None:
+        raise RowError(f'{label} "{value}" يطابق أكثر من سجل')
+    return lookup[key]
+
+# ====== تجزئة كلمات المرور ======
+
+def _hash_password(password):
+    # بدون كلمة مرور: حساب غير قابل للدخول حتى يعيّن المستخدم كلمته
+    return make_password(password or None)
+
+class PasswordHasher:
+    """تجزئة كلمات المرور، في مجمع عمليات عندما workers > 1
+
+    PBKDF2 يشغل المعالج بالكامل ولا يستفيد من الخيوط، فالتوازي يكون بالعمليات.
+    """
+
+    def __init__(self, workers=1):
+        self.workers = max(1, workers)
+        self._pool = None
+
+    def hash(self, passwords):
+        if self.workers == 1 or sum(1 for password in passwords if password) < IMPORT_POOL_MIN_PASSWORDS:
+            return [_hash_password(password) for password in passwords]
+        if self._pool is None:
+            # لا تُورَّث اتصالات قاعدة البيانات المفتوحة للعمليات الفرعية
+            connections.close_all()
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker_process)
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        return list(self._pool.map(_hash_password, passwords, chunksize=chunksize))
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+# ====== أنواع الاستيراد ======
+
+class ImportReport:
+    """نتيجة الاستيراد: عدد الصفوف المقروءة والمحفوظة، والأخطاء لكل صف"""
+
+    def __init__(self, kind, dry_run=False):
+        self.kind = kind
+        self.dry_run = dry_run
+        self.rows = 0
+        self.created = 0
+        self.errors = []
+
+    def add_error(self, row, message):
+        self.errors.append((row, message))
+
+    def write_csv(self, output):
+        writer = csv.writer(output)
+        writer.writerow(['الصف', 'الخطأ'])
+        writer.writerows(self.errors)
+
+
+class BaseImporter:
+    """تحقق دفعة كاملة (باستعلام واحد لكل ما يلزم من قاعدة البيانات) ثم إدخالها جماعياً"""
+
+    # {الحقل: [الاسم الإنجليزي، عنوان العمود العربي كما في ملفات التصدير، ...]}
+    columns = {}
+    required = ()
+
+    def __init__(self, report, hasher):
+        self.report = report
+        self.hasher = hasher
+
+    def label(self, field):
+        return self.columns[field][1]
+
+    def prepare(self, records):
+        """تحميل ما يلزم للتحقق من الدفعة"""
+
+    def clean(self, values):
+        """تحويل صف إلى كائن جاهز للحفظ، أو RowError"""
+        raise NotImplementedError
+
+    def save(self, objects):
+        """حفظ الكائنات الصالحة من دفعة واحدة داخل معاملة"""
+        raise NotImplementedError
+
+    def finish(self):
+        """بعد آخر دفعة"""
+
+    def process_chunk(self, records):
+        self.prepare(records)
+        valid = []
+        for number, values in records:
+            try:
+                valid.append((number, self.clean(values)))
+            except RowError as e:
+                self.report.add_error(number, str(e))
+        if not valid:
+            return
+        if not self.report.dry_run:
+            try:
+                self.save([obj for _, obj in valid])
+            except IntegrityError as e:
+                # تعارض مع تعديل متزامن: تُلغى الدفعة كاملة وتُسجل صفوفها
+                for number, _ in valid:
+                    self.report.add_error(number, f'تعذر حفظ الدفعة: {e}')
+                return
+        self.report.created += len(valid)
+
+
+class UserImporter(BaseImporter):
+    columns = {
+        'username': ['username', 'اسم المستخدم'],
+        'email': ['email', 'البريد الإلكتروني'],
+        'first_name': ['first_name', 'الاسم الأول'],
+        'last_name': ['last_name', 'الاسم الأخير'],
+        'password': ['password', 'كلمة المرور'],
+        'user_type': ['user_type', 'نوع المستخدم'],
+        'phone': ['phone', 'رقم الهاتف'],
+        'address': ['address', 'العنوان'],
+        'city': ['city', 'المدينة'],
+        'bio': ['bio', 'نبذة'],
+        'is_approved': ['is_approved', 'مفعل'],
+    }
+    required = ('username',)
+
+    def __init__(self, report, hasher):
+        super().__init__(report, hasher)
+        self.cities = build_lookup(get_cities())
+        self.seen = set()
+
+    def prepare(self, records):
+        usernames = {values.get('username', '') for _, values in records}
+        self.existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+
+    def clean(self, values):
+        username = _text(values, 'username', self.label('username'), 150, required=True)
+        try:
+            User.username_validator(username)
+        except ValidationError:
+            raise RowError(f'اسم المستخدم غير صالح "{username}"')
+        if username in self.existing:
+            raise RowError(f'اسم المستخدم "{username}" موجود مسبقاً')
+        if username in self.seen:
+            raise RowError(f'اسم المستخدم "{username}" مكرر في الملف')
+
+        email = _text(values, 'email', self.label('email'), 254)
+        if email:
+            try:
+                validate_email(email)
+            except ValidationError:
+                raise RowError(f'البريد الإلكتروني غير صالح "{email}"')
+
+        user = User(
+            username=username,
+            email=email,
+            first_name=_text(values, 'first_name', self.label('first_name'), 150),
+            last_name=_text(values, 'last_name', self.label('last_name'), 150),
+        )
+        profile = UserProfile(
+            user_type=_choice(values, 'user_type', self.label('user_type'), UserProfile.USER_TYPES, 'attendee'),
+            phone=_text(values, 'phone', self.label('phone'), 20),
+            address=_text(values, 'address', self.label('address')),
+            city_id=_resolve(self.cities, values, 'city', self.label('city')),
+            bio=_text(values, 'bio', self.label('bio')),
+            is_approved=_bool(values, 'is_approved', self.label('is_approved')),
+        )
+        self.seen.add(username)
+        return user, profile, _text(values, 'password', self.label('password'))
+
+    def save(self, objects):
+        # التجزئة قبل فتح المعاملة: لا يُحجز قفل الكتابة أثناءها
+        hashes = self.hasher.hash([password for _, _, password in objects])
+        for (user, _, _), password_hash in zip(objects, hashes):
+            user.password = password_hash
+
+        with transaction.atomic():
+            users = User.objects.bulk_create([user for user, _, _ in objects])
+            profiles = []
+            for user, (_, profile, _) in zip(users, objects):
+                profile.user = user
+                profiles.append(profile)
+            UserProfile.objects.bulk_create(profiles)
+
+            # bulk_create لا يطلق الإشارات، لذا نعدّل العدادات يدوياً
+            deltas = Counter(USER_TYPE_FIELDS[profile.user_type] for profile in profiles)
+            deltas['total_users'] = len(profiles)
+            deltas['approved_users'] = sum(profile.is_approved for profile in profiles)
+            bump_counters(deltas)
+
+
+class ConferenceImporter(BaseImporter):
+    columns = {
+        'title': ['title', 'عنوان المؤتمر'],
+        'description': ['description', 'وصف المؤتمر'],
+        'organizer': ['organizer', 'اسم المنظم'],
+        'category': ['category', 'التصنيف'],
+        'start_date': ['start_date', 'تاريخ البدء'],
+        'end_date': ['end_date', 'تاريخ الانتهاء'],
+        'location': ['location', 'المكان'],
+        'city': ['city', 'المدينة'],
+        'status': ['status', 'الحالة'],
+        'max_attendees': ['max_attendees', 'الحد الأقصى'],
+        'is_featured': ['is_featured', 'مميز'],
+    }
+    required = ('title', 'description', 'organizer', 'start_date', 'end_date', 'location')
+
+    def __init__(self, report, hasher):
+        super().__init__(report, hasher)
+        self.cities = build_lookup(get_cities())
+        self.categories = build_lookup(get_categories())
+        self.saved = 0
+
+    def prepare(self, records):
+        usernames = {values.get('organizer', '') for _, values in records}
+        self.organizers = dict(
+            UserProfile.objects.filter(user__username__in=usernames).values_list('user__username', 'id')
+        )
+
+    def clean(self, values):
+        organizer = _text(values, 'organizer', self.label('organizer'), required=True)
+        if organizer not in self.organizers:
+            raise RowError(f'المنظم "{organizer}" غير موجود')
+        start_date = _datetime(values, 'start_date', self.label('start_date'))
+        end_date = _datetime(values, 'end_date', self.label('end_date'))
+        if end_date < start_date:
+            raise RowError('تاريخ الانتهاء يسبق تاريخ البدء')
+        max_attendees = _int(values, 'max_attendees', self.label('max_attendees'), default=100)
+        if max_attendees < 1:
+            raise RowError('الحد الأقصى للمشاركين يجب أن يكون 1 على الأقل')
+
+        return Conference(
+            title=_text(values, 'title', self.label('title'), 200, required=True),
+            description=_text(values, 'description', self.label('description'), required=True),
+            organizer_id=self.organizers[organizer],
+            category_id=_resolve(self.categories, values, 'category', self.label('category')),
+            start_date=start_date,
+            end_date=end_date,
+            location=_text(values, 'location', self.label('location'), 200, required=True),
+            city_id=_resolve(self.cities, values, 'city', self.label('city')),
+            status=_choice(values, 'status', self.label('status'), Conference.STATUS_CHOICES, 'pending'),
+            max_attendees=max_attendees,
+            is_featured=_bool(values, 'is_featured', self.label('is_featured')),
+        )
+
+    def save(self, objects):
+        with transaction.atomic():
+            conferences = Conference.objects.bulk_create(objects)
+            ConferenceRatingSummary.objects.bulk_create([
+                ConferenceRatingSummary(conference=conference) for conference in conferences
+            ])
+            index_conferences(conferences)
+
+            deltas = Counter(CONFERENCE_STATUS_FIELDS[conference.status] for conference in conferences)
+            deltas['total_conferences'] = len(conferences)
+            bump_counters(deltas)
+        self.saved += len(conferences)
+
+    def finish(self):
+        if self.saved:
+            bump_listings_version()
+
+
+class AttendanceImporter(BaseImporter):
+    columns = {
+        'conference': ['conference_id', 'رقم المؤتمر', 'conference'],
+        'username': ['username', 'اسم المستخدم'],
+        'attended': ['attended', 'حضر'],
+    }
+    required = ('conference', 'username')
+
+    def __init__(self, report, hasher):
+        super().__init__(report, hasher)
+        # المقاعد المتبقية لكل مؤتمر، تُنقص مع كل صف مقبول عبر الدفعات
+        self.remaining = {}
+        self.seen = set()
+
+    def prepare(self, records):
+        conference_ids = set()
+        for _, values in records:
+            try:
+                conference_ids.add(int(values.get('conference', '')))
+            except ValueError:
+                pass
+        new_ids = conference_ids - self.remaining.keys()
+        self.remaining.update(
+            (conference_id, max_attendees - current_attendees)
+            for conference_id, max_attendees, current_attendees in Conference.objects.filter(
+                id__in=new_ids
+            ).values_list('id', 'max_attendees', 'current_attendees')
+        )
+
+        usernames = {values.get('username', '') for _, values in records}
+        self.profiles = dict(
+            UserProfile.objects.filter(user__username__in=usernames).values_list('user__username', 'id')
+        )
+        self.existing = set(
+            Attendance.objects.filter(
+                conference_id__in=conference_ids, user_id__in=self.profiles.values()
+            ).values_list('conference_id', 'user_id')
+        )
+
+    def clean(self, values):
+        conference_id = _int(values, 'conference', self.label('conference'))
+        if conference_id not in self.remaining:
+            raise RowError(f'المؤتمر رقم {conference_id} غير موجود')
+        username = _text(values, 'username', self.label('username'), required=True)
+        if username not in self.profiles:
+            raise RowError(f'المستخدم "{username}" غير موجود')
+        attended = _bool(values, 'attended', self.label('attended'))
+
+        key = (conference_id, self.profiles[username])
+        if key in self.existing or key in self.seen:
+            raise RowError(f'المستخدم "{username}" مسجل مسبقاً في المؤتمر رقم {conference_id}')
+        if self.remaining[conference_id] <= 0:
+            raise RowError(f'المؤتمر رقم {conference_id} ممتلئ')
+        self.remaining[conference_id] -= 1
+        self.seen.add(key)
+
+        return Attendance(
+            conference_id=conference_id,
+            user_id=key[1],
+            attended=attended,
+            attended_at=timezone.now() if attended else None,
+        )
+
+    def save(self, objects):
+        per_conference = Counter(attendance.conference_id for attendance in objects)
+        with transaction.atomic():
+            # التحديث المشروط يحجز المقاعد كما في التسجيل العادي (registration.py)
+            for conference_id, count in per_conference.items():
+                claimed = Conference.objects.filter(
+                    id=conference_id,
+                    current_attendees__lte=F('max_attendees') - count,
+                ).update(current_attendees=F('current_attendees') + count)
+                if not claimed:
+                    raise IntegrityError(f'المؤتمر رقم {conference_id} ممتلئ')
+            Attendance.objects.bulk_create(objects)
+            bump_counters({
+                'total_attendances': len(objects),
+                'total_attended': sum(attendance.attended for attendance in objects),
+            })
+
+
+IMPORTERS = {
+    'users': UserImporter,
+    'conferences': ConferenceImporter,
+    'attendance': AttendanceImporter,
+}
+
+# ====== تشغيل الاستيراد ======
+
+def run_import(kind, file, filename, dry_run=False, workers=1, chunk_size=IMPORT_CHUNK_SIZE, progress=None):
+    """استيراد ملف دفعة بدفعة: تحقق الدفعة ثم إدخالها جماعياً في معاملة مستقلة
+
+    الصفوف الخاطئة تُتجاوز وتُسجل في التقرير دون أن تمنع حفظ بقية الدفعة.
+    dry_run: التحقق فقط دون حفظ. progress: دالة تُستدعى بالتقرير بعد كل دفعة.
+    تعيد ImportReport.
+    """
+    importer_class = IMPORTERS[kind]
+    records = open_rows(file, filename, importer_class.columns, importer_class.required)
+    report = ImportReport(kind, dry_run)
+    hasher = PasswordHasher(workers)
+    importer = importer_class(report, hasher)
+    try:
+        while True:
+            try:
+                chunk = list(islice(records, chunk_size))
+            except UnicodeDecodeError:
+                raise ImportFileError(
+                    f'ترميز الملف غير مدعوم بعد الصف {report.rows + 1} (احفظه بترميز UTF-8)'
+                )
+            if not chunk:
+                break
+            report.rows += len(chunk)
+            importer.process_chunk(chunk)
+            if progress is not None:
+                progress(report)
+    finally:
+        records.close()
+        hasher.close()
+        importer.finish()
+    return report
+
+def request_import(user, kind, upload, dry_run=False):
+    """حفظ الملف المرفوع كمهمة استيراد معلقة
+
+    خادم الويب لا ينفذ المهمة: ينفذها العامل import_data --pending --watch بمجمع
+    عمليات لتجزئة كلمات المرور (تجزئتها واحدة تلو الأخرى في خيط واحد تستغرق ساعات
+    لعشرات آلاف المستخدمين).
+    """
+    return ImportJob.objects.create(
+        kind=kind,
+        file=upload,
+        original_name=os.path.basename(upload.name)[:255],
+        dry_run=dry_run,
+        requested_by=user,
+    )
+
+def _track_progress(job_id):
+    def progress(report):
+        ImportJob.objects.filter(id=job_id).update(
+            processed_rows=report.rows,
+            created_rows=report.created,
+            error_rows=len(report.errors),
+        )
+    return progress
+
+def run_import_job(job_id, workers=IMPORT_HASH_WORKERS):
+    """تنفيذ مهمة استيراد معلقة وحفظ تقرير الأخطاء؛ تعيد False إذا حجزها عامل آخر
+
+    تُستدعى من الأمر import_data --pending فقط، لا من داخل خادم الويب.
+    """
+    claimed = ImportJob.objects.filter(id=job_id, status='pending').update(
+        status='running',
+        started_at=timezone.now(),
+    )
+    if not claimed:
+        return False
+
+    job = ImportJob.objects.get(id=job_id)
+    fields = ['status', 'error', 'file', 'finished_at']
+    try:
+        with job.file.open('rb') as f:
+            report = run_import(
+                job.kind, f, job.original_name, job.dry_run, workers, progress=_track_progress(job.id),
+            )
+        if report.errors:
+            output = io.StringIO()
+            report.write_csv(output)
+            job.report.save('errors.csv', ContentFile(output.getvalue().encode('utf-8-sig')), save=False)
+        job.processed_rows = report.rows
+        job.created_rows = report.created
+        job.error_rows = len(report.errors)
+        job.status = 'completed'
+        fields += ['report', 'processed_rows', 'created_rows', 'error_rows']
+    except ImportFileError as e:
+        job.status = 'failed'
+        job.error = str(e)
+    except Exception as e:
+        logger.exception('فشل تنفيذ مهمة الاستيراد %s', job_id)
+        job.status = 'failed'
+        job.error = str(e)
+    finally:
+        # الملف المرفوع قد يحوي كلمات مرور: لا يبقى بعد التنفيذ
+        job.file.delete(save=False)
+    job.finished_at = timezone.now()
+    job.save(update_fields=fields)
+    return True
@@ -0,0 +1,64 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.forms.models import model_to_dict
+
+from .counters import get_counters
+
+# كل عملية تقرأ صف العدادات مرة واحدة على الأكثر خلال هذه المدة مهما كان عدد المتصفحات
+LIVE_STATS_INTERVAL = getattr(settings, 'LIVE_STATS_INTERVAL', 5)
+
+# مدة اتصال SSE الواحد قبل أن يعيد المتصفح الاتصال تلقائياً
+LIVE_STATS_STREAM_SECONDS = getattr(settings, 'LIVE_STATS_STREAM_SECONDS', 300)
+
+_snapshot_lock = threading.Lock()
+_snapshot = {'expires': 0, 'data': None, 'etag': None}
+
+
+def get_stats_snapshot():
+    """آخر لقطة من الإحصائيات مع ETag، مشتركة بين جميع الطلبات في العملية"""
+    with _snapshot_lock:
+        now = time.monotonic()
+        if _snapshot['data'] is None or now >= _snapshot['expires']:
+            counters = get_counters()
+            data = model_to_dict(counters, exclude=['id', 'reconciled_at'])
+            payload = json.dumps(data, sort_keys=True)
+            _snapshot['data'] = data
+            _snapshot['etag'] = hashlib.md5(payload.encode('utf-8')).hexdigest()
+            _snapshot['expires'] = now + LIVE_STATS_INTERVAL
+        return _snapshot['data'], _snapshot['etag']
+
+def supports_streaming(request):
+    """هل يمكن بث SSE لهذا الطلب
+
+    البث يتطلب تشغيل المشروع عبر ASGI (asgi.py مع uvicorn/daphne): خادم WSGI
+    يستهلك المولّد غير المتزامن كاملاً قبل إرسال أي شيء، فيبقى العامل محجوزاً
+    طوال LIVE_STATS_STREAM_SECONDS دون أن يصل للمتصفح شيء.
+    """
+    return isinstance(request, ASGIRequest)
+
+def _sse_event(data, etag):
+    payload = json.dumps(data, ensure_ascii=False)
+    return f'event: stats\nid: {etag}\ndata: {payload}\n\n'
+
+async def iter_stats_events(last_event_id=None):
+    """بث الإحصائيات عبر Server-Sent Events عند تغيّرها فقط"""
+    yield f'retry: {int(LIVE_STATS_INTERVAL * 1000)}\n\n'
+
+    sent_etag = last_event_id
+    deadline = time.monotonic() + LIVE_STATS_STREAM_SECONDS
+    while time.monotonic() < deadline:
+        data, etag = await sync_to_async(get_stats_snapshot)()
+        if etag != sent_etag:
+            sent_etag = etag
+            yield _sse_event(data, etag)
+        else:
+            # تعليق لإبقاء الاتصال مفتوحاً عبر الوسطاء
+            yield ': keepalive\n\n'
+        await asyncio.sleep(LIVE_STATS_INTERVAL)
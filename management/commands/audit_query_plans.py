@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from conference.query_audit import audit_query_plans
+
+
+class Command(BaseCommand):
+    help = 'فحص خطط تنفيذ استعلامات الصفحات المتكررة (EXPLAIN QUERY PLAN) والفشل عند مسح جدول كبير بالكامل'
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('هذا الفحص مخصص لقاعدة بيانات SQLite')
+
+        failures = []
+        for name, (plan, scans) in audit_query_plans().items():
+            if scans:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f'{name}: مسح كامل لـ {", ".join(scans)}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{name}: OK'))
+            if scans or options['verbosity'] > 1:
+                for line in plan:
+                    self.stdout.write(f'    {line}')
+
+        if failures:
+            raise CommandError(f'{len(failures)} استعلام يمسح جداول كبيرة بالكامل: {", ".join(failures)}')
@@ -0,0 +1,133 @@
+import statistics
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from conference.analytics import ANALYTICS_DIMENSIONS, DIMENSION_KEYS, UNSPECIFIED, compute_breakdown
+from conference.models import Attendance, Conference, Rating
+
+# حجم جدول الحضور المستهدف في القياس
+TARGET_ATTENDANCE_ROWS = 1_000_000
+
+
+def _label(conference, dimension):
+    if dimension == 'category':
+        return conference.category.name if conference.category else UNSPECIFIED
+    if dimension == 'city':
+        return conference.city.name if conference.city else UNSPECIFIED
+    if dimension == 'governorate':
+        return conference.city.governorate if conference.city else UNSPECIFIED
+    if dimension == 'organizer':
+        user = conference.organizer.user
+        return user.get_full_name() or user.username
+    return timezone.localtime(conference.start_date).strftime('%Y-%m')
+
+def _same(vectorized, naive, group_by):
+    """تطابق النتيجتين بغض النظر عن الترتيب (مع سماحية فروق التقريب في الخانة الأخيرة)"""
+    keys = [DIMENSION_KEYS.get(dimension, dimension) for dimension in group_by]
+    expected = {tuple(row[key] for key in keys): row for row in naive}
+    if len(expected) != len(vectorized):
+        return False
+    for row in vectorized:
+        other = expected.get(tuple(row[key] for key in keys))
+        if other is None or row.keys() != other.keys():
+            return False
+        for field, value in row.items():
+            if isinstance(value, float) and isinstance(other[field], float):
+                if abs(value - other[field]) > 0.01 + 1e-9:
+                    return False
+            elif value != other[field]:
+                return False
+    return True
+
+def naive_breakdown(group_by):
+    """الطريقة المباشرة للمقارنة: حلقة على كل كائن كما في دوال التصدير"""
+    groups = defaultdict(lambda: defaultdict(int))
+    labels = {}
+    keys = {}
+    for conference in Conference.objects.select_related('category', 'city', 'organizer__user'):
+        key = tuple(
+            getattr(conference, DIMENSION_KEYS[dimension]) if dimension in DIMENSION_KEYS
+            else _label(conference, dimension)
+            for dimension in group_by
+        )
+        labels[key] = {
+            dimension: _label(conference, dimension) for dimension in group_by if dimension in DIMENSION_KEYS
+        }
+        keys[conference.id] = key
+        group = groups[key]
+        group['conferences'] += 1
+        group['current_attendees'] += conference.current_attendees
+        group['max_attendees'] += conference.max_attendees
+    for attendance in Attendance.objects.all().iterator(chunk_size=5000):
+        group = groups[keys[attendance.conference_id]]
+        group['registered'] += 1
+        group['attended'] += attendance.attended
+    for rating in Rating.objects.all().iterator(chunk_size=5000):
+        group = groups[keys[rating.conference_id]]
+        group['rating_count'] += 1
+        group['rating_sum'] += rating.rating
+
+    rows = []
+    for key, group in groups.items():
+        rows.append({
+            **{DIMENSION_KEYS.get(dimension, dimension): value for dimension, value in zip(group_by, key)},
+            **labels[key],
+            'conferences': group['conferences'],
+            'registered': group['registered'],
+            'attended': group['attended'],
+            'rating_count': group['rating_count'],
+            'attendance_rate': round(group['attended'] / group['registered'], 4) if group['registered'] else None,
+            'avg_rating': round(group['rating_sum'] / group['rating_count'], 2) if group['rating_count'] else None,
+            'fill_ratio': (
+                round(group['current_attendees'] / group['max_attendees'], 4) if group['max_attendees'] else None
+            ),
+        })
+    return rows
+
+
+class Command(BaseCommand):
+    help = 'مقارنة زمن التحليلات المتجهة (pandas) بحلقة ORM مباشرة على البيانات الحالية'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--group-by', default='category',
+            help=f"بعد أو بعدان مفصولان بفاصلة من: {', '.join(ANALYTICS_DIMENSIONS)}",
+        )
+        parser.add_argument('--repeat', type=int, default=3, help='عدد مرات تنفيذ كل طريقة')
+
+    def _time(self, function, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = function()
+            timings.append(time.perf_counter() - started)
+        return result, statistics.median(timings)
+
+    def handle(self, *args, **options):
+        group_by = options['group_by'].split(',')
+        if any(dimension not in ANALYTICS_DIMENSIONS for dimension in group_by):
+            raise CommandError(f"الأبعاد المتاحة: {', '.join(ANALYTICS_DIMENSIONS)}")
+
+        rows = Attendance.objects.count()
+        self.stdout.write(f'صفوف الحضور: {rows:,}')
+        if rows < TARGET_ATTENDANCE_ROWS:
+            self.stdout.write(self.style.WARNING(
+                f'أقل من {TARGET_ATTENDANCE_ROWS:,} صف (generate_synthetic_data --scale 140 يقارب المليون)'
+            ))
+
+        vectorized, vectorized_time = self._time(lambda: compute_breakdown(group_by), options['repeat'])
+        naive, naive_time = self._time(lambda: naive_breakdown(group_by), options['repeat'])
+
+        self.stdout.write(f'المتجهة (pandas): {vectorized_time * 1000:,.1f} ms')
+        self.stdout.write(f'حلقة ORM: {naive_time * 1000:,.1f} ms')
+        if not _same(vectorized, naive, group_by):
+            raise CommandError('النتائج مختلفة بين الطريقتين')
+        self.stdout.write(self.style.SUCCESS(
+            f'النتائج متطابقة ({len(vectorized)} مجموعة)، التسريع {naive_time / vectorized_time:,.1f}x'
+        ))
+        if settings.DEBUG:
+            self.stdout.write(self.style.WARNING('DEBUG مفعل: حفظ الاستعلامات يبطئ الحلقة المباشرة'))
@@ -0,0 +1,74 @@
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from conference.models import Conference, ConferenceRequest, UserProfile
+from conference.moderation import review_conference_requests
+
+
+class Command(BaseCommand):
+    help = 'مقارنة زمن مراجعة الطلبات واحداً واحداً مع المراجعة الجماعية (دون حفظ أي بيانات)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=1000, help='عدد الطلبات في كل تجربة')
+
+    def _create_requests(self, organizer, count, label):
+        now = timezone.now()
+        conferences = Conference.objects.bulk_create([
+            Conference(
+                title=f'{label} {i}',
+                description='benchmark',
+                organizer=organizer,
+                start_date=now + timedelta(days=30),
+                end_date=now + timedelta(days=31),
+                location='benchmark',
+            )
+            for i in range(count)
+        ])
+        requests = ConferenceRequest.objects.bulk_create([
+            ConferenceRequest(conference=conference, requested_by=organizer, request_type='approval')
+            for conference in conferences
+        ])
+        return [req.id for req in requests]
+
+    def _review_one_by_one(self, request_ids, reviewer):
+        """الطريقة السابقة: استعلامان وحفظان لكل طلب"""
+        for request_id in request_ids:
+            conf_request = ConferenceRequest.objects.get(id=request_id)
+            conf_request.status = 'approved'
+            conf_request.reviewed_by = reviewer
+            conf_request.reviewed_at = timezone.now()
+            conf_request.save()
+            conf_request.conference.status = 'approved'
+            conf_request.conference.save()
+
+    def handle(self, *args, **options):
+        count = options['count']
+        reviewer = User.objects.filter(userprofile__user_type='admin').first()
+        organizer = UserProfile.objects.first()
+        if reviewer is None or organizer is None:
+            raise CommandError('يجب وجود مدير ومستخدم واحد على الأقل في قاعدة البيانات')
+
+        with transaction.atomic():
+            legacy_ids = self._create_requests(organizer, count, 'legacy')
+            batch_ids = self._create_requests(organizer, count, 'batch')
+
+            started = time.perf_counter()
+            self._review_one_by_one(legacy_ids, reviewer)
+            legacy_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            review_conference_requests(batch_ids, 'approve', reviewer)
+            batch_seconds = time.perf_counter() - started
+
+            # لا نحفظ بيانات التجربة
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'طلب واحد في كل مرة: {legacy_seconds:.3f} ث ({count} طلب)')
+        self.stdout.write(f'مراجعة جماعية:      {batch_seconds:.3f} ث ({count} طلب)')
+        if batch_seconds:
+            self.stdout.write(self.style.SUCCESS(f'التسريع: {legacy_seconds / batch_seconds:.1f}x'))
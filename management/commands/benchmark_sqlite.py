@@ -0,0 +1,101 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from conference.sqlite_profile import SQLITE_PRAGMAS, apply_pragmas
+
+# الإعداد السابق: وضع rollback journal، ومهلة sqlite3 الافتراضية، واتصال جديد لكل طلب
+BEFORE_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL'}
+
+
+class Command(BaseCommand):
+    help = 'قياس إنتاجية القراءة/الكتابة المختلطة في SQLite قبل إعدادات الإنتاج وبعدها'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--write-ratio', type=float, default=0.2, help='نسبة عمليات الكتابة')
+        parser.add_argument('--rows', type=int, default=10000)
+
+    def _prepare(self, path, pragmas, rows):
+        db = sqlite3.connect(path)
+        apply_pragmas(db.cursor(), pragmas)
+        db.execute('CREATE TABLE items (id INTEGER PRIMARY KEY, counter INTEGER, payload TEXT)')
+        db.executemany(
+            'INSERT INTO items (id, counter, payload) VALUES (?, 0, ?)',
+            ((i, 'x' * 200) for i in range(1, rows + 1)),
+        )
+        db.commit()
+        db.close()
+
+    def _run(self, path, persistent, pragmas, options):
+        deadline = time.monotonic() + options['seconds']
+        totals = {'reads': 0, 'writes': 0, 'errors': 0}
+        lock = threading.Lock()
+        rows = options['rows']
+
+        def connect():
+            db = sqlite3.connect(path)
+            if persistent:
+                apply_pragmas(db.cursor(), pragmas)
+            return db
+
+        def worker():
+            counts = {'reads': 0, 'writes': 0, 'errors': 0}
+            db = connect() if persistent else None
+            while time.monotonic() < deadline:
+                # بدون اتصال دائم: اتصال جديد لكل "طلب" كما يفعل Django مع CONN_MAX_AGE=0
+                conn = db or connect()
+                try:
+                    if random.random() < options['write_ratio']:
+                        with conn:
+                            conn.execute(
+                                'UPDATE items SET counter = counter + 1 WHERE id = ?',
+                                (random.randint(1, rows),),
+                            )
+                        counts['writes'] += 1
+                    else:
+                        start = random.randint(1, rows - 100)
+                        conn.execute(
+                            'SELECT SUM(counter) FROM items WHERE id BETWEEN ? AND ?',
+                            (start, start + 100),
+                        ).fetchone()
+                        counts['reads'] += 1
+                except sqlite3.OperationalError:
+                    counts['errors'] += 1
+                finally:
+                    if not db:
+                        conn.close()
+            if db:
+                db.close()
+            with lock:
+                for key, value in counts.items():
+                    totals[key] += value
+
+        threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return totals
+
+    def handle(self, *args, **options):
+        profiles = [
+            ('قبل', False, BEFORE_PRAGMAS),
+            ('بعد', True, SQLITE_PRAGMAS),
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            for label, persistent, pragmas in profiles:
+                path = os.path.join(directory, f'{label}.sqlite3')
+                self._prepare(path, pragmas, options['rows'])
+                totals = self._run(path, persistent, pragmas, options)
+                ops = (totals['reads'] + totals['writes']) / options['seconds']
+                self.stdout.write(
+                    f"{label}: {ops:,.0f} عملية/ث "
+                    f"(قراءة {totals['reads']:,}، كتابة {totals['writes']:,}، أخطاء قفل {totals['errors']:,})"
+                )
@@ -0,0 +1,342 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from contextlib import ExitStack, contextmanager
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+
+from conference.avatars import avatar_variant_urls
+from conference.counters import get_counters
+from conference.exports import REPORTS
+from conference.models import Conference, ConferenceRequest, ExportJob, ImportJob, UserProfile
+from conference.synthetic_data import SYNTHETIC_PASSWORD
+
+# نسبة الزيادة في الزمن (الوسيط) التي تُعد تراجعاً عند المقارنة بنتائج سابقة
+REGRESSION_THRESHOLD = 0.2
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def _rolled_back():
+    """تنفيذ طلبات الكتابة دون حفظ أي تغيير"""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+class Command(BaseCommand):
+    help = 'قياس زمن كل صفحة وعدد استعلاماتها وذروة الذاكرة، وحفظ النتائج في ملف JSON للمقارنة بين الإصدارات'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='عدد مرات تنفيذ كل طلب')
+        parser.add_argument('--output', default='benchmark_results.json', help='ملف النتائج')
+        parser.add_argument('--compare', help='ملف نتائج سابق للمقارنة')
+        parser.add_argument('--only', help='قياس الحالات التي تبدأ أسماؤها بهذه البادئة فقط')
+
+    def _cases(self, attendee):
+        """الحالات المقاسة: جميع صفحات views.py ومسارات التصدير
+
+        live_stats_stream غير مشمول: بث SSE يبقى مفتوحاً عدة دقائق. ولا رفع ملف
+        الاستيراد: يحفظ الملف في MEDIA_ROOT ولا يُلغى مع المعاملة.
+        """
+        conference = (
+            Conference.objects.filter(status__in=['approved', 'active'])
+            .order_by('-rating_summary__rating_count').first()
+            or Conference.objects.order_by('id').first()
+        )
+        pending_ids = list(
+            ConferenceRequest.objects.filter(status='pending').order_by('id').values_list('id', flat=True)[:50]
+        )
+        job = ExportJob.objects.filter(status='completed', expires_at__gt=timezone.now()).exclude(file='').first()
+        import_job = ImportJob.objects.order_by('-created_at').first()
+        avatar_owner = (
+            UserProfile.objects.exclude(profile_picture='').filter(avatar_processed_at__isnull=False)
+            .only('id', 'profile_picture', 'avatar_processed_at').first()
+        )
+
+        cases = [
+            {'name': 'home', 'url': reverse('home')},
+            {'name': 'home.search', 'url': reverse('home') + '?q=مؤتمر'},
+            {'name': 'home.authenticated', 'url': reverse('home'), 'user': 'attendee'},
+            {'name': 'login', 'url': reverse('login')},
+            {
+                'name': 'login.submit', 'url': reverse('login'), 'method': 'post', 'writes': True,
+                'data': {'username': attendee.user.username, 'password': SYNTHETIC_PASSWORD},
+            },
+            {'name': 'logout', 'url': reverse('logout'), 'user': 'attendee', 'writes': True},
+            {'name': 'dashboard', 'url': reverse('dashboard'), 'user': 'admin'},
+            {'name': 'live_stats', 'url': reverse('live_stats'), 'user': 'admin'},
+            {'name': 'user_profile', 'url': reverse('user_profile'), 'user': 'attendee'},
+            {'name': 'edit_profile', 'url': reverse('edit_profile'), 'user': 'attendee'},
+            {
+                'name': 'edit_profile.submit', 'url': reverse('edit_profile'), 'method': 'post',
+                'user': 'attendee', 'writes': True, 'data': {'first_name': 'قياس', 'bio': 'قياس الأداء'},
+            },
+            {'name': 'change_password', 'url': reverse('change_password'), 'user': 'attendee'},
+            {'name': 'manage_users', 'url': reverse('manage_users'), 'user': 'admin'},
+            {
+                'name': 'manage_users.filtered', 'user': 'admin',
+                'url': reverse('manage_users') + '?user_type=organizer&is_approved=1',
+            },
+            {
+                'name': 'manage_users.approve_filtered', 'url': reverse('manage_users'), 'method': 'post',
+                'user': 'admin', 'writes': True,
+                'data': {'action': 'approve', 'scope': 'filtered', 'user_type': 'attendee'},
+            },
+            {'name': 'conferences_list', 'url': reverse('conferences_list'), 'user': 'admin'},
+            {
+                'name': 'conferences_list.status', 'user': 'admin',
+                'url': reverse('conferences_list') + '?status=pending',
+            },
+            {
+                'name': 'conferences_list.search', 'user': 'admin',
+                'url': reverse('conferences_list') + '?q=مؤتمر',
+            },
+            {'name': 'conference_requests', 'url': reverse('conference_requests'), 'user': 'admin'},
+            {
+                'name': 'review_requests_api', 'url': reverse('review_requests_api'), 'method': 'post',
+                'user': 'admin', 'writes': True, 'json': True,
+                'data': {'request_ids': pending_ids, 'action': 'approve'},
+            },
+            {'name': 'manage_categories', 'url': reverse('manage_categories'), 'user': 'admin'},
+            {'name': 'platform_statistics', 'url': reverse('platform_statistics'), 'user': 'admin'},
+            {
+                'name': 'analytics_api', 'user': 'admin',
+                'url': reverse('analytics_api') + '?group_by=category',
+            },
+            {
+                'name': 'analytics_api.two_dimensions', 'user': 'admin',
+                'url': reverse('analytics_api') + '?group_by=governorate,month&status=completed',
+            },
+            {
+                'name': 'platform_statistics.multi_year', 'user': 'admin',
+                'url': reverse('platform_statistics') + '?start=2020-01-01&interval=week',
+            },
+            {'name': 'system_settings', 'url': reverse('system_settings'), 'user': 'admin'},
+            {'name': 'export_reports', 'url': reverse('export_reports'), 'user': 'admin'},
+            {
+                'name': 'export_reports.background', 'user': 'admin', 'writes': True,
+                'url': reverse('export_reports') + '?type=users&format=csv&mode=background',
+            },
+            {'name': 'import_data', 'url': reverse('import_data'), 'user': 'admin'},
+        ]
+        if conference is not None:
+            cases += [
+                {
+                    'name': 'conference_ratings', 'user': 'admin',
+                    'url': reverse('conference_ratings', args=[conference.id]),
+                },
+                {
+                    'name': 'register_for_conference', 'method': 'post', 'user': 'attendee', 'writes': True,
+                    'url': reverse('register_for_conference', args=[conference.id]),
+                },
+                {
+                    'name': 'register_for_conference_api', 'method': 'post', 'user': 'attendee', 'writes': True,
+                    'url': reverse('register_for_conference_api', args=[conference.id]),
+                },
+            ]
+        if job is not None:
+            cases += [
+                {'name': 'export_job_status', 'url': reverse('export_job_status', args=[job.id]), 'user': 'admin'},
+                {
+                    'name': 'export_job_download', 'user': 'admin',
+                    'url': reverse('export_job_download', args=[job.id]),
+                },
+            ]
+        if import_job is not None:
+            cases.append({
+                'name': 'import_job_status', 'user': 'admin',
+                'url': reverse('import_job_status', args=[import_job.id]),
+            })
+            if import_job.report:
+                cases.append({
+                    'name': 'import_job_report', 'user': 'admin',
+                    'url': reverse('import_job_report', args=[import_job.id]),
+                })
+        if avatar_owner is not None:
+            # رابط النسخة يمر بالمسار avatar_file (ملف فعلي من MEDIA_ROOT)
+            cases.append({
+                'name': 'avatar_file', 'url': avatar_variant_urls(avatar_owner, 'medium')['webp'][0],
+            })
+        for report_type in REPORTS:
+            for format_type in ('csv', 'excel'):
+                cases.append({
+                    'name': f'export.{report_type}.{format_type}', 'user': 'admin',
+                    'url': reverse('export_reports') + f'?type={report_type}&format={format_type}',
+                })
+        return cases
+
+    def _client(self, user):
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+        return client
+
+    def _request(self, client, case):
+        method = getattr(client, case.get('method', 'get'))
+        if case.get('json'):
+            response = method(case['url'], json.dumps(case['data']), content_type='application/json')
+        else:
+            response = method(case['url'], case.get('data'))
+        if response.streaming:
+            # التقرير المتدفق يُبنى أثناء القراءة، فيدخل في القياس
+            for _ in response.streaming_content:
+                pass
+        return response
+
+    def _run(self, case, clients, users):
+        """تنفيذ الحالة مرة واحدة: (رمز الاستجابة، الزمن بالثواني، عدد الاستعلامات)"""
+        cache.clear()
+        counter = _QueryCounter()
+        with ExitStack() as stack:
+            if case.get('writes'):
+                stack.enter_context(_rolled_back())
+                client = self._client(users[case.get('user')])
+            else:
+                client = clients[case.get('user')]
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(counter))
+            started = time.perf_counter()
+            response = self._request(client, case)
+            elapsed = time.perf_counter() - started
+        return response.status_code, elapsed, counter.count
+
+    def _peak_memory(self, case, clients, users):
+        """ذروة الذاكرة (KB) في تشغيل منفصل، لأن tracemalloc يبطئ القياس الزمني"""
+        tracemalloc.start()
+        try:
+            tracemalloc.reset_peak()
+            self._run(case, clients, users)
+            return tracemalloc.get_traced_memory()[1] // 1024
+        finally:
+            tracemalloc.stop()
+
+    def _benchmark(self, case, clients, users, repeat):
+        result = {'name': case['name'], 'method': case.get('method', 'get').upper(), 'url': case['url']}
+        try:
+            # تشغيل تمهيدي لا يُحسب (قوالب، اتصالات، استيراد كسول)
+            self._run(case, clients, users)
+            runs = [self._run(case, clients, users) for _ in range(repeat)]
+            timings = [elapsed * 1000 for _, elapsed, _ in runs]
+            result.update({
+                'status': runs[-1][0],
+                'queries': runs[-1][2],
+                'wall_ms': {
+                    'min': round(min(timings), 2),
+                    'median': round(statistics.median(timings), 2),
+                    'max': round(max(timings), 2),
+                },
+                'peak_memory_kb': self._peak_memory(case, clients, users),
+            })
+        except Exception as e:
+            result['error'] = f'{type(e).__name__}: {e}'
+        return result
+
+    def _git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def _compare(self, results, path, threshold):
+        with open(path, encoding='utf-8') as f:
+            previous = {result['name']: result for result in json.load(f)['results']}
+
+        regressions = 0
+        for result in results:
+            before = previous.get(result['name'])
+            if before is None or 'error' in before or 'error' in result:
+                continue
+            old, new = before['wall_ms']['median'], result['wall_ms']['median']
+            change = (new - old) / old if old else 0
+            line = (
+                f"{result['name']}: {old:.1f} -> {new:.1f} ms ({change:+.0%})، "
+                f"استعلامات {before['queries']} -> {result['queries']}"
+            )
+            if change > threshold or result['queries'] > before['queries']:
+                regressions += 1
+                self.stdout.write(self.style.WARNING(line))
+            else:
+                self.stdout.write(line)
+        if regressions:
+            self.stdout.write(self.style.WARNING(f'تراجع في {regressions} حالة'))
+        else:
+            self.stdout.write(self.style.SUCCESS('لا يوجد تراجع'))
+
+    def handle(self, *args, **options):
+        admin = UserProfile.objects.filter(user_type='admin').select_related('user').first()
+        attendee = UserProfile.objects.filter(user_type='attendee').select_related('user').first()
+        if admin is None or attendee is None:
+            raise CommandError('يجب وجود مدير ومشارك في قاعدة البيانات (استخدم generate_synthetic_data)')
+
+        # يسمح بالمضيف testserver ويُبقي البريد في الذاكرة
+        setup_test_environment()
+        users = {None: None, 'admin': admin.user, 'attendee': attendee.user}
+        clients = {key: self._client(user) for key, user in users.items()}
+        try:
+            cases = self._cases(attendee)
+            if options['only']:
+                cases = [case for case in cases if case['name'].startswith(options['only'])]
+            results = []
+            for case in cases:
+                result = self._benchmark(case, clients, users, options['repeat'])
+                results.append(result)
+                if 'error' in result:
+                    self.stdout.write(self.style.ERROR(f"{case['name']}: {result['error']}"))
+                else:
+                    self.stdout.write(
+                        f"{case['name']}: {result['wall_ms']['median']:.1f} ms، "
+                        f"{result['queries']} استعلام، {result['peak_memory_kb']:,} KB "
+                        f"(HTTP {result['status']})"
+                    )
+        finally:
+            for client in clients.values():
+                client.logout()
+            teardown_test_environment()
+
+        counters = get_counters()
+        report = {
+            'meta': {
+                'commit': self._git_commit(),
+                'created_at': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': settings.DATABASES['default']['ENGINE'],
+                'repeat': options['repeat'],
+                'rows': {
+                    'users': counters.total_users,
+                    'conferences': counters.total_conferences,
+                    'ratings': counters.total_ratings,
+                    'attendances': counters.total_attendances,
+                },
+            },
+            'results': results,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"تم حفظ النتائج في {options['output']}"))
+
+        if options['compare']:
+            self._compare(results, options['compare'], REGRESSION_THRESHOLD)
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from conference.synthetic_data import SYNTHETIC_BATCH_SIZE, SYNTHETIC_PASSWORD, generate_synthetic_data
+
+
+class Command(BaseCommand):
+    help = 'توليد بيانات تجريبية بأحجام واقعية (مستخدمون، مؤتمرات، طلبات، تقييمات، حضور) لقياس الأداء'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=1.0,
+            help='معامل الحجم: 1 = ألف مستخدم ومئتا مؤتمر',
+        )
+        parser.add_argument('--seed', type=int, default=None, help='بذرة العشوائية لتكرار نفس البيانات')
+        parser.add_argument('--prefix', default='demo', help='بادئة أسماء المستخدمين المولدين')
+        parser.add_argument('--batch-size', type=int, default=SYNTHETIC_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        counts = generate_synthetic_data(
+            scale=options['scale'],
+            seed=options['seed'],
+            prefix=options['prefix'],
+            batch_size=options['batch_size'],
+        )
+        elapsed = time.perf_counter() - started
+
+        for table, count in counts.items():
+            self.stdout.write(f'{table}: {count:,}')
+        self.stdout.write(self.style.SUCCESS(
+            f'تم توليد البيانات خلال {elapsed:.1f} ثانية (كلمة المرور: {SYNTHETIC_PASSWORD})'
+        ))
@@ -0,0 +1,81 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from conference.imports import (
+    IMPORT_CHUNK_SIZE, IMPORT_HASH_WORKERS, IMPORTERS, ImportFileError, run_import, run_import_job,
+)
+from conference.models import ImportJob
+
+
+class Command(BaseCommand):
+    help = 'استيراد المستخدمين أو المؤتمرات أو الحضور من ملف CSV/XLSX مع تقرير بأخطاء الصفوف'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', nargs='?', choices=list(IMPORTERS), help='نوع البيانات')
+        parser.add_argument('path', nargs='?', help='مسار الملف (.csv أو .xlsx)')
+        parser.add_argument('--dry-run', action='store_true', help='التحقق فقط دون حفظ')
+        parser.add_argument(
+            '--workers', type=int, default=IMPORT_HASH_WORKERS,
+            help='عدد العمليات التي تجزّئ كلمات المرور (1 = في العملية نفسها)',
+        )
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE, help='عدد الصفوف في كل دفعة')
+        parser.add_argument('--report', help='حفظ أخطاء الصفوف في ملف CSV (بدلاً من طباعتها)')
+        parser.add_argument(
+            '--pending', action='store_true',
+            help='تنفيذ مهام الاستيراد المرفوعة من صفحة الاستيراد (صفحة الاستيراد لا تنفذها بنفسها)',
+        )
+        parser.add_argument(
+            '--watch', action='store_true',
+            help='مع --pending: البقاء في العمل وتنفيذ المهام الجديدة عند رفعها',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=2.0,
+            help='الفاصل الزمني بالثواني بين فحص قائمة الانتظار (مع --watch)',
+        )
+
+    def handle(self, *args, **options):
+        if options['pending']:
+            while True:
+                self._run_pending(options['workers'])
+                if not options['watch']:
+                    return
+                time.sleep(options['interval'])
+
+        if not options['kind'] or not options['path']:
+            raise CommandError('حدد نوع البيانات ومسار الملف، أو استخدم --pending')
+
+        def progress(report):
+            self.stdout.write(f'{report.rows:,} صف: {report.created:,} صالح، {len(report.errors):,} خطأ')
+
+        try:
+            with open(options['path'], 'rb') as f:
+                report = run_import(
+                    options['kind'], f, options['path'],
+                    dry_run=options['dry_run'],
+                    workers=options['workers'],
+                    chunk_size=max(1, options['chunk_size']),
+                    progress=progress,
+                )
+        except (OSError, ImportFileError) as e:
+            raise CommandError(str(e))
+
+        if report.errors:
+            if options['report']:
+                with open(options['report'], 'w', encoding='utf-8-sig', newline='') as output:
+                    report.write_csv(output)
+                self.stdout.write(f"تقرير الأخطاء: {options['report']}")
+            else:
+                for row, message in report.errors:
+                    self.stdout.write(f'الصف {row}: {message}')
+        action = 'صالح للاستيراد' if report.dry_run else 'تم استيراده'
+        self.stdout.write(self.style.SUCCESS(f'{report.created:,} من {report.rows:,} صف {action}'))
+        if report.errors:
+            self.stdout.write(self.style.WARNING(f'{len(report.errors):,} صف فيه أخطاء'))
+
+    def _run_pending(self, workers):
+        job_ids = ImportJob.objects.filter(status='pending').order_by('created_at').values_list('id', flat=True)
+        for job_id in list(job_ids):
+            if run_import_job(job_id, workers):
+                job = ImportJob.objects.get(id=job_id)
+                self.stdout.write(f'مهمة الاستيراد {job_id}: {job.get_status_display()} {job.error}'.strip())
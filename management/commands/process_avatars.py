@@ -0,0 +1,42 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from conference.avatars import process_avatar
+from conference.export_jobs import init_worker_process
+from conference.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = 'توليد النسخ المصغرة للصور الشخصية المرفوعة سابقاً أو التي فاتتها المعالجة'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='عدد العمليات المتوازية (1 = التنفيذ في العملية نفسها)',
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='إعادة معالجة جميع الصور حتى الجاهزة منها',
+        )
+
+    def handle(self, *args, **options):
+        profiles = UserProfile.objects.exclude(profile_picture='')
+        if not options['all']:
+            profiles = profiles.filter(avatar_processed_at__isnull=True)
+        profile_ids = list(profiles.order_by('id').values_list('id', flat=True))
+
+        workers = max(1, options['workers'])
+        if workers == 1:
+            results = [process_avatar(profile_id) for profile_id in profile_ids]
+        else:
+            # لا تُورَّث اتصالات قاعدة البيانات المفتوحة للعمليات الفرعية
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker_process) as pool:
+                results = list(pool.map(process_avatar, profile_ids, chunksize=8))
+
+        processed = sum(results)
+        self.stdout.write(self.style.SUCCESS(f'تمت معالجة {processed} صورة من {len(profile_ids)}'))
+        if processed < len(profile_ids):
+            self.stdout.write(self.style.WARNING(f'تعذرت معالجة {len(profile_ids) - processed} صورة'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from conference.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'إعادة بناء فهرس البحث (FTS5) للمؤتمرات بعد التطبيع العربي'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        count = rebuild_search_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'تمت فهرسة {count} مؤتمر'))
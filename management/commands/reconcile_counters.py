@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from conference.counters import compute_counters, get_counters, reconcile_counters
+
+
+class Command(BaseCommand):
+    help = 'إعادة حساب عدادات المنصة من الجداول (بعد التحديثات الجماعية أو بشكل دوري)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='عرض الفروقات فقط دون تعديل العدادات',
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            counters = get_counters()
+            drift = {
+                field: (getattr(counters, field), value)
+                for field, value in compute_counters().items()
+                if getattr(counters, field) != value
+            }
+            for field, (stored, actual) in drift.items():
+                self.stdout.write(f'{field}: {stored} -> {actual}')
+            if not drift:
+                self.stdout.write(self.style.SUCCESS('العدادات مطابقة للجداول'))
+            return
+
+        reconcile_counters()
+        self.stdout.write(self.style.SUCCESS('تم تحديث عدادات المنصة'))
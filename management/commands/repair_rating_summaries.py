@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+
+from conference.models import ConferenceRatingSummary
+from conference.rating_summary import (
+    REPAIR_BATCH_SIZE, SUMMARY_FIELDS, compute_rating_summaries, repair_rating_summaries
+)
+
+
+class Command(BaseCommand):
+    help = 'إعادة حساب ملخصات تقييمات المؤتمرات من جدول التقييمات دفعة بدفعة'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='عرض المؤتمرات التي يختلف ملخصها فقط دون تعديل',
+        )
+        parser.add_argument(
+            '--conference', type=int, action='append', dest='conference_ids',
+            help='معرف مؤتمر محدد (يمكن تكراره)',
+        )
+        parser.add_argument('--batch-size', type=int, default=REPAIR_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options['check']:
+            self._check(options['conference_ids'], options['batch_size'])
+            return
+
+        written = repair_rating_summaries(options['conference_ids'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'تم تحديث ملخصات {written} مؤتمر'))
+
+    def _check(self, conference_ids, batch_size):
+        summaries = ConferenceRatingSummary.objects.order_by('conference_id')
+        if conference_ids:
+            summaries = summaries.filter(conference_id__in=conference_ids)
+
+        drifted = 0
+        batch = {}
+        for summary in summaries.iterator(chunk_size=batch_size):
+            batch[summary.conference_id] = {field: getattr(summary, field) for field in SUMMARY_FIELDS}
+            if len(batch) == batch_size:
+                drifted += self._report_drift(batch)
+                batch = {}
+        if batch:
+            drifted += self._report_drift(batch)
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('ملخصات التقييمات مطابقة للجداول'))
+
+    def _report_drift(self, stored):
+        drifted = 0
+        for conference_id, actual in compute_rating_summaries(list(stored)).items():
+            if stored[conference_id] != actual:
+                drifted += 1
+                self.stdout.write(f'{conference_id}: {stored[conference_id]} -> {actual}')
+        return drifted
@@ -0,0 +1,77 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from conference.export_jobs import (
+    claim_next_job, init_worker_process, purge_expired_exports,
+    requeue_stale_jobs, run_export_job,
+)
+
+
+class Command(BaseCommand):
+    help = 'تشغيل عامل محلي لتنفيذ مهام تصدير التقارير في الخلفية'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='عدد العمليات المتوازية (1 = التنفيذ في العملية نفسها)',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=2.0,
+            help='الفاصل الزمني بالثواني بين فحص قائمة الانتظار',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='تنفيذ المهام المنتظرة ثم الخروج',
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        interval = options['interval']
+        once = options['once']
+
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(f'تمت إعادة {requeued} مهمة عالقة إلى قائمة الانتظار')
+
+        if workers == 1:
+            self._run_inline(interval, once)
+        else:
+            self._run_pool(workers, interval, once)
+
+    def _run_inline(self, interval, once):
+        while True:
+            purge_expired_exports()
+            job_id = claim_next_job()
+            if job_id is None:
+                if once:
+                    return
+                time.sleep(interval)
+                continue
+            run_export_job(job_id)
+            self.stdout.write(f'تم تنفيذ مهمة التصدير {job_id}')
+
+    def _run_pool(self, workers, interval, once):
+        running = set()
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker_process) as pool:
+            while True:
+                purge_expired_exports()
+                while len(running) < workers:
+                    job_id = claim_next_job()
+                    if job_id is None:
+                        break
+                    # لا تُورَّث اتصالات قاعدة البيانات المفتوحة للعمليات الفرعية
+                    connections.close_all()
+                    running.add(pool.submit(run_export_job, job_id))
+
+                if not running:
+                    if once:
+                        return
+                    time.sleep(interval)
+                    continue
+
+                done, running = wait(running, timeout=interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self.stdout.write(f'تم تنفيذ مهمة التصدير {future.result()}')
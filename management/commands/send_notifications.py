@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from conference.notifications import (
+    NOTIFICATION_BATCH_SIZE, NOTIFICATION_FANOUT_PAGE_SIZE,
+    deliver_notifications, expand_notifications, requeue_stale_deliveries,
+)
+
+
+class Command(BaseCommand):
+    help = 'تشغيل عامل يوزع إشعارات صندوق الصادر على المستلمين ويرسلها بالبريد على دفعات'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=NOTIFICATION_BATCH_SIZE,
+            help='عدد الرسائل المرسلة عبر اتصال SMTP واحد',
+        )
+        parser.add_argument(
+            '--page-size', type=int, default=NOTIFICATION_FANOUT_PAGE_SIZE,
+            help='عدد المسجلين الذين يُوزَّع عليهم إشعار المؤتمر في كل صفحة',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5.0,
+            help='الفاصل الزمني بالثواني بين فحص صندوق الصادر',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='إرسال كل ما هو مستحق الآن ثم الخروج',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        page_size = max(1, options['page_size'])
+
+        requeued = requeue_stale_deliveries()
+        if requeued:
+            self.stdout.write(f'تمت إعادة {requeued} رسالة عالقة إلى قائمة الانتظار')
+
+        while True:
+            expanded = expand_notifications(page_size=page_size)
+            sent, failed = deliver_notifications(batch_size)
+            if sent or failed:
+                self.stdout.write(f'أُرسلت {sent} رسالة' + (f'، وأُجلت {failed}' if failed else ''))
+            if expanded or sent or failed:
+                continue
+            if options['once']:
+                return
+            time.sleep(options['interval'])
+            requeue_stale_deliveries()
@@ -0,0 +1,34 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from conference.db_router import REPLICA_DB_ALIAS, snapshot_sqlite_replica
+
+
+class Command(BaseCommand):
+    help = 'تحديث نسخة القراءة (SQLite) من القاعدة الأساسية، مرة واحدة أو دورياً'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='إعادة النسخ كل عدد من الثواني (0 = مرة واحدة)',
+        )
+
+    def handle(self, *args, **options):
+        replica = settings.DATABASES.get(REPLICA_DB_ALIAS)
+        if replica is None or replica['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError(f'لا توجد نسخة قراءة SQLite باسم "{REPLICA_DB_ALIAS}" في DATABASES')
+        if settings.DATABASES['default']['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError('النسخ باللقطات متاح فقط عندما تكون القاعدة الأساسية SQLite')
+
+        while True:
+            elapsed = snapshot_sqlite_replica()
+            self.stdout.write(self.style.SUCCESS(
+                f'تم تحديث نسخة القراءة {replica["NAME"]} خلال {elapsed:.2f} ثانية'
+            ))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from conference.registration import sync_current_attendees
+
+
+class Command(BaseCommand):
+    help = 'إعادة حساب عدد المشاركين الحالي لكل مؤتمر من سجلات الحضور'
+
+    def handle(self, *args, **options):
+        updated = sync_current_attendees()
+        self.stdout.write(self.style.SUCCESS(f'تم تحديث {updated} مؤتمر'))
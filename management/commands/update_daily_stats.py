@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from conference.rollups import ROLLUP_SOURCES, update_daily_stats
+
+
+class Command(BaseCommand):
+    help = 'تحديث جداول الإحصاءات اليومية تدريجياً من آخر يوم محسوب (يُشغّل دورياً)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help='إعادة حساب التاريخ كله بدلاً من الأيام الأخيرة فقط',
+        )
+        parser.add_argument(
+            '--metric', action='append', choices=list(ROLLUP_SOURCES),
+            help='تحديث مقياس محدد فقط (يمكن تكراره)',
+        )
+
+    def handle(self, *args, **options):
+        written = update_daily_stats(metrics=options['metric'], rebuild=options['rebuild'])
+        for metric, rows in written.items():
+            self.stdout.write(f'{metric}: {rows} صف')
+        self.stdout.write(self.style.SUCCESS('تم تحديث الإحصاءات اليومية'))
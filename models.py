@@ -1,4 +1,8 @@
+import os
+import uuid
+
 from django.db import models
+from django.db.models import Q
 from django.contrib.auth.models import User
 from django.utils import timezone
 
@@ -27,9 +31,18 @@ class UserProfile(models.Model):
     city = models.ForeignKey(SyrianCity, on_delete=models.SET_NULL, null=True)
     bio = models.TextField(blank=True)
     profile_picture = models.ImageField(upload_to='profile_pics/', blank=True)
+    # وقت توليد النسخ المصغرة للصورة الحالية (None: لم تُعالج بعد فتُعرض الأصلية)
+    avatar_processed_at = models.DateTimeField(null=True, blank=True, editable=False)
     is_approved = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            # قائمة المستخدمين وآخر المسجلين والمسجلين هذا الأسبوع (مع فلتر النوع أو بدونه)
+            models.Index(fields=['-created_at', '-id'], name='userprofile_created_idx'),
+            models.Index(fields=['user_type', '-created_at', '-id'], name='userprofile_type_created_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.get_user_type_display()}"
 
@@ -70,6 +83,15 @@ class Conference(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            # ترتيب قائمة المؤتمرات والترقيم بالمؤشر (مع فلتر الحالة أو بدونه)
+            models.Index(fields=['-created_at', '-id'], name='conference_created_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='conference_status_created_idx'),
+            # المؤتمرات القادمة المتاحة في الصفحة الرئيسية
+            models.Index(fields=['status', 'start_date'], name='conference_status_start_idx'),
+        ]
+    
     def __str__(self):
         return self.title
 
@@ -87,6 +109,12 @@ class ConferenceRequest(models.Model):
     reviewed_at = models.DateTimeField(null=True, blank=True)
     reviewed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     
+    class Meta:
+        indexes = [
+            # الطلبات قيد الانتظار الأحدث أولاً
+            models.Index(fields=['status', '-created_at'], name='request_status_created_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.conference.title} - {self.request_type}"
 
@@ -99,6 +127,12 @@ class Rating(models.Model):
     
     class Meta:
         unique_together = ['conference', 'user']
+        indexes = [
+            # صفحة تقييمات المؤتمر الأحدث أولاً
+            models.Index(fields=['conference', '-created_at', '-id'], name='rating_conference_created_idx'),
+            # التحديث التدريجي للإحصاءات اليومية (rollups.py)
+            models.Index(fields=['created_at'], name='rating_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.conference.title} - {self.rating} stars"
@@ -112,6 +146,14 @@ class Attendance(models.Model):
     
     class Meta:
         unique_together = ['conference', 'user']
+        indexes = [
+            # إحصاءات الحضور الفعلي (فهرس جزئي: SQLite يكتب الشرط "attended" دون مقارنة
+            # فلا يستفيد من فهرس عادي على العمود)
+            models.Index(fields=['conference'], condition=Q(attended=True), name='attendance_attended_idx'),
+            # التحديث التدريجي للإحصاءات اليومية (rollups.py)
+            models.Index(fields=['registered_at'], name='attendance_registered_idx'),
+            models.Index(fields=['attended_at'], name='attendance_attended_at_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user} - {self.conference}"
@@ -124,4 +166,277 @@ class SystemSetting(models.Model):
     updated_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     
     def __str__(self):
-        return self.key
\ No newline at end of file
+        return self.key
+
+def export_file_path(instance, filename):
+    """اسم عشوائي لملف التقرير: يحوي بيانات المستخدمين فلا يُترك باسم يمكن تخمينه"""
+    extension = os.path.splitext(filename)[1].lower()
+    return f'exports/{uuid.uuid4().hex}{extension}'
+
+class ExportJob(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'قيد الانتظار'),
+        ('running', 'قيد التنفيذ'),
+        ('completed', 'مكتمل'),
+        ('failed', 'فشل'),
+        ('expired', 'منتهي الصلاحية'),
+    ]
+    FORMAT_CHOICES = [
+        ('excel', 'Excel'),
+        ('csv', 'CSV'),
+    ]
+    
+    report_type = models.CharField(max_length=20)  # users, conferences, ratings
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default='excel')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    total_rows = models.IntegerField(default=0)
+    processed_rows = models.IntegerField(default=0)
+    file = models.FileField(upload_to=export_file_path, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # آخر تقدم سجله العامل (عند الحجز ومع كل دفعة صفوف)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            # قائمة انتظار العمال، وإعادة استخدام تقرير حديث، وآخر المهام في صفحة التصدير
+            models.Index(fields=['status', 'created_at'], name='exportjob_status_created_idx'),
+            models.Index(fields=['report_type', 'format', '-created_at'], name='exportjob_report_created_idx'),
+            models.Index(fields=['-created_at'], name='exportjob_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.report_type} ({self.format}) - {self.get_status_display()}"
+    
+    @property
+    def progress(self):
+        """نسبة الإنجاز"""
+        if self.status == 'completed':
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(100, int(self.processed_rows * 100 / self.total_rows))
+    
+    @property
+    def is_downloadable(self):
+        return (
+            self.status == 'completed'
+            and bool(self.file)
+            and (self.expires_at is None or self.expires_at > timezone.now())
+        )
+
+def import_upload_path(instance, filename):
+    """اسم عشوائي للملف المرفوع: قد يحوي كلمات مرور فلا يُترك باسم يمكن تخمينه"""
+    extension = os.path.splitext(filename)[1].lower()
+    return f'imports/{uuid.uuid4().hex}{extension}'
+
+def import_report_path(instance, filename):
+    """اسم عشوائي لتقرير الأخطاء: يكرر قيم الصفوف (أسماء المستخدمين والبريد)"""
+    return f'imports/reports/{uuid.uuid4().hex}.csv'
+
+class ImportJob(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'قيد الانتظار'),
+        ('running', 'قيد التنفيذ'),
+        ('completed', 'مكتمل'),
+        ('failed', 'فشل'),
+    ]
+    KIND_CHOICES = [
+        ('users', 'المستخدمون'),
+        ('conferences', 'المؤتمرات'),
+        ('attendance', 'الحضور'),
+    ]
+    
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    file = models.FileField(upload_to=import_upload_path, blank=True)
+    original_name = models.CharField(max_length=255)
+    dry_run = models.BooleanField(default=False)
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    processed_rows = models.IntegerField(default=0)
+    created_rows = models.IntegerField(default=0)
+    error_rows = models.IntegerField(default=0)
+    report = models.FileField(upload_to=import_report_path, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='importjob_status_created_idx'),
+            models.Index(fields=['-created_at'], name='importjob_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} ({self.original_name}) - {self.get_status_display()}"
+
+class PlatformCounters(models.Model):
+    """عدادات المنصة المحسوبة مسبقاً (صف واحد تحدّثه الإشارات)"""
+    total_users = models.IntegerField(default=0)
+    approved_users = models.IntegerField(default=0)
+    admin_users = models.IntegerField(default=0)
+    organizer_users = models.IntegerField(default=0)
+    speaker_users = models.IntegerField(default=0)
+    attendee_users = models.IntegerField(default=0)
+    total_conferences = models.IntegerField(default=0)
+    pending_conferences = models.IntegerField(default=0)
+    approved_conferences = models.IntegerField(default=0)
+    rejected_conferences = models.IntegerField(default=0)
+    active_conferences = models.IntegerField(default=0)
+    completed_conferences = models.IntegerField(default=0)
+    cancelled_conferences = models.IntegerField(default=0)
+    total_ratings = models.IntegerField(default=0)
+    total_attendances = models.IntegerField(default=0)
+    total_attended = models.IntegerField(default=0)
+    pending_requests = models.IntegerField(default=0)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name_plural = "Platform Counters"
+    
+    def __str__(self):
+        return f"عدادات المنصة ({self.reconciled_at})"
+
+class ConferenceRatingSummary(models.Model):
+    """ملخص تقييمات المؤتمر المحسوب مسبقاً (تحدّثه الإشارات مع كل تقييم)"""
+    conference = models.OneToOneField(
+        Conference, on_delete=models.CASCADE, primary_key=True, related_name='rating_summary'
+    )
+    rating_count = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
+    stars_1 = models.IntegerField(default=0)
+    stars_2 = models.IntegerField(default=0)
+    stars_3 = models.IntegerField(default=0)
+    stars_4 = models.IntegerField(default=0)
+    stars_5 = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = "Conference Rating Summaries"
+    
+    def __str__(self):
+        return f"{self.conference_id} - {self.average}/5"
+    
+    @property
+    def average(self):
+        """متوسط التقييم مقرباً لمنزلة واحدة"""
+        if not self.rating_count:
+            return 0
+        return round(self.rating_sum / self.rating_count, 1)
+    
+    @property
+    def histogram(self):
+        """توزيع النجوم من 5 إلى 1: (النجوم، العدد، النسبة المئوية)"""
+        return [
+            (
+                stars,
+                getattr(self, f'stars_{stars}'),
+                round(getattr(self, f'stars_{stars}') * 100 / self.rating_count) if self.rating_count else 0,
+            )
+            for stars in range(5, 0, -1)
+        ]
+
+class DailyStat(models.Model):
+    """إحصاءات يومية مجمعة مسبقاً لكل مقياس وحالة وتصنيف ومدينة (يحدّثها update_daily_stats)"""
+    METRIC_CHOICES = [
+        ('new_users', 'مستخدمون جدد'),
+        ('new_conferences', 'مؤتمرات جديدة'),
+        ('registrations', 'تسجيلات'),
+        ('check_ins', 'حضور فعلي'),
+        ('ratings', 'تقييمات'),
+    ]
+    
+    date = models.DateField()
+    metric = models.CharField(max_length=20, choices=METRIC_CHOICES)
+    # نوع المستخدم للمستخدمين الجدد (فارغة لبقية المقاييس)
+    status = models.CharField(max_length=20, blank=True)
+    # دون قيد مفتاح أجنبي: حذف تصنيف أو مدينة لا يمس الأرقام التاريخية
+    category = models.ForeignKey(
+        Category, on_delete=models.DO_NOTHING, null=True, db_constraint=False, related_name='+'
+    )
+    city = models.ForeignKey(
+        SyrianCity, on_delete=models.DO_NOTHING, null=True, db_constraint=False, related_name='+'
+    )
+    count = models.IntegerField(default=0)
+    # مجموع النجوم (للتقييمات فقط) لحساب المتوسط لأي فترة
+    rating_sum = models.IntegerField(default=0)
+    
+    class Meta:
+        indexes = [
+            # السلاسل الزمنية لمقياس ضمن فترة
+            models.Index(fields=['metric', 'date'], name='dailystat_metric_date_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.metric} {self.date}: {self.count}"
+
+class RollupWatermark(models.Model):
+    """آخر يوم حُسبت إحصاءاته لكل مقياس (يُعاد حسابه في التحديث التالي لأنه قد يكون جزئياً)"""
+    metric = models.CharField(max_length=20, unique=True)
+    rolled_up_to = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.metric} -> {self.rolled_up_to}"
+
+class Notification(models.Model):
+    """صندوق الصادر: يُكتب في معاملة التغيير نفسها ويوزعه الأمر send_notifications لاحقاً"""
+    EVENT_CHOICES = [
+        ('conference_approved', 'قبول مؤتمر'),
+        ('conference_rejected', 'رفض مؤتمر'),
+        ('account_approved', 'تفعيل حساب'),
+        ('account_deactivated', 'تعطيل حساب'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'قيد التوزيع'),
+        ('expanded', 'موزع على المستلمين'),
+    ]
+    
+    event = models.CharField(max_length=30, choices=EVENT_CHOICES)
+    # إشعار مؤتمر يصل إلى المنظم وجميع المسجلين، وإشعار الحساب إلى صاحبه فقط
+    conference = models.ForeignKey(Conference, on_delete=models.CASCADE, null=True, blank=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    # آخر معرف حضور وُزّع عليه الإشعار (التوزيع على صفحات)
+    fanout_cursor = models.BigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id'], name='notification_status_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_event_display()} - {self.get_status_display()}"
+
+class NotificationDelivery(models.Model):
+    """رسالة إلى مستلم واحد مع محاولات الإرسال"""
+    STATUS_CHOICES = [
+        ('pending', 'قيد الانتظار'),
+        ('sending', 'قيد الإرسال'),
+        ('sent', 'مرسلة'),
+        ('failed', 'فشلت'),
+    ]
+    
+    notification = models.ForeignKey(Notification, on_delete=models.CASCADE, related_name='deliveries')
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    # موعد المحاولة التالية (أو مهلة الإرسال الجاري قبل إعادته إلى الانتظار)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        unique_together = ['notification', 'user']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='delivery_status_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user} - {self.get_status_display()}"
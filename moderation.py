@@ -0,0 +1,103 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .counters import CONFERENCE_STATUS_FIELDS, bump_counters
+from .models import Conference, ConferenceRequest, UserProfile
+from .notifications import notify_account_approval, notify_conference_status
+from .page_cache import bump_listings_version
+
+# قرار المراجعة -> حالة الطلب وحالة المؤتمر
+REVIEW_DECISIONS = {
+    'approve': 'approved',
+    'reject': 'rejected',
+}
+
+# عدد الحسابات في كل تحديث (أقل بكثير من حد متغيرات SQLite البالغ 32766)
+APPROVAL_BATCH_SIZE = 1000
+
+
+def set_users_approval(profiles, approved, batch_size=APPROVAL_BATCH_SIZE):
+    """تفعيل/تعطيل مجموعة حسابات على دفعات داخل معاملة واحدة
+
+    كل دفعة تحديث مشروط بمعرفات صفحة واحدة (ترقيم بالمفتاح)، فلا يتجاوز الاستعلام
+    حد المتغيرات مهما كان عدد الحسابات. تعيد عدد الحسابات التي تغيرت حالتها فعلاً.
+    """
+    targets = profiles.exclude(is_approved=approved).order_by('id')
+    changed = 0
+    last_id = 0
+    with transaction.atomic():
+        while True:
+            page = dict(targets.filter(id__gt=last_id).values_list('id', 'user_id')[:batch_size])
+            if not page:
+                break
+            last_id = max(page)
+            updated = UserProfile.objects.filter(
+                id__in=page, is_approved=not approved
+            ).update(is_approved=approved)
+            if updated != len(page):
+                # غيّر طلب متزامن بعض الحسابات: الإشعار لما بقي منها فقط
+                page = dict(
+                    UserProfile.objects.filter(id__in=page, is_approved=approved).values_list('id', 'user_id')
+                )
+            changed += updated
+            # في المعاملة نفسها: الإشعار يُكتب فقط إذا حُفظ التغيير
+            notify_account_approval(page.values(), approved)
+        # update() لا يطلق الإشارات، لذا نعدّل العداد يدوياً
+        bump_counters({'approved_users': changed if approved else -changed})
+    return changed
+
+def delete_users(profiles, current_user):
+    """حذف حسابات المستخدمين (مع ملفاتهم) عدا حساب المدير الحالي وحسابات المدراء
+
+    تعيد (عدد المحذوفين، عدد الحسابات المحمية التي تُخطيت).
+    """
+    protected = Q(user=current_user) | Q(user_type='admin')
+    with transaction.atomic():
+        skipped = profiles.filter(protected).count()
+        users = User.objects.filter(id__in=profiles.exclude(protected).values('user_id'))
+        deleted, per_model = users.delete()
+    return per_model.get(User._meta.label, 0), skipped
+
+def review_conference_requests(request_ids, action, reviewer):
+    """مراجعة مجموعة طلبات مؤتمرات في معاملة واحدة
+
+    التحديث المشروط (status='pending') هو القفل: أول مراجع يحجز الطلب،
+    والمراجع المتزامن لا يجد الطلب قيد الانتظار فيتخطاه. تعيد قائمة معرفات
+    الطلبات التي عولجت فعلاً.
+    """
+    status = REVIEW_DECISIONS[action]
+    now = timezone.now()
+
+    with transaction.atomic():
+        claimed = ConferenceRequest.objects.filter(
+            id__in=request_ids, status='pending'
+        ).update(status=status, reviewed_by=reviewer, reviewed_at=now)
+        if not claimed:
+            return []
+
+        processed = list(
+            ConferenceRequest.objects
+            .filter(id__in=request_ids, status=status, reviewed_by=reviewer, reviewed_at=now)
+            .values_list('id', 'conference_id')
+        )
+        conference_ids = {conference_id for _, conference_id in processed}
+
+        # تحديث حالة المؤتمرات دفعة واحدة مع تعديل العدادات بما تغيّر فعلاً
+        conferences = Conference.objects.filter(id__in=conference_ids).exclude(status=status)
+        changed = list(conferences.values_list('id', 'status'))
+        deltas = {'pending_requests': -claimed}
+        for _, old_status in changed:
+            field = CONFERENCE_STATUS_FIELDS.get(old_status)
+            if field:
+                deltas[field] = deltas.get(field, 0) - 1
+            deltas[CONFERENCE_STATUS_FIELDS[status]] = deltas.get(CONFERENCE_STATUS_FIELDS[status], 0) + 1
+        conferences.update(status=status, updated_at=now)
+        bump_counters(deltas)
+        # في المعاملة نفسها: المنظم والمسجلون يُبلّغون فقط إذا حُفظ القرار
+        notify_conference_status([conference_id for conference_id, _ in changed], status)
+        # update() لا يطلق الإشارات: القبول يجب أن يظهر فوراً في الصفحات العامة
+        bump_listings_version()
+
+    return [request_id for request_id, _ in processed]
@@ -0,0 +1,230 @@
+import logging
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Attendance, Notification, NotificationDelivery
+from .reference_data import get_site_settings
+
+logger = logging.getLogger(__name__)
+
+# عدد الرسائل المرسلة عبر اتصال SMTP واحد في كل دفعة
+NOTIFICATION_BATCH_SIZE = getattr(settings, 'NOTIFICATION_BATCH_SIZE', 100)
+
+# عدد المسجلين الذين يُوزَّع عليهم إشعار المؤتمر في كل صفحة
+NOTIFICATION_FANOUT_PAGE_SIZE = getattr(settings, 'NOTIFICATION_FANOUT_PAGE_SIZE', 1000)
+
+# بعد هذا العدد من المحاولات الفاشلة تُترك الرسالة (failed)
+NOTIFICATION_MAX_ATTEMPTS = getattr(settings, 'NOTIFICATION_MAX_ATTEMPTS', 6)
+
+# الانتظار قبل إعادة المحاولة: يتضاعف مع كل محاولة حتى الحد الأقصى
+NOTIFICATION_RETRY_BASE = timedelta(seconds=getattr(settings, 'NOTIFICATION_RETRY_BASE_SECONDS', 60))
+NOTIFICATION_RETRY_MAX = timedelta(hours=6)
+
+# الرسالة التي بقيت قيد الإرسال أكثر من هذه المدة (توقف العامل) تعود إلى الانتظار
+NOTIFICATION_SEND_TIMEOUT = timedelta(minutes=10)
+
+# (الموضوع، النص) لكل حدث
+MESSAGES = {
+    'conference_approved': (
+        'تم قبول المؤتمر: {title}',
+        'مرحباً {name}،\n\nتم قبول مؤتمر "{title}" وأصبح متاحاً للتسجيل.\n\n{site_name}',
+    ),
+    'conference_rejected': (
+        'تم رفض المؤتمر: {title}',
+        'مرحباً {name}،\n\nنأسف لإبلاغك بأن مؤتمر "{title}" قد رُفض.\n\n{site_name}',
+    ),
+    'account_approved': (
+        'تم تفعيل حسابك',
+        'مرحباً {name}،\n\nتم تفعيل حسابك ويمكنك الآن تسجيل الدخول.\n\n{site_name}',
+    ),
+    'account_deactivated': (
+        'تم تعطيل حسابك',
+        'مرحباً {name}،\n\nتم تعطيل حسابك. للاستفسار يرجى التواصل مع إدارة المنصة.\n\n{site_name}',
+    ),
+}
+
+CONFERENCE_EVENTS = {
+    'approved': 'conference_approved',
+    'rejected': 'conference_rejected',
+}
+
+
+# ====== الكتابة في صندوق الصادر (داخل معاملة التغيير) ======
+
+def notify_conference_status(conference_ids, status):
+    """إشعار بتغيّر حالة مؤتمرات: صف واحد لكل مؤتمر مهما كان عدد المسجلين فيه"""
+    event = CONFERENCE_EVENTS.get(status)
+    if event is None or not conference_ids:
+        return
+    Notification.objects.bulk_create([
+        Notification(event=event, conference_id=conference_id) for conference_id in conference_ids
+    ])
+
+def notify_account_approval(user_ids, approved):
+    """إشعار أصحاب الحسابات التي فُعّلت أو عُطّلت"""
+    event = 'account_approved' if approved else 'account_deactivated'
+    Notification.objects.bulk_create([Notification(event=event, user_id=user_id) for user_id in user_ids])
+
+# ====== التوزيع على المستلمين ======
+
+def _expand_page(notification, page_size):
+    """إنشاء رسائل صفحة واحدة من المستلمين؛ تعيد عدد المستلمين في الصفحة"""
+    recipients = []
+    cursor = notification.fanout_cursor
+    done = True
+    if notification.conference_id is None:
+        recipients.append(notification.user_id)
+    else:
+        if cursor == 0:
+            recipients.append(notification.conference.organizer.user_id)
+        # ترقيم بالمفتاح (id > آخر معرف) بدلاً من OFFSET: كل صفحة قراءة فهرس مباشرة
+        page = list(
+            Attendance.objects
+            .filter(conference_id=notification.conference_id, id__gt=cursor)
+            .order_by('id')
+            .values_list('id', 'user__user_id')[:page_size]
+        )
+        recipients.extend(user_id for _, user_id in page)
+        if page:
+            cursor = page[-1][0]
+        done = len(page) < page_size
+
+    with transaction.atomic():
+        # التحديث المشروط يمنع عاملين من توزيع الصفحة نفسها
+        claimed = Notification.objects.filter(
+            id=notification.id, status='pending', fanout_cursor=notification.fanout_cursor,
+        ).update(fanout_cursor=cursor, status='expanded' if done else 'pending')
+        if not claimed:
+            return 0
+        NotificationDelivery.objects.bulk_create(
+            [NotificationDelivery(notification=notification, user_id=user_id) for user_id in recipients],
+            ignore_conflicts=True,
+        )
+    notification.fanout_cursor = cursor
+    notification.status = 'expanded' if done else 'pending'
+    return len(recipients)
+
+def expand_notifications(limit=NOTIFICATION_BATCH_SIZE, page_size=NOTIFICATION_FANOUT_PAGE_SIZE):
+    """توزيع الإشعارات الجديدة على مستلميها صفحة بصفحة؛ تعيد عدد الرسائل المنشأة
+
+    لكل إشعار صفحة واحدة في كل استدعاء، فلا يؤخر مؤتمر كبير بقية الإشعارات.
+    """
+    notifications = (
+        Notification.objects.filter(status='pending')
+        .select_related('conference__organizer')
+        .order_by('id')[:limit]
+    )
+    return sum(_expand_page(notification, page_size) for notification in notifications)
+
+# ====== الإرسال ======
+
+def requeue_stale_deliveries():
+    """إعادة الرسائل العالقة قيد الإرسال (مثلاً بعد توقف العامل) إلى الانتظار"""
+    return NotificationDelivery.objects.filter(
+        status='sending', next_attempt_at__lt=timezone.now(),
+    ).update(status='pending')
+
+def claim_deliveries(batch_size=NOTIFICATION_BATCH_SIZE):
+    """حجز دفعة من الرسائل المستحقة (آمن مع عدة عمال)"""
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            NotificationDelivery.objects
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        NotificationDelivery.objects.filter(id__in=ids, status='pending').update(
+            status='sending', next_attempt_at=now + NOTIFICATION_SEND_TIMEOUT,
+        )
+    return list(
+        NotificationDelivery.objects
+        .filter(id__in=ids, status='sending')
+        .select_related('notification__conference', 'user')
+        .order_by('id')
+    )
+
+def retry_delay(attempts):
+    """انتظار أسّي مع تشتيت عشوائي حتى لا تعود الرسائل الفاشلة كلها معاً"""
+    delay = min(NOTIFICATION_RETRY_MAX, NOTIFICATION_RETRY_BASE * 2 ** (attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+def _schedule_retry(delivery, error):
+    attempts = delivery.attempts + 1
+    failed = attempts >= NOTIFICATION_MAX_ATTEMPTS
+    NotificationDelivery.objects.filter(id=delivery.id).update(
+        status='failed' if failed else 'pending',
+        attempts=attempts,
+        next_attempt_at=timezone.now() + retry_delay(attempts),
+        last_error=str(error)[:1000],
+    )
+
+def build_message(delivery, connection=None):
+    user = delivery.user
+    notification = delivery.notification
+    subject, body = MESSAGES[notification.event]
+    context = {
+        'name': user.get_full_name() or user.username,
+        'title': notification.conference.title if notification.conference else '',
+        'site_name': get_site_settings()['site_name'],
+    }
+    return EmailMessage(
+        subject.format(**context), body.format(**context), to=[user.email], connection=connection,
+    )
+
+def deliver_notifications(batch_size=NOTIFICATION_BATCH_SIZE):
+    """إرسال دفعة من الرسائل المستحقة عبر اتصال SMTP واحد
+
+    الرسالة الفاشلة تُؤجل بانتظار متزايد ولا توقف بقية الدفعة. الإرسال "مرة على
+    الأقل": إذا توقف العامل قبل تسجيل النجاح قد تُرسل الرسالة مرة ثانية.
+    تعيد (عدد المرسلة، عدد المؤجلة أو الفاشلة).
+    """
+    deliveries = claim_deliveries(batch_size)
+    if not deliveries:
+        return 0, 0
+
+    sent_ids = []
+    no_email_ids = []
+    failed = 0
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        logger.warning('تعذر الاتصال بخادم البريد: %s', e)
+        for delivery in deliveries:
+            _schedule_retry(delivery, e)
+        return 0, len(deliveries)
+
+    try:
+        for i, delivery in enumerate(deliveries):
+            if not delivery.user.email:
+                no_email_ids.append(delivery.id)
+                continue
+            try:
+                build_message(delivery, connection).send()
+            except Exception as e:
+                failed += 1
+                _schedule_retry(delivery, e)
+                # قد يكون الاتصال نفسه انقطع: اتصال جديد لبقية الدفعة
+                connection.close()
+                try:
+                    connection.open()
+                except Exception as open_error:
+                    for other in deliveries[i + 1:]:
+                        _schedule_retry(other, open_error)
+                    failed += len(deliveries) - i - 1
+                    break
+            else:
+                sent_ids.append(delivery.id)
+    finally:
+        connection.close()
+        NotificationDelivery.objects.filter(id__in=sent_ids).update(status='sent', sent_at=timezone.now())
+        NotificationDelivery.objects.filter(id__in=no_email_ids).update(
+            status='failed', last_error='لا يوجد بريد إلكتروني للمستخدم',
+        )
+    return len(sent_ids), failed
@@ -0,0 +1,82 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.http import urlencode
+
+# مدة بقاء الصفحة في الذاكرة (تُبطل قبل ذلك عند أي تغيير في المؤتمرات أو التصنيفات أو المدن)
+PAGE_CACHE_TIMEOUT = getattr(settings, 'PAGE_CACHE_TIMEOUT', 300)
+
+LISTINGS_VERSION_KEY = 'conference:listings:version'
+
+# نتائج البحث (نص حر، نسخة لكل عبارة) تُخزن في ذاكرة منفصلة محدودة الحجم إن وُجدت،
+# فإغراقها بعبارات عشوائية لا يطرد الصفحات المخزنة
+SEARCH_CACHE_ALIAS = 'search' if 'search' in settings.CACHES else 'default'
+
+
+def get_listings_version():
+    """رقم إصدار قوائم المؤتمرات العامة؛ يدخل في كل مفتاح تخزين"""
+    version = cache.get(LISTINGS_VERSION_KEY)
+    if version is None:
+        # قيمة ابتدائية زمنية حتى لا يعود رقم قديم بعد مسح الذاكرة
+        cache.add(LISTINGS_VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(LISTINGS_VERSION_KEY)
+    return version
+
+def _bump():
+    try:
+        cache.incr(LISTINGS_VERSION_KEY)
+    except ValueError:
+        get_listings_version()
+
+def bump_listings_version():
+    """إبطال كل الصفحات والأجزاء المخزنة (بعد نجاح المعاملة الحالية)"""
+    # بعد الحفظ الفعلي فقط، وإلا قد يخزّن طلب متزامن البيانات القديمة بالإصدار الجديد
+    transaction.on_commit(_bump)
+
+def page_cache_key(request, params=()):
+    """مفتاح الصفحة من المسار والمعاملات الرقمية التي تقرأها الـ view فقط
+
+    بقية معاملات الرابط (تتبع، قيم عشوائية) لا تنشئ نسخاً جديدة في الذاكرة.
+    """
+    values = []
+    for name in params:
+        value = request.GET.get(name, '').strip()
+        values.append((name, value if value.isdigit() else ''))
+    path = hashlib.md5(f'{request.path}?{urlencode(values)}'.encode('utf-8')).hexdigest()
+    return f'conference:page:{get_listings_version()}:{path}'
+
+def cache_anonymous_page(view=None, *, params=()):
+    """تخزين الصفحة كاملة للزوار غير المسجلين، فتُخدم الزيارات المتكررة دون قاعدة البيانات
+
+    params: معاملات الرابط الرقمية التي تقرأها الـ view (مثل page). صفحات البحث (q)
+    لا تُخزن كاملة.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (
+                request.method != 'GET'
+                or request.user.is_authenticated
+                or request.GET.get('q', '').strip()
+                or len(messages.get_messages(request))
+            ):
+                return view(request, *args, **kwargs)
+
+            key = page_cache_key(request, params)
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                cache.set(key, (response.content, response['Content-Type']), PAGE_CACHE_TIMEOUT)
+            return response
+        return wrapper
+    return decorator if view is None else decorator(view)
@@ -0,0 +1,115 @@
+import re
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.utils import timezone
+
+from .models import (
+    UserProfile, Conference, ConferenceRequest, Rating, Attendance, ExportJob, DailyStat,
+    Notification, NotificationDelivery
+)
+from .rollups import ROLLUP_SOURCES, clamp_chart_range, daily_stats_query, time_series_query
+from .views import (
+    CONFERENCES_PAGE_SIZE, USERS_PAGE_SIZE, RATINGS_PAGE_SIZE, conference_ratings_queryset,
+    filter_conferences, list_user_profiles, pending_conference_requests, upcoming_conferences,
+)
+
+# الجداول التي يكبر حجمها مع الاستخدام؛ المسح الكامل لها ممنوع في الاستعلامات المتكررة
+LARGE_TABLES = {
+    model._meta.db_table
+    for model in (
+        User, UserProfile, Conference, ConferenceRequest, Rating, Attendance, ExportJob, DailyStat,
+        Notification, NotificationDelivery,
+    )
+}
+
+# المسح عبر فهرس لا يُستخدم للبحث (USING [COVERING] INDEX) يمر على الجدول كله أيضاً
+_FULL_SCAN = re.compile(r'^SCAN (\w+)(?: USING (?:COVERING )?INDEX (\w+))?$')
+
+
+def hot_queries():
+    """الاستعلامات التي تنفذها الصفحات المتكررة، مبنية بالدوال نفسها التي تستخدمها الصفحات"""
+    now = timezone.now()
+    week_ago = now - timedelta(days=7)
+    no_filters = {'status': '', 'category': '', 'city': ''}
+    chart_start, chart_end = clamp_chart_range(now.date() - timedelta(days=1000), now.date())
+
+    queries = {
+        'home': upcoming_conferences()[:6],
+        'dashboard.new_users_week': UserProfile.objects.filter(created_at__gte=week_ago),
+        'dashboard.recent_conferences': Conference.objects.order_by('-created_at')[:10],
+        'dashboard.recent_users': UserProfile.objects.select_related('user').order_by('-created_at')[:10],
+        'manage_users': list_user_profiles({})[:USERS_PAGE_SIZE],
+        'manage_users.user_type': list_user_profiles({'user_type': 'organizer'})[:USERS_PAGE_SIZE],
+        'conferences_list': filter_conferences(no_filters)[:CONFERENCES_PAGE_SIZE + 1],
+        'conferences_list.status': filter_conferences(
+            {**no_filters, 'status': 'pending'}
+        )[:CONFERENCES_PAGE_SIZE + 1],
+        'conferences_list.cursor': filter_conferences(no_filters, (now, 1000))[:CONFERENCES_PAGE_SIZE + 1],
+        'conference_requests': pending_conference_requests(),
+        'conference_ratings': conference_ratings_queryset(1)[:RATINGS_PAGE_SIZE],
+        'platform_statistics.trend': time_series_query(chart_start, chart_end, list(ROLLUP_SOURCES)),
+        'attendance.attended': Attendance.objects.filter(attended=True),
+        'registration.already_registered': Attendance.objects.filter(conference_id=1, user_id=1),
+        'export.recent_jobs': ExportJob.objects.select_related('requested_by').order_by('-created_at')[:10],
+        'export.claim_next_job': ExportJob.objects.filter(status='pending').order_by('created_at')[:1],
+        'export.reuse': ExportJob.objects.filter(
+            report_type='users', format='csv', status__in=['pending', 'running', 'completed'],
+            created_at__gte=now - timedelta(minutes=15),
+        ).order_by('-created_at')[:1],
+        # عامل الإشعارات (send_notifications) يستعلم عنها في كل دورة
+        'notifications.expand': Notification.objects.filter(status='pending').select_related(
+            'conference__organizer'
+        ).order_by('id')[:100],
+        'notifications.fanout_page': Attendance.objects.filter(conference_id=1, id__gt=1000).order_by(
+            'id'
+        ).values_list('id', 'user__user_id')[:1000],
+        'notifications.claim_deliveries': NotificationDelivery.objects.filter(
+            status='pending', next_attempt_at__lte=now
+        ).order_by('next_attempt_at', 'id').values_list('id', flat=True)[:100],
+        'notifications.requeue_stale': NotificationDelivery.objects.filter(status='sending', next_attempt_at__lt=now),
+    }
+    # التحديث التدريجي للإحصاءات اليومية يعيد حساب الأيام الأخيرة لكل مقياس
+    for metric in ROLLUP_SOURCES:
+        queries[f'rollups.{metric}'] = daily_stats_query(metric, since=week_ago.date())
+    return queries
+
+def explain(queryset):
+    """خطة تنفيذ الاستعلام (EXPLAIN QUERY PLAN) كسطور نصية"""
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+def partial_indexes(table):
+    """الفهارس الجزئية على الجدول (تحوي الصفوف المطابقة لشرطها فقط)"""
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA index_list({connection.ops.quote_name(table)})')
+        return {row[1] for row in cursor.fetchall() if row[4]}
+
+def full_table_scans(plan, limited=False):
+    """الجداول الكبيرة التي تُمسح بالكامل في الخطة
+
+    المرور على فهرس كله مسح كامل أيضاً، إلا إذا كان الفهرس جزئياً، أو كان الاستعلام
+    محدوداً (limited: فيه LIMIT) ويقرأ الصفوف بترتيب الفهرس فيتوقف بعد الصفحة.
+    """
+    ordered = limited and not any('TEMP B-TREE' in line for line in plan)
+    scans = []
+    for line in plan:
+        match = _FULL_SCAN.match(line.strip())
+        if not match or match.group(1) not in LARGE_TABLES:
+            continue
+        table, index = match.groups()
+        if index and (ordered or index in partial_indexes(table)):
+            continue
+        scans.append(table)
+    return scans
+
+def audit_query_plans():
+    """تعيد {اسم الاستعلام: (الخطة، الجداول الممسوحة بالكامل)}"""
+    results = {}
+    for name, queryset in hot_queries().items():
+        plan = explain(queryset)
+        results[name] = (plan, full_table_scans(plan, limited=queryset.query.high_mark is not None))
+    return results
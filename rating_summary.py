@@ -0,0 +1,93 @@
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from .models import Conference, Rating, ConferenceRatingSummary
+
+# عمود عدد التقييمات لكل قيمة نجوم
+STAR_FIELDS = {stars: f'stars_{stars}' for stars in range(1, 6)}
+
+SUMMARY_FIELDS = ['rating_count', 'rating_sum', *STAR_FIELDS.values()]
+
+# عدد المؤتمرات التي يُعاد حساب ملخصها في كل دفعة
+REPAIR_BATCH_SIZE = 500
+
+
+def rating_deltas(rating, sign=1):
+    """مساهمة تقييم واحد في الملخص (sign=-1 عند الحذف)"""
+    deltas = {'rating_count': sign, 'rating_sum': sign * rating}
+    if rating in STAR_FIELDS:
+        deltas[STAR_FIELDS[rating]] = sign
+    return deltas
+
+def compute_rating_summaries(conference_ids):
+    """حساب ملخصات مجموعة مؤتمرات من جدول التقييمات باستعلام واحد"""
+    rows = (
+        Rating.objects
+        .filter(conference_id__in=conference_ids)
+        .values('conference_id')
+        .annotate(
+            rating_count=Count('id'),
+            rating_sum=Sum('rating'),
+            **{field: Count('id', filter=Q(rating=stars)) for stars, field in STAR_FIELDS.items()}
+        )
+        .order_by()
+    )
+    summaries = {conference_id: dict.fromkeys(SUMMARY_FIELDS, 0) for conference_id in conference_ids}
+    for row in rows:
+        summaries[row.pop('conference_id')] = row
+    return summaries
+
+def repair_rating_summaries(conference_ids=None, batch_size=REPAIR_BATCH_SIZE):
+    """إعادة حساب الملخصات وكتابتها دفعة بدفعة (جميع المؤتمرات إن لم تُحدد)
+
+    تعيد عدد الملخصات المكتوبة.
+    """
+    conferences = Conference.objects.order_by('id')
+    if conference_ids is not None:
+        conferences = conferences.filter(id__in=conference_ids)
+    ids = conferences.values_list('id', flat=True).iterator(chunk_size=batch_size)
+
+    written = 0
+    batch = []
+    for conference_id in ids:
+        batch.append(conference_id)
+        if len(batch) == batch_size:
+            written += _write_summaries(batch)
+            batch = []
+    if batch:
+        written += _write_summaries(batch)
+    return written
+
+def _write_summaries(conference_ids):
+    summaries = compute_rating_summaries(conference_ids)
+    ConferenceRatingSummary.objects.bulk_create(
+        [
+            ConferenceRatingSummary(conference_id=conference_id, **values)
+            for conference_id, values in summaries.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['conference'],
+        update_fields=SUMMARY_FIELDS,
+    )
+    return len(summaries)
+
+def get_rating_summary(conference):
+    """ملخص تقييمات المؤتمر (يُحسب عند أول استخدام إن لم يكن موجوداً)"""
+    try:
+        return conference.rating_summary
+    except ConferenceRatingSummary.DoesNotExist:
+        repair_rating_summaries([conference.id])
+        return ConferenceRatingSummary.objects.get(conference=conference)
+
+def bump_rating_summary(conference_id, deltas):
+    """تعديل ملخص مؤتمر ذرياً بتحديث واحد
+
+    إن لم يوجد صف الملخص بعد فلا شيء يُعدَّل: سيُحسب كاملاً عند أول قراءة.
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    ConferenceRatingSummary.objects.filter(conference_id=conference_id).update(
+        **{field: F(field) + delta for field, delta in deltas.items()},
+        updated_at=timezone.now(),
+    )
@@ -0,0 +1,103 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .db_router import use_primary
+from .models import Category, SyrianCity, SystemSetting
+from .page_cache import PAGE_CACHE_TIMEOUT, bump_listings_version
+
+# إعدادات المنصة التي تُدار من صفحة الإعدادات: {المفتاح: الوصف}
+SITE_SETTING_LABELS = {
+    'site_name': 'اسم المنصة',
+    'site_description': 'وصف المنصة',
+    'contact_email': 'بريد التواصل',
+    'contact_phone': 'رقم التواصل',
+}
+
+# القيم المعروضة قبل حفظ الإعدادات لأول مرة
+SITE_SETTING_DEFAULTS = {
+    'site_name': 'منصة المؤتمرات الذكية',
+    'site_description': 'نظام متكامل لإدارة المؤتمرات في سوريا',
+    'contact_email': '',
+    'contact_phone': '',
+}
+
+REFERENCE_DATA_VERSION_KEY = 'conference:reference:version'
+
+# أقصى عمر للبيانات في ذاكرة العملية (بالثواني). رقم الإصدار يبطلها فوراً في العملية
+# التي حفظت التغيير فقط ما لم تكن ذاكرة CACHES مشتركة (LocMemCache لكل عملية)، فتُعاد
+# قراءتها بعد هذه المدة في بقية العمليات، وكذلك بعد تعديلها من أوامر الإدارة
+REFERENCE_DATA_MAX_AGE = getattr(settings, 'REFERENCE_DATA_MAX_AGE', PAGE_CACHE_TIMEOUT)
+
+# {الاسم: (الإصدار، وقت التحميل، القيمة)} محفوظة في ذاكرة العملية
+_loaded = {}
+
+
+def get_reference_version():
+    """رقم إصدار البيانات المرجعية؛ يتغير عند حفظ إعداد أو مدينة أو تصنيف"""
+    version = cache.get(REFERENCE_DATA_VERSION_KEY)
+    if version is None:
+        cache.add(REFERENCE_DATA_VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(REFERENCE_DATA_VERSION_KEY)
+    return version
+
+def _bump():
+    try:
+        cache.incr(REFERENCE_DATA_VERSION_KEY)
+    except ValueError:
+        get_reference_version()
+
+def bump_reference_version():
+    """إبطال البيانات المرجعية (بعد نجاح المعاملة الحالية)
+
+    فوراً في هذه العملية، وفي جميع العمليات إذا كانت ذاكرة CACHES مشتركة؛ وإلا
+    خلال REFERENCE_DATA_MAX_AGE.
+    """
+    transaction.on_commit(_bump)
+
+def _cached(name, load):
+    version = get_reference_version()
+    now = time.monotonic()
+    entry = _loaded.get(name)
+    if entry is None or entry[0] != version or now - entry[1] >= REFERENCE_DATA_MAX_AGE:
+        # من القاعدة الأساسية دائماً: النسخة المتأخرة قد تُحفظ هنا بالإصدار الجديد
+        with use_primary():
+            entry = (version, now, load())
+        _loaded[name] = entry
+    return entry[2]
+
+def get_site_settings():
+    """إعدادات المنصة {المفتاح: القيمة} مع القيم الافتراضية لما لم يُحفظ"""
+    return _cached('site_settings', lambda: {
+        **SITE_SETTING_DEFAULTS,
+        **dict(SystemSetting.objects.values_list('key', 'value')),
+    })
+
+def get_cities():
+    """جميع المدن مرتبة بالاسم (قائمة مشتركة: للقراءة فقط)"""
+    return _cached('cities', lambda: list(SyrianCity.objects.order_by('name')))
+
+def get_categories():
+    """جميع التصنيفات مرتبة بالاسم (قائمة مشتركة: للقراءة فقط)"""
+    return _cached('categories', lambda: list(Category.objects.order_by('name')))
+
+def save_site_settings(values, user):
+    """حفظ إعدادات المنصة بإدخال/تحديث جماعي واحد"""
+    SystemSetting.objects.bulk_create(
+        [
+            SystemSetting(key=key, value=values.get(key, ''), description=label, updated_by=user)
+            for key, label in SITE_SETTING_LABELS.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['key'],
+        update_fields=['value', 'description', 'updated_by', 'updated_at'],
+    )
+    # الإدخال الجماعي لا يرسل إشارات (والاسم يظهر في الصفحات المخزنة)
+    bump_reference_version()
+    bump_listings_version()
+
+def site_settings(request):
+    """context processor: إعدادات المنصة في كل القوالب دون استعلام"""
+    return get_site_settings()
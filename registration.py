@@ -0,0 +1,90 @@
+import random
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Conference, Attendance
+
+# حالات المؤتمر التي يُسمح فيها بالتسجيل
+REGISTRATION_OPEN_STATUSES = ('approved', 'active')
+
+# عدد محاولات إعادة التسجيل عندما تكون قاعدة البيانات مقفلة (SQLite تحت ضغط كتابة)
+REGISTRATION_RETRIES = getattr(settings, 'REGISTRATION_RETRIES', 8)
+
+# نتائج التسجيل
+REGISTERED = 'registered'
+ALREADY_REGISTERED = 'already_registered'
+CONFERENCE_FULL = 'full'
+REGISTRATION_CLOSED = 'closed'
+
+
+def _register_once(conference_id, profile):
+    with transaction.atomic():
+        # أول عبارة في المعاملة كتابة، فتحجز SQLite قفل الكتابة مباشرة
+        # والتحديث المشروط يمنع تجاوز الحد الأقصى مهما تزامنت الطلبات
+        claimed = Conference.objects.filter(
+            id=conference_id,
+            status__in=REGISTRATION_OPEN_STATUSES,
+            current_attendees__lt=F('max_attendees'),
+        ).update(current_attendees=F('current_attendees') + 1)
+
+        if not claimed:
+            conference = Conference.objects.filter(id=conference_id).values('status').first()
+            if Attendance.objects.filter(conference_id=conference_id, user=profile).exists():
+                return ALREADY_REGISTERED
+            if conference is None or conference['status'] not in REGISTRATION_OPEN_STATUSES:
+                return REGISTRATION_CLOSED
+            return CONFERENCE_FULL
+
+        try:
+            with transaction.atomic():
+                Attendance.objects.create(conference_id=conference_id, user=profile)
+        except IntegrityError:
+            # مسجل مسبقاً: نعيد المقعد الذي حجزناه
+            Conference.objects.filter(id=conference_id).update(
+                current_attendees=F('current_attendees') - 1
+            )
+            return ALREADY_REGISTERED
+
+    return REGISTERED
+
+def register_attendance(conference_id, profile):
+    """تسجيل مستخدم في مؤتمر مع ضمان عدم تجاوز الحد الأقصى
+
+    تعيد إحدى القيم: registered, already_registered, full, closed.
+    """
+    # إعادة المحاولة ممكنة فقط إذا لم نكن داخل معاملة أكبر
+    retries = 0 if connection.in_atomic_block else REGISTRATION_RETRIES
+    for attempt in range(retries + 1):
+        try:
+            return _register_once(conference_id, profile)
+        except OperationalError as e:
+            if attempt == retries or 'locked' not in str(e):
+                raise
+            time.sleep(random.uniform(0, 0.01 * 2 ** attempt))
+
+def cancel_attendance(conference_id, profile):
+    """إلغاء تسجيل مستخدم وتحرير مقعده"""
+    with transaction.atomic():
+        _, per_model = Attendance.objects.filter(conference_id=conference_id, user=profile).delete()
+        deleted = per_model.get(Attendance._meta.label, 0)
+        if deleted:
+            Conference.objects.filter(id=conference_id, current_attendees__gte=deleted).update(
+                current_attendees=F('current_attendees') - deleted
+            )
+    return bool(deleted)
+
+def sync_current_attendees():
+    """إعادة حساب current_attendees لجميع المؤتمرات من سجلات الحضور بتحديث واحد"""
+    registered = (
+        Attendance.objects
+        .filter(conference=OuterRef('pk'))
+        .order_by()
+        .values('conference')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    return Conference.objects.update(current_attendees=Coalesce(Subquery(registered), 0))
@@ -0,0 +1,163 @@
+import contextvars
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+logger = logging.getLogger(__name__)
+
+# نسبة الطلبات التي تُقاس استعلاماتها وزمن قوالبها (زمن الطلب الكلي يُقاس دائماً)
+REQUEST_METRICS_SAMPLE_RATE = getattr(settings, 'REQUEST_METRICS_SAMPLE_RATE', 0.1)
+
+# الطلب الذي يتجاوز أحد هذين الحدين يُسجل في سجل الطلبات البطيئة
+REQUEST_SLOW_MS = getattr(settings, 'REQUEST_SLOW_MS', 500)
+REQUEST_MAX_QUERIES = getattr(settings, 'REQUEST_MAX_QUERIES', 30)
+
+# إرسال ترويسة Server-Timing (تظهر في أدوات المطور في المتصفح)
+REQUEST_SERVER_TIMING = getattr(settings, 'REQUEST_SERVER_TIMING', True)
+
+# عدد الاستعلامات المتكررة التي تظهر في السجل (نمط N+1)
+TOP_REPEATED_QUERIES = 5
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """مقاييس طلب واحد: الاستعلامات (مجمعة حسب نص SQL) وزمن القوالب"""
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.queries = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        # يُركّب على الاتصالات عبر execute_wrapper
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.sql_count += 1
+            self.sql_time += elapsed
+            entry = self.queries.get(sql)
+            if entry is None:
+                self.queries[sql] = [1, elapsed]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+
+    def repeated_queries(self, limit=TOP_REPEATED_QUERIES):
+        repeated = sorted(
+            (entry for entry in self.queries.items() if entry[1][0] > 1),
+            key=lambda entry: entry[1][0],
+            reverse=True,
+        )
+        return [
+            {'sql': sql[:300], 'count': count, 'ms': round(seconds * 1000, 2)}
+            for sql, (count, seconds) in repeated[:limit]
+        ]
+
+class TimedTemplate(Template):
+    """قالب يضيف زمن عرضه إلى مقاييس الطلب الحالي (إن كان مقاساً)"""
+
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.template_time += time.perf_counter() - started
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """محرك قوالب Django نفسه مع قياس زمن العرض (يُضبط في TEMPLATES['BACKEND'])"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+class RequestMetricsMiddleware:
+    """قياس كل طلب: الزمن الكلي وزمن الـ view وعدد الاستعلامات وزمنها وزمن القوالب
+
+    النتائج تُرسل في ترويسة Server-Timing، والطلبات البطيئة أو كثيرة الاستعلامات
+    تُسجل كسطر JSON. محتوى الاستجابات المتدفقة يُولد بعد انتهاء القياس.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        request._metrics_view_started = None
+
+        if random.random() >= REQUEST_METRICS_SAMPLE_RATE:
+            response = self.get_response(request)
+            total = time.perf_counter() - started
+            if total * 1000 >= REQUEST_SLOW_MS:
+                self._log(request, response, total, None)
+            return response
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - started
+
+        if REQUEST_SERVER_TIMING:
+            response['Server-Timing'] = self._server_timing(request, metrics, total)
+        if total * 1000 >= REQUEST_SLOW_MS or metrics.sql_count > REQUEST_MAX_QUERIES:
+            self._log(request, response, total, metrics)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._metrics_view_started = time.perf_counter()
+
+    def _view_time(self, request):
+        if request._metrics_view_started is None:
+            return None
+        return time.perf_counter() - request._metrics_view_started
+
+    def _server_timing(self, request, metrics, total):
+        parts = [
+            f'sql;dur={metrics.sql_time * 1000:.1f};desc="{metrics.sql_count} queries"',
+            f'template;dur={metrics.template_time * 1000:.1f}',
+        ]
+        view = self._view_time(request)
+        if view is not None:
+            parts.append(f'view;dur={view * 1000:.1f}')
+        parts.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(parts)
+
+    def _log(self, request, response, total, metrics):
+        view = self._view_time(request)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': getattr(request.resolver_match, 'view_name', None),
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 1),
+            'view_ms': round(view * 1000, 1) if view is not None else None,
+        }
+        if metrics is not None:
+            record.update({
+                'sql_count': metrics.sql_count,
+                'sql_ms': round(metrics.sql_time * 1000, 1),
+                'template_ms': round(metrics.template_time * 1000, 1),
+                'repeated_queries': metrics.repeated_queries(),
+            })
+        logger.warning(json.dumps(record, ensure_ascii=False))
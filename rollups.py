@@ -0,0 +1,216 @@
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, Min, Q, Sum, Value
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Attendance, Conference, DailyStat, Rating, RollupWatermark, UserProfile
+
+# أيام تسبق آخر يوم محسوب ويُعاد حسابها أيضاً: سجلات كُتبت بتاريخ سابق لكن لم تكن قد حُفظت بعد
+ROLLUP_OVERLAP_DAYS = getattr(settings, 'ROLLUP_OVERLAP_DAYS', 1)
+
+ROLLUP_BATCH_SIZE = 1000
+
+# مصدر كل مقياس: الجدول، عمود التاريخ، شرط اختياري، وأعمدة الأبعاد (None: غير متوفر)
+# حالة المؤتمر تتغير بعد إنشائه (المراجعة، الانتهاء)، والتحديث التدريجي لا يعيد حساب الأيام
+# القديمة، لذا لا تُسجل حالة المؤتمر في أي مقياس
+ROLLUP_SOURCES = {
+    'new_users': {
+        'model': UserProfile, 'timestamp': 'created_at',
+        'status': 'user_type', 'category': None, 'city': 'city_id',
+    },
+    'new_conferences': {
+        'model': Conference, 'timestamp': 'created_at',
+        'status': None, 'category': 'category_id', 'city': 'city_id',
+    },
+    'registrations': {
+        'model': Attendance, 'timestamp': 'registered_at',
+        'status': None, 'category': 'conference__category_id', 'city': 'conference__city_id',
+    },
+    'check_ins': {
+        'model': Attendance, 'timestamp': 'attended_at', 'filter': Q(attended=True),
+        'status': None, 'category': 'conference__category_id', 'city': 'conference__city_id',
+    },
+    'ratings': {
+        'model': Rating, 'timestamp': 'created_at', 'sum': 'rating',
+        'status': None, 'category': 'conference__category_id', 'city': 'conference__city_id',
+    },
+}
+
+# دقة المحور الزمني في الرسوم، من الأدق إلى الأعم
+CHART_INTERVALS = ['day', 'week', 'month', 'year']
+
+# عند تجاوز هذا العدد من النقاط تُرفع الدقة تلقائياً (يوم -> أسبوع -> شهر -> سنة)
+MAX_CHART_POINTS = 400
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+def daily_stats_query(metric, since=None):
+    """استعلام GROUP BY واحد على الجدول المصدر لمقياس (منذ يوم محدد أو للتاريخ كله)"""
+    source = ROLLUP_SOURCES[metric]
+    timestamp = source['timestamp']
+    rows = source['model'].objects.filter(**{f'{timestamp}__isnull': False})
+    if 'filter' in source:
+        rows = rows.filter(source['filter'])
+    if since is not None:
+        rows = rows.filter(**{f'{timestamp}__gte': _day_start(since)})
+
+    dimensions = {
+        key: F(source[key]) if source[key] else Value(None, output_field=IntegerField())
+        for key in ('status', 'category', 'city')
+    }
+    aggregates = {'total': Count('pk')}
+    if 'sum' in source:
+        aggregates['total_sum'] = Sum(source['sum'])
+    return (
+        rows.annotate(day=TruncDate(timestamp), **{f'_{key}': value for key, value in dimensions.items()})
+        .values('day', '_status', '_category', '_city')
+        .annotate(**aggregates)
+        .order_by()
+    )
+
+def compute_daily_stats(metric, since=None):
+    """حساب صفوف مقياس من الجدول المصدر (منذ يوم محدد أو للتاريخ كله)"""
+    rows = daily_stats_query(metric, since)
+    return [
+        DailyStat(
+            date=row['day'],
+            metric=metric,
+            status=row['_status'] or '',
+            category_id=row['_category'],
+            city_id=row['_city'],
+            count=row['total'],
+            rating_sum=row.get('total_sum') or 0,
+        )
+        for row in rows.iterator()
+    ]
+
+def update_daily_stats(metrics=None, rebuild=False, batch_size=ROLLUP_BATCH_SIZE):
+    """تحديث الإحصاءات اليومية تدريجياً من آخر يوم محسوب لكل مقياس
+
+    كل يوم يُعاد حسابه بالكامل (حذف ثم إدخال جماعي) فالتحديث آمن للتكرار.
+    rebuild: إعادة حساب التاريخ كله (بعد حذف سجلات قديمة أو تغيير حالات المؤتمرات).
+    تعيد {المقياس: عدد الصفوف المكتوبة}.
+    """
+    today = timezone.localdate()
+    watermarks = dict(RollupWatermark.objects.values_list('metric', 'rolled_up_to'))
+    written = {}
+    for metric in metrics or ROLLUP_SOURCES:
+        since = None
+        if not rebuild and metric in watermarks:
+            since = watermarks[metric] - timedelta(days=ROLLUP_OVERLAP_DAYS)
+
+        with transaction.atomic():
+            stats = compute_daily_stats(metric, since)
+            existing = DailyStat.objects.filter(metric=metric)
+            if since is not None:
+                existing = existing.filter(date__gte=since)
+            existing.delete()
+            DailyStat.objects.bulk_create(stats, batch_size=batch_size)
+            RollupWatermark.objects.update_or_create(metric=metric, defaults={'rolled_up_to': today})
+        written[metric] = len(stats)
+    return written
+
+def _period_start(day, interval):
+    if interval == 'week':
+        return day - timedelta(days=day.weekday())
+    if interval == 'month':
+        return day.replace(day=1)
+    if interval == 'year':
+        return date(day.year, 1, 1)
+    return day
+
+def _periods(start, end, interval):
+    """بدايات الفترات من start إلى end"""
+    current = _period_start(start, interval)
+    if interval == 'week':
+        step = lambda day: day + timedelta(days=7)
+    elif interval == 'month':
+        step = lambda day: (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    elif interval == 'year':
+        step = lambda day: date(day.year + 1, 1, 1)
+    else:
+        step = lambda day: day + timedelta(days=1)
+    periods = []
+    while current <= end:
+        periods.append(current)
+        current = step(current)
+    return periods
+
+def _period_count(start, end, interval):
+    """عدد الفترات من start إلى end حسابياً دون بناء قائمتها"""
+    if start > end:
+        return 0
+    if interval == 'week':
+        return (_period_start(end, interval) - _period_start(start, interval)).days // 7 + 1
+    if interval == 'month':
+        return (end.year - start.year) * 12 + end.month - start.month + 1
+    if interval == 'year':
+        return end.year - start.year + 1
+    return (end - start).days + 1
+
+def chart_interval(start, end, interval):
+    """أدق دقة لا تتجاوز MAX_CHART_POINTS بدءاً من الدقة المطلوبة"""
+    for name in CHART_INTERVALS[CHART_INTERVALS.index(interval):]:
+        if _period_count(start, end, name) <= MAX_CHART_POINTS:
+            return name
+    return CHART_INTERVALS[-1]
+
+def clamp_chart_range(start, end):
+    """حصر فترة الرسم بين أول يوم في الإحصاءات اليومية واليوم
+
+    التواريخ تأتي من المستخدم: 9999-12-30 تتجاوز حدود date عند حساب الفترات،
+    و0001-01-01 تضيف قروناً من النقاط الفارغة.
+    """
+    today = timezone.localdate()
+    first_day = DailyStat.objects.aggregate(first_day=Min('date'))['first_day'] or today
+    end = min(max(end, first_day), today)
+    start = min(max(start, first_day), end)
+    return start, end
+
+def time_series_query(start, end, metrics, **dimensions):
+    """مجاميع يومية لكل مقياس من جدول الإحصاءات اليومية"""
+    return (
+        DailyStat.objects.filter(metric__in=metrics, date__range=(start, end), **dimensions)
+        .values_list('date', 'metric')
+        .annotate(total=Sum('count'), total_sum=Sum('rating_sum'))
+        .order_by()
+    )
+
+def get_time_series(start, end, interval='month', metrics=None, **dimensions):
+    """سلاسل زمنية من الإحصاءات اليومية لأي فترة، باستعلام واحد
+
+    التجميع في SQL يبقى يومياً (على الفهرس ودون دوال تاريخ لكل صف) ثم يُجمع
+    في فترات الرسم هنا.
+
+    dimensions: status أو category_id أو city_id للتصفية.
+    تعيد {'interval', 'labels', 'series': {المقياس: [الأعداد]}, 'average_rating': [...]}.
+    """
+    metrics = list(metrics or ROLLUP_SOURCES)
+    interval = chart_interval(start, end, interval)
+    rows = time_series_query(start, end, metrics, **dimensions)
+
+    periods = _periods(start, end, interval)
+    index = {period: i for i, period in enumerate(periods)}
+    series = {metric: [0] * len(periods) for metric in metrics}
+    rating_sums = [0] * len(periods)
+    for day, metric, total, total_sum in rows:
+        i = index[_period_start(day, interval)]
+        series[metric][i] += total
+        if metric == 'ratings':
+            rating_sums[i] += total_sum
+
+    ratings = series.get('ratings')
+    return {
+        'interval': interval,
+        'labels': [period.isoformat() for period in periods],
+        'series': series,
+        'average_rating': [
+            round(total / count, 2) if count else None
+            for total, count in zip(rating_sums, ratings)
+        ] if ratings is not None else [],
+    }
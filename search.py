@@ -0,0 +1,188 @@
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Conference
+
+# جدول FTS5 للبحث في المؤتمرات (rowid = معرف المؤتمر)
+SEARCH_TABLE = 'conference_search'
+
+# الحقول المفهرسة ووزن كل منها في ترتيب النتائج (bm25)
+SEARCH_FIELDS = {
+    'title': 10.0,
+    'description': 1.0,
+    'location': 3.0,
+}
+
+# أقصى عدد للنتائج المرتبة التي تُجلب من الفهرس
+SEARCH_MAX_RESULTS = 200
+
+# أقل طول لكلمة تُطابق كبادئة
+SEARCH_MIN_PREFIX = 3
+
+# الحركات (التشكيل) وحرف التطويل
+_ARABIC_DIACRITICS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+
+_ARABIC_LETTERS = str.maketrans({
+    'أ': 'ا',
+    'إ': 'ا',
+    'آ': 'ا',
+    'ٱ': 'ا',
+    'ة': 'ه',
+    'ى': 'ي',
+    'ؤ': 'و',
+    'ئ': 'ي',
+})
+
+_WORDS = re.compile(r'\w+')
+
+# أداة التعريف وما يسبقها من حروف، تُحذف من بداية الكلمة (الأطول أولاً)
+_ARABIC_ARTICLES = ('وال', 'بال', 'كال', 'فال', 'لل', 'ال')
+
+
+def normalize_arabic(text):
+    """توحيد النص العربي: حذف التشكيل والتطويل وتوحيد الهمزات والتاء المربوطة والألف المقصورة"""
+    if not text:
+        return ''
+    return _ARABIC_DIACRITICS.sub('', text).translate(_ARABIC_LETTERS).lower()
+
+def _strip_article(word):
+    for article in _ARABIC_ARTICLES:
+        if word.startswith(article) and len(word) - len(article) >= 2:
+            return word[len(article):]
+    return word
+
+def search_terms(text):
+    """كلمات النص بعد التطبيع وحذف أداة التعريف (تُستخدم للفهرسة وللبحث)"""
+    return [_strip_article(word) for word in _WORDS.findall(normalize_arabic(text))]
+
+def build_match_query(query):
+    """تحويل نص البحث إلى استعلام FTS5 آمن
+
+    كل الكلمات مطلوبة، والكلمة الأخيرة فقط تُطابق كبادئة (البحث أثناء الكتابة)؛
+    البادئات القصيرة تطابق آلاف الكلمات فتُبطئ الترتيب.
+    """
+    terms = [f'"{word}"' for word in search_terms(query)]
+    if terms and len(terms[-1]) - 2 >= SEARCH_MIN_PREFIX:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+def is_search_available():
+    return connection.vendor == 'sqlite'
+
+def create_search_index(using=DEFAULT_DB_ALIAS, **kwargs):
+    """إنشاء جدول FTS5 إن لم يكن موجوداً (يُستدعى بعد migrate)"""
+    if connections[using].vendor != 'sqlite':
+        return
+    columns = ', '.join(SEARCH_FIELDS)
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} '
+            f"USING fts5({columns}, tokenize='unicode61 remove_diacritics 2', prefix='3 4')"
+        )
+
+def _insert_sql():
+    placeholders = ', '.join(['%s'] * (len(SEARCH_FIELDS) + 1))
+    return f'INSERT INTO {SEARCH_TABLE} (rowid, {", ".join(SEARCH_FIELDS)}) VALUES ({placeholders})'
+
+def _index_rows(conferences):
+    return [
+        (conference['id'], *(' '.join(search_terms(conference[field])) for field in SEARCH_FIELDS))
+        for conference in conferences
+    ]
+
+def index_conference(conference):
+    """إضافة مؤتمر إلى الفهرس أو تحديثه"""
+    if not is_search_available():
+        return
+    row = {'id': conference.id, **{field: getattr(conference, field) for field in SEARCH_FIELDS}}
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [conference.id])
+        cursor.execute(_insert_sql(), _index_rows([row])[0])
+
+def index_conferences(conferences):
+    """إضافة مجموعة مؤتمرات جديدة إلى الفهرس بعبارة واحدة (الإدخال الجماعي لا يطلق الإشارات)"""
+    if not is_search_available():
+        return
+    rows = [
+        {'id': conference.id, **{field: getattr(conference, field) for field in SEARCH_FIELDS}}
+        for conference in conferences
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(_insert_sql(), _index_rows(rows))
+
+def unindex_conference(conference_id):
+    """حذف مؤتمر من الفهرس"""
+    if not is_search_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [conference_id])
+
+def rebuild_search_index(batch_size=2000):
+    """إعادة بناء الفهرس بالكامل من جدول المؤتمرات. تعيد عدد المؤتمرات المفهرسة"""
+    # إعادة إنشاء الجدول تطبق أي تغيير في إعدادات FTS5
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+    create_search_index()
+    conferences = Conference.objects.order_by('id').values('id', *SEARCH_FIELDS).iterator(chunk_size=batch_size)
+    count = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        batch = []
+        for conference in conferences:
+            batch.append(conference)
+            if len(batch) == batch_size:
+                cursor.executemany(_insert_sql(), _index_rows(batch))
+                count += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(_insert_sql(), _index_rows(batch))
+            count += len(batch)
+    return count
+
+def search_conference_ids(query, within=None, limit=SEARCH_MAX_RESULTS):
+    """معرفات المؤتمرات المطابقة مرتبة حسب الصلة (الأفضل أولاً)
+
+    within: queryset مؤتمرات اختياري لحصر النتائج فيه (الفلاتر تُطبق قبل الترتيب والحد).
+    """
+    match = build_match_query(query)
+    if not match:
+        return []
+
+    sql = f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s'
+    params = [match]
+    using = DEFAULT_DB_ALIAS
+    if within is not None:
+        # نفس القاعدة التي يُقرأ منها queryset (الأساسية أو نسخة القراءة)
+        using = within.db
+        # فحص كل نتيجة بالمفتاح الأساسي بدلاً من "rowid IN (...)" الذي يجعل
+        # FTS5 يعيد تنفيذ MATCH لكل معرف أو يبني قائمة بكل المؤتمرات
+        within = within.order_by().filter(pk=RawSQL(f'{SEARCH_TABLE}.rowid', ())).values('pk')
+        within_sql, within_params = within.query.sql_with_params()
+        sql += f' AND EXISTS ({within_sql})'
+        params.extend(within_params)
+
+    weights = ', '.join(str(weight) for weight in SEARCH_FIELDS.values())
+    sql += f' ORDER BY bm25({SEARCH_TABLE}, {weights}) LIMIT %s'
+    params.append(limit)
+
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+def search_conferences(queryset, query, limit=SEARCH_MAX_RESULTS):
+    """البحث داخل queryset مؤتمرات، وتعيد قائمة مرتبة حسب الصلة"""
+    if not is_search_available():
+        # قواعد بيانات أخرى: بحث بسيط غير مرتب
+        for word in query.split():
+            queryset = queryset.filter(
+                Q(title__icontains=word) | Q(description__icontains=word) | Q(location__icontains=word)
+            )
+        return list(queryset[:limit])
+
+    ids = search_conference_ids(query, within=queryset, limit=limit)
+    if not ids:
+        return []
+    rank = {conference_id: position for position, conference_id in enumerate(ids)}
+    return sorted(queryset.filter(id__in=ids), key=lambda conference: rank[conference.id])
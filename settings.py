@@ -23,20 +23,28 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # قياس زمن الطلبات واستعلاماتها (أولاً حتى يشمل الزمن الكلي بقية الطبقات)
+    'conference.request_metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # الملفات الثابتة المشفرة والمضغوطة مسبقاً من داخل العملية (بعد collectstatic)
+    'conference.static_files.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # القراءة بعد الكتابة: من كتب للتو يقرأ من القاعدة الأساسية لا من النسخة
+    'conference.db_router.ReplicaPinMiddleware',
 ]
 
 ROOT_URLCONF = 'smart_conference.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates مع قياس زمن القوالب لترويسة Server-Timing (انظر request_metrics.py)
+        'BACKEND': 'conference.request_metrics.TimedDjangoTemplates',
+        'NAME': 'django',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],  # إضافة هذا السطر
         'APP_DIRS': True,
         'OPTIONS': {
@@ -46,20 +54,92 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'django.template.context_processors.media',  # إضافة هذا
+                # اسم المنصة وبيانات التواصل من ذاكرة البيانات المرجعية
+                'conference.reference_data.site_settings',
             ],
         },
     },
 ]
 
 WSGI_APPLICATION = 'smart_conference.wsgi.application'
+# البث المباشر لإحصائيات لوحة التحكم (SSE) يتطلب التشغيل عبر ASGI
+# (مثلاً: uvicorn smart_conference.asgi:application)؛ تحت WSGI تستعلم اللوحة دورياً
+ASGI_APPLICATION = 'smart_conference.asgi.application'
 
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        # اتصال دائم لكل عملية/خيط بدلاً من اتصال جديد لكل طلب
+        # (WAL و busy_timeout وبقية الإعدادات في conference/sqlite_profile.py)
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'TEST': {
+            # قاعدة اختبار في ملف (لا في الذاكرة) حتى تعمل اختبارات التزامن بوضع WAL
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
+    },
+    # نسخة للقراءة: التحليلات والتصدير وقوائم الزوار (conference/db_router.py).
+    # محلياً هي لقطة SQLite تُحدّث دورياً بالأمر snapshot_replica، وإن لم توجد
+    # تُقرأ البيانات من القاعدة الأساسية. يمكن استبدالها بنسخة متزامنة من خادم قاعدة بيانات.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db_replica.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
 }
 
+DATABASE_ROUTERS = ['conference.db_router.ReplicaRouter']
+
+# ذاكرة التخزين المؤقت للصفحات العامة ولأرقام إصداراتها.
+# عند التشغيل بعدة عمليات يجب استخدام ذاكرة مشتركة (Redis أو Memcached)
+# حتى يصل إبطال الصفحات إلى جميع العمليات فوراً.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'smart-conference',
+    },
+    # نتائج البحث في الصفحة الرئيسية: عبارات حرة، فتُحصر في ذاكرة مستقلة حتى لا تطرد الصفحات
+    'search': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'smart-conference-search',
+        'OPTIONS': {'MAX_ENTRIES': 500},
+    },
+}
+
+# سجل الطلبات البطيئة: سطر JSON لكل طلب (الحدود ونسبة العينة في conference/request_metrics.py)
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'slow_requests': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        'conference.request_metrics': {
+            'handlers': ['slow_requests'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+# المستخدم وملفه الشخصي باستعلام واحد في كل طلب (conference/accounts.py).
+# ModelBackend يبقى للجلسات التي أُنشئت قبل إضافته
+AUTHENTICATION_BACKENDS = [
+    'conference.accounts.ProfileModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -84,6 +164,17 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+# collectstatic يولد أسماء مشفرة بالمحتوى ونسخ .gz/.br (conference/static_files.py)،
+# وStaticFilesMiddleware يخدمها بـ Cache-Control: immutable
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'conference.static_files.CompressedManifestStaticFilesStorage',
+    },
+}
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
@@ -91,4 +182,15 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/dashboard/'
-LOGOUT_REDIRECT_URL = '/login/'
\ No newline at end of file
+LOGOUT_REDIRECT_URL = '/login/'
+
+# البريد الصادر: يرسله الأمر send_notifications على دفعات عبر اتصال SMTP واحد
+# الخادم من متغيرات البيئة؛ في وضع التطوير المنفذ الافتراضي 1025
+# (للتجربة محلياً: python -m aiosmtpd -n -l localhost:1025)
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 1025 if DEBUG else 25))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS') == '1'
+EMAIL_TIMEOUT = 10
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'no-reply@smart-conference.local')
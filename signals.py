@@ -0,0 +1,188 @@
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+
+from .counters import CONFERENCE_STATUS_FIELDS, USER_TYPE_FIELDS, bump_counters
+from .models import (
+    UserProfile, Category, Conference, ConferenceRequest, Rating, Attendance, SyrianCity,
+    ConferenceRatingSummary, SystemSetting
+)
+from .rating_summary import bump_rating_summary, rating_deltas
+from .search import SEARCH_FIELDS, index_conference, unindex_conference
+from .page_cache import bump_listings_version
+from .reference_data import bump_reference_version
+from .avatars import queue_avatar_processing
+
+# ====== عدادات المنصة ======
+# كل دالة تعيد مساهمة السجل في العدادات، أو None إذا لم تُحمّل الحقول اللازمة
+
+def _user_profile_counts(instance):
+    user_type = instance.__dict__.get('user_type')
+    is_approved = instance.__dict__.get('is_approved')
+    if user_type is None or is_approved is None:
+        return None
+    counts = {'total_users': 1, 'approved_users': int(is_approved)}
+    if user_type in USER_TYPE_FIELDS:
+        counts[USER_TYPE_FIELDS[user_type]] = 1
+    return counts
+
+def _conference_counts(instance):
+    status = instance.__dict__.get('status')
+    if status is None:
+        return None
+    counts = {'total_conferences': 1}
+    if status in CONFERENCE_STATUS_FIELDS:
+        counts[CONFERENCE_STATUS_FIELDS[status]] = 1
+    return counts
+
+def _conference_request_counts(instance):
+    status = instance.__dict__.get('status')
+    if status is None:
+        return None
+    return {'pending_requests': int(status == 'pending')}
+
+def _rating_counts(instance):
+    return {'total_ratings': 1}
+
+def _attendance_counts(instance):
+    attended = instance.__dict__.get('attended')
+    if attended is None:
+        return None
+    return {'total_attendances': 1, 'total_attended': int(attended)}
+
+COUNTED_MODELS = {
+    UserProfile: _user_profile_counts,
+    Conference: _conference_counts,
+    ConferenceRequest: _conference_request_counts,
+    Rating: _rating_counts,
+    Attendance: _attendance_counts,
+}
+
+def remember_counted_state(sender, instance, **kwargs):
+    """حفظ مساهمة السجل عند تحميله لمعرفة ما تغيّر عند الحفظ"""
+    instance._counted = COUNTED_MODELS[sender](instance)
+
+def update_counters_on_save(sender, instance, created, **kwargs):
+    new = COUNTED_MODELS[sender](instance)
+    old = getattr(instance, '_counted', None)
+
+    if created:
+        bump_counters(new or {})
+    elif old is not None and new is not None:
+        bump_counters({
+            field: new.get(field, 0) - old.get(field, 0)
+            for field in old.keys() | new.keys()
+        })
+    instance._counted = new
+
+def update_counters_on_delete(sender, instance, **kwargs):
+    old = getattr(instance, '_counted', None) or COUNTED_MODELS[sender](instance)
+    if old:
+        bump_counters({field: -delta for field, delta in old.items()})
+
+for model in COUNTED_MODELS:
+    post_init.connect(remember_counted_state, sender=model, dispatch_uid=f'counters_init_{model.__name__}')
+    post_save.connect(update_counters_on_save, sender=model, dispatch_uid=f'counters_save_{model.__name__}')
+    post_delete.connect(update_counters_on_delete, sender=model, dispatch_uid=f'counters_delete_{model.__name__}')
+
+# ====== ملخص تقييمات المؤتمر ======
+
+def _rated(instance):
+    conference_id = instance.__dict__.get('conference_id')
+    rating = instance.__dict__.get('rating')
+    if conference_id is None or rating is None:
+        return None
+    return conference_id, rating
+
+def remember_rating(sender, instance, **kwargs):
+    instance._rated = _rated(instance)
+
+def update_rating_summary_on_save(sender, instance, created, **kwargs):
+    new = _rated(instance)
+    old = getattr(instance, '_rated', None)
+
+    if created:
+        if new:
+            bump_rating_summary(new[0], rating_deltas(new[1]))
+    elif old and new and old != new:
+        # تغيّرت قيمة التقييم (أو المؤتمر نفسه)
+        bump_rating_summary(old[0], rating_deltas(old[1], sign=-1))
+        bump_rating_summary(new[0], rating_deltas(new[1]))
+    instance._rated = new
+
+def update_rating_summary_on_delete(sender, instance, **kwargs):
+    old = getattr(instance, '_rated', None) or _rated(instance)
+    if old:
+        bump_rating_summary(old[0], rating_deltas(old[1], sign=-1))
+
+def create_rating_summary(sender, instance, created, **kwargs):
+    if created:
+        ConferenceRatingSummary.objects.get_or_create(conference=instance)
+
+post_init.connect(remember_rating, sender=Rating, dispatch_uid='rating_summary_init')
+post_save.connect(update_rating_summary_on_save, sender=Rating, dispatch_uid='rating_summary_save')
+post_delete.connect(update_rating_summary_on_delete, sender=Rating, dispatch_uid='rating_summary_delete')
+post_save.connect(create_rating_summary, sender=Conference, dispatch_uid='rating_summary_create')
+
+# ====== فهرس البحث ======
+
+def update_search_index(sender, instance, created, update_fields=None, **kwargs):
+    if created or update_fields is None or set(update_fields) & set(SEARCH_FIELDS):
+        index_conference(instance)
+
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_conference(instance.id)
+
+post_save.connect(update_search_index, sender=Conference, dispatch_uid='search_index_save')
+post_delete.connect(remove_from_search_index, sender=Conference, dispatch_uid='search_index_delete')
+
+# ====== ذاكرة الصفحات العامة ======
+
+def invalidate_listings(sender, **kwargs):
+    bump_listings_version()
+
+# SystemSetting: اسم المنصة وبيانات التواصل تظهر في كل صفحة
+for model in (Conference, Category, SyrianCity, SystemSetting):
+    post_save.connect(invalidate_listings, sender=model, dispatch_uid=f'listings_save_{model.__name__}')
+    post_delete.connect(invalidate_listings, sender=model, dispatch_uid=f'listings_delete_{model.__name__}')
+
+# ====== البيانات المرجعية ======
+
+def invalidate_reference_data(sender, **kwargs):
+    bump_reference_version()
+
+for model in (SystemSetting, Category, SyrianCity):
+    post_save.connect(invalidate_reference_data, sender=model, dispatch_uid=f'reference_save_{model.__name__}')
+    post_delete.connect(invalidate_reference_data, sender=model, dispatch_uid=f'reference_delete_{model.__name__}')
+
+# ====== النسخ المصغرة للصورة الشخصية ======
+
+def _picture_name(instance):
+    # None إذا لم يُحمّل الحقل (only/defer)
+    value = instance.__dict__.get('profile_picture')
+    return getattr(value, 'name', value)
+
+def remember_avatar(sender, instance, **kwargs):
+    instance._avatar_name = _picture_name(instance) or ''
+
+def reset_avatar_on_change(sender, instance, **kwargs):
+    name = _picture_name(instance)
+    if name is not None and (name or '') != getattr(instance, '_avatar_name', ''):
+        instance.avatar_processed_at = None
+
+def process_avatar_on_save(sender, instance, **kwargs):
+    name = _picture_name(instance)
+    if name is None:
+        return
+    previous = getattr(instance, '_avatar_name', '')
+    if (name or '') != previous:
+        queue_avatar_processing(instance.pk, previous_name=previous or None)
+    instance._avatar_name = name or ''
+
+def delete_avatar_on_delete(sender, instance, **kwargs):
+    name = _picture_name(instance) or getattr(instance, '_avatar_name', '')
+    if name:
+        queue_avatar_processing(instance.pk, previous_name=name)
+
+post_init.connect(remember_avatar, sender=UserProfile, dispatch_uid='avatar_init')
+pre_save.connect(reset_avatar_on_change, sender=UserProfile, dispatch_uid='avatar_pre_save')
+post_save.connect(process_avatar_on_save, sender=UserProfile, dispatch_uid='avatar_save')
+post_delete.connect(delete_avatar_on_delete, sender=UserProfile, dispatch_uid='avatar_delete')
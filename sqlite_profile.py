@@ -0,0 +1,27 @@
+from django.conf import settings
+
+# إعدادات SQLite للإنتاج، تُطبق على كل اتصال جديد
+SQLITE_PRAGMAS = getattr(settings, 'SQLITE_PRAGMAS', {
+    # القراء لا ينتظرون الكاتب، والكاتب لا ينتظر القراء
+    'journal_mode': 'WAL',
+    # آمن مع WAL: قد تضيع آخر معاملة عند انقطاع الكهرباء فقط، دون تلف القاعدة
+    'synchronous': 'NORMAL',
+    # انتظار تحرير قفل الكتابة (بالملي ثانية) بدلاً من "database is locked" فوراً
+    'busy_timeout': 20000,
+    # ذاكرة صفحات لكل اتصال (قيمة سالبة = كيلوبايت)
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+})
+
+
+def apply_pragmas(cursor, pragmas=None):
+    for name, value in (SQLITE_PRAGMAS if pragmas is None else pragmas).items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """ربط على connection_created: تطبيق إعدادات SQLite على الاتصال الجديد"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor)
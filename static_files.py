@@ -0,0 +1,165 @@
+import gzip
+import mimetypes
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_etags
+
+try:
+    import brotli
+except ImportError:  # brotli اختياري: تُولد نسخ gzip فقط
+    brotli = None
+
+# الامتدادات التي تُضغط مسبقاً (الصور والخطوط مضغوطة أصلاً)
+STATIC_COMPRESS_EXTENSIONS = getattr(
+    settings, 'STATIC_COMPRESS_EXTENSIONS',
+    ('.css', '.js', '.map', '.svg', '.json', '.txt', '.xml', '.html', '.ico', '.eot', '.ttf'),
+)
+
+# لا تُحفظ النسخة المضغوطة إلا إذا وفّرت هذه النسبة على الأقل
+STATIC_MIN_SAVING = 0.05
+
+# الملفات ذات الأسماء المشفرة لا يتغير محتواها؛ البقية تُخزن لمدة قصيرة
+STATIC_IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+STATIC_CACHE_CONTROL = getattr(settings, 'STATIC_CACHE_CONTROL', 'public, max-age=60')
+
+# {الترميز: امتداد الملف} بترتيب الأفضلية
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+
+def _compress(content):
+    variants = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(content, quality=11)
+    return variants
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """أسماء مشفرة بالمحتوى (manifest) مع نسخ .gz و.br مضغوطة مسبقاً عند collectstatic"""
+
+    def post_process(self, paths, dry_run=False, **options):
+        hashed_names = []
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names.append(hashed_name)
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for hashed_name in dict.fromkeys(hashed_names):
+            if not hashed_name.endswith(STATIC_COMPRESS_EXTENSIONS):
+                continue
+            with self.open(hashed_name) as f:
+                content = f.read()
+            for suffix, compressed in _compress(content).items():
+                if len(compressed) > len(content) * (1 - STATIC_MIN_SAVING):
+                    continue
+                path = self.path(hashed_name + suffix)
+                with open(path, 'wb') as f:
+                    f.write(compressed)
+                yield hashed_name + suffix, hashed_name + suffix, True
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # قبل تشغيل collectstatic (الاختبارات والتطوير): الاسم الأصلي تخدمه finders
+            return name
+
+
+class StaticFile:
+    """ملف ثابت جاهز للخدمة مع نسخه المضغوطة"""
+
+    def __init__(self, path, immutable):
+        stat = os.stat(path)
+        self.path = path
+        self.size = stat.st_size
+        self.last_modified = http_date(stat.st_mtime)
+        self.etag = f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+        self.content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self.cache_control = STATIC_IMMUTABLE_CACHE_CONTROL if immutable else STATIC_CACHE_CONTROL
+        self.encoded = {
+            encoding: (path + suffix, os.path.getsize(path + suffix))
+            for encoding, suffix in ENCODINGS
+            if os.path.exists(path + suffix)
+        }
+
+    def select(self, accept_encoding):
+        """(المسار، الحجم، الترميز) لأفضل نسخة يقبلها المتصفح"""
+        accepted = set()
+        for part in accept_encoding.split(','):
+            token, _, params = part.partition(';')
+            params = params.replace(' ', '')
+            try:
+                quality = float(params[2:]) if params.startswith('q=') else 1.0
+            except ValueError:
+                quality = 1.0
+            if quality > 0:
+                accepted.add(token.strip().lower())
+        for encoding, _ in ENCODINGS:
+            if encoding in self.encoded and (encoding in accepted or '*' in accepted):
+                return (*self.encoded[encoding], encoding)
+        return self.path, self.size, None
+
+
+class StaticFilesMiddleware:
+    """خدمة STATIC_ROOT من داخل العملية دون خادم ويب خارجي
+
+    يُفهرس المجلد مرة واحدة عند بدء العملية (يلزم إعادة التشغيل بعد collectstatic).
+    الملفات ذات الأسماء المشفرة تُرسل بـ Cache-Control: immutable، والنسخة
+    المضغوطة مسبقاً تُختار حسب Accept-Encoding.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = '/' + settings.STATIC_URL.lstrip('/')
+        self.files = self._index(settings.STATIC_ROOT)
+        if not self.files:
+            # لم يُشغّل collectstatic: تُخدم الملفات كما في السابق (runserver أو static())
+            raise MiddlewareNotUsed
+
+    def _index(self, root):
+        if not root or not os.path.isdir(root):
+            return {}
+        hashed = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+        compressed_suffixes = tuple(suffix for _, suffix in ENCODINGS)
+        files = {}
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, root).replace(os.sep, '/')
+                if name.endswith(compressed_suffixes) and os.path.exists(path.rsplit('.', 1)[0]):
+                    continue
+                files[self.prefix + name] = StaticFile(path, name in hashed)
+        return files
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD') and request.path_info.startswith(self.prefix):
+            static_file = self.files.get(request.path_info)
+            if static_file is not None:
+                return self._serve(request, static_file)
+        return self.get_response(request)
+
+    def _serve(self, request, static_file):
+        path, size, encoding = static_file.select(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        etag = static_file.etag if encoding is None else f'{static_file.etag[:-1]}-{encoding}"'
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = HttpResponseNotModified()
+        else:
+            if request.method == 'HEAD':
+                response = HttpResponse(content_type=static_file.content_type)
+            else:
+                response = FileResponse(open(path, 'rb'), content_type=static_file.content_type)
+                # FileResponse يضيف اسم الملف المضغوط (.br/.gz) كمرفق
+                del response['Content-Disposition']
+            response['Content-Length'] = size
+            if encoding is not None:
+                response['Content-Encoding'] = encoding
+        response['ETag'] = etag
+        response['Last-Modified'] = static_file.last_modified
+        response['Cache-Control'] = static_file.cache_control
+        if static_file.encoded:
+            response['Vary'] = 'Accept-Encoding'
+        return response
@@ -0,0 +1,255 @@
+import random
+from collections import defaultdict
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from .counters import reconcile_counters
+from .models import (
+    UserProfile, Conference, Category, ConferenceRequest, Rating, Attendance, SyrianCity
+)
+from .page_cache import bump_listings_version
+from .rating_summary import repair_rating_summaries
+from .reference_data import bump_reference_version
+from .registration import sync_current_attendees
+from .rollups import update_daily_stats
+from .search import is_search_available, rebuild_search_index
+
+# الأحجام عند scale=1 (تُضرب في معامل الحجم)
+SYNTHETIC_USERS = 1000
+SYNTHETIC_CONFERENCES = 200
+
+# متوسط التقييمات والتسجيلات لكل مؤتمر (لا تتأثر بمعامل الحجم)
+RATINGS_PER_CONFERENCE = 25
+ATTENDANCE_PER_CONFERENCE = 50
+
+SYNTHETIC_BATCH_SIZE = 1000
+
+# كلمة مرور جميع المستخدمين المولدين (تُشفّر مرة واحدة فقط)
+SYNTHETIC_PASSWORD = 'synthetic-pass'
+
+# تُوزع تواريخ الإنشاء على هذه المدة الماضية
+SYNTHETIC_HISTORY_DAYS = 400
+
+# أوزان أنواع المستخدمين وحالات المؤتمرات
+USER_TYPE_WEIGHTS = {'organizer': 8, 'speaker': 4, 'attendee': 88}
+CONFERENCE_STATUS_WEIGHTS = {
+    'pending': 15, 'approved': 30, 'active': 20, 'completed': 25, 'rejected': 5, 'cancelled': 5,
+}
+# توزيع النجوم: التقييمات المرتفعة أكثر شيوعاً
+RATING_WEIGHTS = {1: 5, 2: 8, 3: 20, 4: 35, 5: 32}
+
+CATEGORY_NAMES = [
+    'الذكاء الاصطناعي', 'الطاقة المتجددة', 'الطب والصحة', 'التعليم', 'ريادة الأعمال',
+    'الأمن السيبراني', 'الزراعة', 'الهندسة المدنية', 'الاقتصاد', 'الإعلام', 'البيئة', 'القانون',
+]
+FIRST_NAMES = ['أحمد', 'محمد', 'سارة', 'ليلى', 'عمر', 'رنا', 'خالد', 'هبة', 'يوسف', 'نور', 'علي', 'إسراء']
+LAST_NAMES = ['الحلبي', 'الشامي', 'الحمصي', 'العلي', 'الخطيب', 'السيد', 'النجار', 'الحسن', 'داود', 'إبراهيم']
+CONFERENCE_KINDS = ['مؤتمر', 'ملتقى', 'ندوة', 'منتدى', 'ورشة']
+CONFERENCE_ADJECTIVES = ['الدولي', 'الوطني', 'السنوي', 'العلمي', 'الإقليمي']
+DESCRIPTION_SENTENCES = [
+    'يجمع المؤتمر باحثين وخبراء من الجامعات والقطاع الخاص.',
+    'تتضمن الفعاليات محاضرات وجلسات نقاش وورش عمل تطبيقية.',
+    'يهدف إلى تبادل الخبرات وعرض أحدث الأبحاث والتجارب.',
+    'تُنشر الأوراق المقبولة في كتاب وقائع المؤتمر.',
+    'يتاح للمشاركين التواصل مع الجهات الداعمة وفرص التعاون.',
+    'يُختتم بتوصيات تُرفع إلى الجهات المعنية.',
+]
+LOCATIONS = ['قاعة المؤتمرات الكبرى', 'مدرج الجامعة', 'فندق الشام', 'مركز الثقافة', 'قاعة رضا سعيد']
+COMMENTS = ['', '', 'مؤتمر مفيد جداً', 'تنظيم ممتاز', 'المحاضرات قيمة', 'القاعة مزدحمة', 'أتمنى تكراره']
+
+
+def _choice(rng, weights):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+def _bulk_create(model, objects, batch_size):
+    created = []
+    for start in range(0, len(objects), batch_size):
+        created.extend(model.objects.bulk_create(objects[start:start + batch_size]))
+    return created
+
+def _set_dates(model, field, dates, batch_size):
+    """كتابة تواريخ الإنشاء (auto_now_add يتجاهل القيم الممررة إلى bulk_create)
+
+    dates: {المعرف: التاريخ}. التواريخ مقربة إلى اليوم فيُكتب كل يوم بتحديث واحد.
+    """
+    now = timezone.now()
+    by_day = defaultdict(list)
+    for object_id, value in dates.items():
+        # ظهر اليوم الحالي قد يكون في المستقبل
+        by_day[min(value.replace(hour=12, minute=0, second=0, microsecond=0), now)].append(object_id)
+    for value, ids in by_day.items():
+        for start in range(0, len(ids), batch_size):
+            model.objects.filter(id__in=ids[start:start + batch_size]).update(**{field: value})
+
+def generate_synthetic_data(scale=1.0, seed=None, prefix='demo', batch_size=SYNTHETIC_BATCH_SIZE):
+    """توليد بيانات واقعية الحجم بإدخال جماعي، مع تحديث العدادات والملخصات والفهرس
+
+    تعيد عدد الصفوف المنشأة لكل جدول.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+
+    def past(days=SYNTHETIC_HISTORY_DAYS):
+        return now - timedelta(days=rng.uniform(0, days))
+
+    user_count = max(int(SYNTHETIC_USERS * scale), 10)
+    conference_count = max(int(SYNTHETIC_CONFERENCES * scale), 2)
+    offset = User.objects.filter(username__startswith=f'{prefix}_').count()
+    password = make_password(SYNTHETIC_PASSWORD)
+
+    with transaction.atomic():
+        cities = list(SyrianCity.objects.all())
+        if not cities:
+            cities = SyrianCity.objects.bulk_create([
+                SyrianCity(name=name, governorate=name) for name in ('دمشق', 'حلب', 'حمص', 'اللاذقية')
+            ])
+
+        admin = User.objects.create(
+            username=f'{prefix}_admin_{offset}', password=password, first_name='مدير', is_staff=True
+        )
+        users = _bulk_create(User, [
+            User(
+                username=f'{prefix}_{offset + i}',
+                password=password,
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                email=f'{prefix}_{offset + i}@example.com',
+                date_joined=past(),
+            )
+            for i in range(user_count)
+        ], batch_size)
+
+        profiles = _bulk_create(UserProfile, [
+            UserProfile(user=admin, user_type='admin', phone='0900000000', address='دمشق', is_approved=True),
+            *(
+                UserProfile(
+                    user=user,
+                    user_type=_choice(rng, USER_TYPE_WEIGHTS),
+                    phone=f'09{rng.randint(10000000, 99999999)}',
+                    address=rng.choice(LOCATIONS),
+                    city=rng.choice(cities),
+                    is_approved=rng.random() < 0.9,
+                )
+                for user in users
+            ),
+        ], batch_size)
+        _set_dates(UserProfile, 'created_at', {
+            profile.id: profile.user.date_joined for profile in profiles[1:]
+        }, batch_size)
+
+        categories = _bulk_create(Category, [
+            Category(name=name, description=f'مؤتمرات {name}', created_by=admin)
+            for name in CATEGORY_NAMES
+        ], batch_size)
+
+        organizers = [profile for profile in profiles if profile.user_type == 'organizer'] or profiles[1:]
+        conferences = []
+        created_dates = {}
+        for i in range(conference_count):
+            status = _choice(rng, CONFERENCE_STATUS_WEIGHTS)
+            created_at = past()
+            if status == 'completed':
+                start_date = created_at + timedelta(days=rng.uniform(0, (now - created_at).days))
+            else:
+                start_date = now + timedelta(days=rng.uniform(1, 180))
+            category = rng.choice(categories)
+            conferences.append(Conference(
+                title=(
+                    f'{rng.choice(CONFERENCE_KINDS)} {category.name} '
+                    f'{rng.choice(CONFERENCE_ADJECTIVES)} {start_date.year} ({offset + i})'
+                ),
+                description=' '.join(rng.sample(DESCRIPTION_SENTENCES, 3)),
+                category=category,
+                organizer=rng.choice(organizers),
+                start_date=start_date,
+                end_date=start_date + timedelta(days=rng.randint(1, 3)),
+                location=rng.choice(LOCATIONS),
+                city=rng.choice(cities),
+                max_attendees=rng.choice([50, 100, 200, 500]),
+                status=status,
+                is_featured=rng.random() < 0.05,
+            ))
+            created_dates[i] = created_at
+        conferences = _bulk_create(Conference, conferences, batch_size)
+        _set_dates(Conference, 'created_at', {
+            conference.id: created_dates[i] for i, conference in enumerate(conferences)
+        }, batch_size)
+
+        requests = []
+        for conference in conferences:
+            if conference.status == 'pending':
+                requests.append(ConferenceRequest(
+                    conference=conference, requested_by=conference.organizer, request_type='approval',
+                ))
+            elif conference.status in ('approved', 'rejected', 'active', 'completed'):
+                requests.append(ConferenceRequest(
+                    conference=conference,
+                    requested_by=conference.organizer,
+                    request_type='approval',
+                    status='rejected' if conference.status == 'rejected' else 'approved',
+                    reviewed_by=admin,
+                    reviewed_at=now,
+                ))
+        requests = _bulk_create(ConferenceRequest, requests, batch_size)
+
+        profile_ids = [profile.id for profile in profiles[1:]]
+        ratings = []
+        attendances = []
+        registered_dates = []
+        for i, conference in enumerate(conferences):
+            if conference.status in ('active', 'completed'):
+                count = min(rng.randint(0, 2 * RATINGS_PER_CONFERENCE), len(profile_ids))
+                ratings.extend(
+                    Rating(
+                        conference_id=conference.id,
+                        user_id=user_id,
+                        rating=_choice(rng, RATING_WEIGHTS),
+                        comment=rng.choice(COMMENTS),
+                    )
+                    for user_id in rng.sample(profile_ids, count)
+                )
+            if conference.status in ('approved', 'active', 'completed'):
+                count = min(
+                    rng.randint(0, 2 * ATTENDANCE_PER_CONFERENCE), conference.max_attendees, len(profile_ids)
+                )
+                completed = conference.status == 'completed'
+                # التسجيل بين إنشاء المؤتمر وبدئه (أو اليوم إن لم يبدأ بعد)
+                registration_days = (min(conference.start_date, now) - created_dates[i]).total_seconds() / 86400
+                for user_id in rng.sample(profile_ids, count):
+                    attended = completed and rng.random() < 0.7
+                    attendances.append(Attendance(
+                        conference_id=conference.id,
+                        user_id=user_id,
+                        attended=attended,
+                        attended_at=conference.start_date if attended else None,
+                    ))
+                    registered_dates.append(created_dates[i] + timedelta(days=rng.uniform(0, registration_days)))
+        ratings = _bulk_create(Rating, ratings, batch_size)
+        _set_dates(Rating, 'created_at', {rating.id: past(90) for rating in ratings}, batch_size)
+        attendances = _bulk_create(Attendance, attendances, batch_size)
+        _set_dates(Attendance, 'registered_at', {
+            attendance.id: registered_at for attendance, registered_at in zip(attendances, registered_dates)
+        }, batch_size)
+
+        # الإدخال الجماعي لا يرسل إشارات: نعيد حساب كل ما تحدّثه الإشارات عادة
+        sync_current_attendees()
+        repair_rating_summaries()
+        reconcile_counters()
+        update_daily_stats(rebuild=True)
+        if is_search_available():
+            rebuild_search_index()
+        bump_listings_version()
+        bump_reference_version()
+
+    return {
+        'users': len(users) + 1,
+        'categories': len(categories),
+        'conferences': len(conferences),
+        'requests': len(requests),
+        'ratings': len(ratings),
+        'attendances': len(attendances),
+    }
@@ -0,0 +1,29 @@
+from django import template
+from django.utils.html import format_html
+
+from ..avatars import AVATAR_SIZES, avatar_variant_urls
+
+register = template.Library()
+
+
+@register.simple_tag
+def avatar(profile, size='medium', css_class='', alt='صورة الملف الشخصي'):
+    """الصورة الشخصية بالحجم المطلوب: WebP مع بديل JPEG، وبدقة 2x للشاشات عالية الكثافة
+
+    قبل انتهاء المعالجة تُعرض الصورة الأصلية بالأبعاد نفسها.
+    """
+    px = AVATAR_SIZES[size]
+    urls = avatar_variant_urls(profile, size)
+    if urls is None:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" width="{}" height="{}" style="object-fit: cover;">',
+            profile.profile_picture.url, alt, css_class, px, px,
+        )
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{} 1x, {} 2x">'
+        '<img src="{}" srcset="{} 2x" alt="{}" class="{}" width="{}" height="{}">'
+        '</picture>',
+        urls['webp'][0], urls['webp'][1],
+        urls['jpg'][0], urls['jpg'][1], alt, css_class, px, px,
+    )
@@ -1,3 +1,1486 @@
-from django.test import TestCase
+import csv
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend as LocmemEmailBackend
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.template import engines
+from django.template.backends.django import Template as DjangoTemplate
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import Workbook, load_workbook
+from PIL import Image
+
+from .models import (
+    UserProfile, Conference, ConferenceRequest, Category, SyrianCity, Rating, Attendance,
+    ConferenceRatingSummary, SystemSetting, DailyStat, ExportJob, ImportJob, Notification, NotificationDelivery
+)
+from .exports import (
+    EXCEL_MAX_COLUMN_WIDTH, USERS_REPORT_COLUMNS, XLSX_CONTENT_TYPE, iter_csv, iter_users_report_rows, write_xlsx
+)
+from .export_jobs import (
+    EXPORT_JOB_TIMEOUT, EXPORT_REUSE_WINDOW, claim_next_job, purge_expired_exports, request_export, requeue_stale_jobs,
+    run_export_job
+)
+from .moderation import delete_users, review_conference_requests, set_users_approval
+from .notifications import deliver_notifications, expand_notifications
+from .rating_summary import compute_rating_summaries, repair_rating_summaries
+from .registration import register_attendance, cancel_attendance, REGISTERED, CONFERENCE_FULL
+from .search import normalize_arabic, search_conferences
+from .query_audit import explain, full_table_scans
+from .counters import compute_counters, get_counters
+from .synthetic_data import generate_synthetic_data
+from .reference_data import (
+    SITE_SETTING_LABELS, get_categories, get_cities, get_site_settings, save_site_settings
+)
+from . import db_router, live_stats, request_metrics
+from .live_stats import iter_stats_events
+from .accounts import ProfileModelBackend
+from .avatars import AVATAR_SIZES, avatar_variant_name, process_avatar
+from .rollups import chart_interval, get_time_series, update_daily_stats
+from .imports import IMPORT_POOL_MIN_PASSWORDS, run_import, run_import_job
+from .management.commands.benchmark_analytics import naive_breakdown
+from .static_files import StaticFilesMiddleware
+from .views import CONFERENCES_PAGE_SIZE, USERS_PAGE_SIZE
+
+
+class CsvExportTests(TestCase):
+    """تصدير CSV متدفق على دفعات"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', first_name='مدير')
+        UserProfile.objects.create(user=cls.admin, user_type='admin', is_approved=True)
+        for i in range(4):
+            UserProfile.objects.create(user=User.objects.create_user(f'user{i}', email=f'u{i}@uni.sy'))
+
+    def test_header_is_sent_before_first_query(self):
+        chunks = iter_csv(iter_users_report_rows(), USERS_REPORT_COLUMNS)
+        with self.assertNumQueries(0):
+            first = next(chunks)
+        self.assertTrue(first.startswith('\ufeff'))
+        self.assertEqual(next(csv.reader(StringIO(first[1:]))), USERS_REPORT_COLUMNS)
+
+    def test_rows_are_written_in_batches(self):
+        rows = [[i, f'قيمة {i}'] for i in range(5)]
+        chunks = list(iter_csv(iter(rows), ['رقم', 'قيمة'], chunk_size=2))
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual([len(list(csv.reader(StringIO(chunk)))) for chunk in chunks[1:]], [2, 2, 1])
+        self.assertEqual(list(csv.reader(StringIO(''.join(chunks[1:])))), [[str(i), f'قيمة {i}'] for i in range(5)])
+
+    def test_report_rows_use_chunked_iterator(self):
+        iterator = type(UserProfile.objects.all()).iterator
+        with mock.patch.object(type(UserProfile.objects.all()), 'iterator', autospec=True, side_effect=iterator) as spy, \
+                self.assertNumQueries(1):
+            rows = list(iter_users_report_rows(chunk_size=2))
+        self.assertEqual(spy.call_args.kwargs, {'chunk_size': 2})
+        self.assertEqual(len(rows), 5)
+
+    def test_export_view_streams_csv(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('export_reports'), {'type': 'users', 'format': 'csv'})
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertTrue(response['Content-Disposition'].startswith("attachment; filename*=utf-8''"))
+
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertTrue(content.startswith('\ufeff'))
+        rows = list(csv.reader(StringIO(content[1:])))
+        self.assertEqual(rows[0], USERS_REPORT_COLUMNS)
+        self.assertEqual([row[0] for row in rows[1:]], ['admin', 'user0', 'user1', 'user2', 'user3'])
+        self.assertEqual(rows[2][4], 'u0@uni.sy')
+
+
+class XlsxExportTests(TestCase):
+    """ملفات Excel بوضع write_only: الأعمدة بعد Z وعرضها والاستجابة من ملف مؤقت"""
+
+    def test_wide_sheet_cells_and_widths(self):
+        columns = [f'عمود {i}' for i in range(30)]
+        rows = [[f'{row}-{col}' for col in range(30)] for row in range(5)]
+        # القيمة الأطول في آخر دفعة: العرض يُحسب أثناء المرور على الدفعات كلها
+        rows[4][29] = 'x' * 40
+        rows[4][1] = 'y' * 200
+        output = BytesIO()
+        write_xlsx(iter(rows), columns, output, chunk_size=2)
+
+        worksheet = load_workbook(output).active
+        self.assertEqual(worksheet.max_column, 30)
+        self.assertEqual(worksheet['AD1'].value, 'عمود 29')
+        self.assertEqual(worksheet['AA2'].value, '0-26')
+        self.assertEqual(worksheet['AD6'].value, 'x' * 40)
+        self.assertEqual(worksheet.max_row, 6)
+
+        widths = worksheet.column_dimensions
+        self.assertEqual(widths['A'].width, len('عمود 0') + 2)
+        self.assertEqual(widths['AD'].width, 42)
+        self.assertEqual(widths['B'].width, EXCEL_MAX_COLUMN_WIDTH)
+
+    def test_export_view_returns_spooled_workbook(self):
+        admin = User.objects.create_user('admin', email='admin@uni.sy')
+        UserProfile.objects.create(user=admin, user_type='admin', is_approved=True)
+        self.client.force_login(admin)
+        response = self.client.get(reverse('export_reports'), {'type': 'users', 'format': 'excel'})
+
+        self.assertIsInstance(response, FileResponse)
+        self.assertEqual(response['Content-Type'], XLSX_CONTENT_TYPE)
+        self.assertTrue(response['Content-Disposition'].startswith("attachment; filename*=utf-8''"))
+        worksheet = load_workbook(BytesIO(b''.join(response.streaming_content))).active
+        self.assertEqual([cell.value for cell in worksheet[1]], USERS_REPORT_COLUMNS)
+        self.assertEqual((worksheet['A2'].value, worksheet['E2'].value), ('admin', 'admin@uni.sy'))
+
+
+class ExportJobTests(TestCase):
+    """التصدير في الخلفية: إعادة الاستخدام والحجز والتنظيف وبناء الملف"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.admin = User.objects.create_user('admin', email='admin@uni.sy')
+        UserProfile.objects.create(user=self.admin, user_type='admin', is_approved=True, phone='0999000000')
+
+    def test_recent_job_is_reused(self):
+        job, created = request_export(self.admin, 'users', 'csv')
+        self.assertTrue(created)
+        self.assertEqual(request_export(self.admin, 'users', 'csv'), (job, False))
+        self.assertTrue(request_export(self.admin, 'users', 'excel')[1])
+
+        # خارج نافذة إعادة الاستخدام، أو انتهت صلاحية الملف: تقرير جديد
+        ExportJob.objects.filter(id=job.id).update(created_at=timezone.now() - EXPORT_REUSE_WINDOW - timedelta(minutes=1))
+        newer, created = request_export(self.admin, 'users', 'csv')
+        self.assertTrue(created)
+        ExportJob.objects.filter(id=newer.id).update(status='completed', expires_at=timezone.now())
+        self.assertTrue(request_export(self.admin, 'users', 'csv')[1])
+
+    def test_claim_skips_job_taken_by_another_worker(self):
+        first = ExportJob.objects.create(report_type='users')
+        second = ExportJob.objects.create(report_type='ratings')
+        ExportJob.objects.filter(id=first.id).update(created_at=timezone.now() - timedelta(minutes=1))
+
+        # عامل آخر يحجز أقدم مهمة بين قراءتها وتحديثها
+        original_first = type(ExportJob.objects.all()).first
+        def racing_first(queryset):
+            job_id = original_first(queryset)
+            if job_id == first.id:
+                ExportJob.objects.filter(id=job_id).update(status='running')
+            return job_id
+
+        with mock.patch.object(type(ExportJob.objects.all()), 'first', autospec=True, side_effect=racing_first):
+            self.assertEqual(claim_next_job(), second.id)
+        self.assertIsNone(claim_next_job())
+        second.refresh_from_db()
+        self.assertEqual(second.status, 'running')
+        self.assertIsNotNone(second.started_at)
+
+    def test_stale_running_jobs_are_requeued(self):
+        day_ago = timezone.now() - timedelta(days=1)
+        stale = ExportJob.objects.create(report_type='users', status='running', started_at=day_ago, heartbeat_at=day_ago)
+        # تقرير كبير بدأ منذ يوم وما زال عامله يسجل تقدماً
+        busy = ExportJob.objects.create(report_type='users')
+        self.assertEqual(claim_next_job(), busy.id)
+        ExportJob.objects.filter(id=busy.id).update(started_at=day_ago)
+        self.assertEqual(requeue_stale_jobs(), 1)
+        self.assertEqual(ExportJob.objects.get(id=stale.id).status, 'pending')
+        self.assertEqual(ExportJob.objects.get(id=busy.id).status, 'running')
+
+    def test_expired_files_are_purged(self):
+        expired = ExportJob.objects.create(report_type='users', status='completed', expires_at=timezone.now())
+        expired.file.save('users.csv', ContentFile(b'data'))
+        kept = ExportJob.objects.create(report_type='users', status='completed', expires_at=timezone.now() + timedelta(hours=1))
+        kept.file.save('users.csv', ContentFile(b'data'))
+        path = expired.file.path
+
+        self.assertEqual(purge_expired_exports(), 1)
+        expired.refresh_from_db()
+        self.assertEqual((expired.status, expired.file.name), ('expired', ''))
+        self.assertFalse(os.path.exists(path))
+        self.assertTrue(ExportJob.objects.get(id=kept.id).is_downloadable)
+
+    def test_run_export_job_stores_file_under_random_name(self):
+        job, _ = request_export(self.admin, 'users', 'csv')
+        self.assertEqual(claim_next_job(), job.id)
+        ExportJob.objects.filter(id=job.id).update(heartbeat_at=timezone.now() - timedelta(days=1))
+        run_export_job(job.id)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.total_rows, job.processed_rows), ('completed', 1, 1))
+        self.assertGreater(job.heartbeat_at, timezone.now() - EXPORT_JOB_TIMEOUT)
+        self.assertRegex(job.file.name, r'^exports/[0-9a-f]{32}\.csv$')
+
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('export_job_download', args=[job.id]))
+        self.assertIn('attachment', response['Content-Disposition'])
+        self.assertIn('.csv', response['Content-Disposition'])
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        self.assertIn('admin@uni.sy', content)
+        self.assertIn('0999000000', content)
+
+    def test_failed_job_records_error(self):
+        job, _ = request_export(self.admin, 'users', 'excel')
+        with mock.patch('conference.export_jobs.write_xlsx', side_effect=OSError('القرص ممتلئ')), \
+                self.assertLogs('conference.export_jobs', 'ERROR'):
+            run_export_job(job.id)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), ('failed', 'القرص ممتلئ'))
+        self.assertFalse(job.file)
+
+
+class PlatformCountersTests(TestCase):
+    """صف العدادات يبقى مطابقاً للجداول بعد كل إضافة أو تعديل أو حذف"""
+
+    def setUp(self):
+        get_counters()
+        self.organizer = UserProfile.objects.create(user=User.objects.create_user('organizer'), user_type='organizer')
+        start = timezone.now() + timedelta(days=10)
+        self.conference = Conference.objects.create(
+            title='مؤتمر', description='وصف', organizer=self.organizer,
+            start_date=start, end_date=start + timedelta(days=1), location='قاعة', status='pending',
+        )
+        self.attendee = UserProfile.objects.create(user=User.objects.create_user('attendee'))
+
+    def _assert_counters_match(self):
+        counters = get_counters()
+        for field, value in compute_counters().items():
+            self.assertEqual(getattr(counters, field), value, field)
+
+    def test_conference_status_change(self):
+        self._assert_counters_match()
+        self.conference.status = 'approved'
+        self.conference.save()
+        self._assert_counters_match()
+        self.assertEqual((get_counters().pending_conferences, get_counters().approved_conferences), (0, 1))
+
+        # تحميل جزئي دون حقل الحالة: لا فرق يُحسب
+        conference = Conference.objects.only('id', 'title').get(id=self.conference.id)
+        conference.title = 'عنوان جديد'
+        conference.save(update_fields=['title'])
+        self._assert_counters_match()
+
+    def test_user_type_and_approval_change(self):
+        self.attendee.user_type = 'speaker'
+        self.attendee.is_approved = True
+        self.attendee.save()
+        self._assert_counters_match()
+        self.assertEqual(get_counters().approved_users, 1)
+
+    def test_attendance_flip_and_request_review(self):
+        attendance = Attendance.objects.create(conference=self.conference, user=self.attendee)
+        request = ConferenceRequest.objects.create(
+            conference=self.conference, requested_by=self.organizer, request_type='approval',
+        )
+        self._assert_counters_match()
+
+        attendance = Attendance.objects.get(id=attendance.id)
+        attendance.attended = True
+        attendance.save()
+        request.status = 'approved'
+        request.save()
+        self._assert_counters_match()
+        self.assertEqual((get_counters().total_attended, get_counters().pending_requests), (1, 0))
+
+    def test_delete_cascades(self):
+        Attendance.objects.create(conference=self.conference, user=self.attendee, attended=True)
+        Rating.objects.create(conference=self.conference, user=self.attendee, rating=4)
+        self._assert_counters_match()
+
+        self.conference.delete()
+        self._assert_counters_match()
+        self.organizer.user.delete()
+        self._assert_counters_match()
+        self.assertEqual((get_counters().total_conferences, get_counters().total_users), (0, 1))
+
+
+class LiveStatsTests(TestCase):
+    """إحصائيات لوحة التحكم: ETag مع 304 وأحداث SSE عند التغيّر فقط"""
+
+    def setUp(self):
+        live_stats._snapshot['data'] = None
+        self.admin = User.objects.create_user('admin')
+        UserProfile.objects.create(user=self.admin, user_type='admin', is_approved=True)
+        self.client.force_login(self.admin)
+
+    def _events(self, count, last_event_id=None):
+        async def collect():
+            events = iter_stats_events(last_event_id)
+            frames = [await events.__anext__() for _ in range(count)]
+            await events.aclose()
+            return frames
+        with mock.patch('conference.live_stats.LIVE_STATS_INTERVAL', 0):
+            return async_to_sync(collect)()
+
+    def test_unchanged_stats_return_304(self):
+        response = self.client.get(reverse('live_stats'))
+        self.assertEqual(response.json()['total_users'], 1)
+        etag = response['ETag']
+
+        response = self.client.get(reverse('live_stats'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        # اللقطة تتجدد بعد انتهاء مدتها فيتغير ETag
+        UserProfile.objects.create(user=User.objects.create_user('new'))
+        live_stats._snapshot['expires'] = 0
+        response = self.client.get(reverse('live_stats'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_users'], 2)
+
+    def test_non_admin_is_rejected(self):
+        self.client.force_login(User.objects.create_user('attendee'))
+        self.assertEqual(self.client.get(reverse('live_stats')).status_code, 403)
+
+    def test_stream_sends_event_only_when_stats_change(self):
+        retry, event, keepalive = self._events(3)
+        self.assertEqual(retry, 'retry: 0\n\n')
+        lines = event.splitlines()
+        self.assertEqual(lines[0], 'event: stats')
+        etag = lines[1].removeprefix('id: ')
+        self.assertEqual(json.loads(lines[2].removeprefix('data: '))['total_users'], 1)
+        self.assertEqual(keepalive, ': keepalive\n\n')
+
+        # إعادة الاتصال من آخر حدث لا تعيد إرسال الأرقام نفسها
+        self.assertEqual(self._events(2, last_event_id=etag)[1], ': keepalive\n\n')
+
+    def test_dashboard_streams_only_under_asgi(self):
+        response = self.client.get(reverse('dashboard'))
+        self.assertNotContains(response, 'new EventSource(')
+        self.assertContains(response, f"fetch('{reverse('live_stats')}'")
+        self.assertEqual(self.client.get(reverse('live_stats_stream')).status_code, 204)
+
+        self.async_client.force_login(self.admin)
+        response = async_to_sync(self.async_client.get)(reverse('dashboard'))
+        self.assertContains(response, f"new EventSource('{reverse('live_stats_stream')}')")
+
+
+class ConferencesListTests(TestCase):
+    """قائمة المؤتمرات: عدد الاستعلامات والترقيم بالمؤشر"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.city = SyrianCity.objects.create(name='دمشق', governorate='دمشق')
+        cls.category = Category.objects.create(name='تقنية')
+        cls.admin = User.objects.create_user('admin')
+        UserProfile.objects.create(user=cls.admin, user_type='admin', is_approved=True)
+
+        start = timezone.now() + timedelta(days=10)
+        for i in range(CONFERENCES_PAGE_SIZE + 10):
+            organizer = UserProfile.objects.create(
+                user=User.objects.create_user(f'organizer{i}', first_name='منظم', last_name=str(i)),
+                user_type='organizer',
+            )
+            Conference.objects.create(
+                title=f'مؤتمر {i}',
+                description='وصف',
+                organizer=organizer,
+                category=cls.category if i % 2 else None,
+                city=cls.city,
+                start_date=start,
+                end_date=start + timedelta(days=1),
+                location='قاعة',
+                status='pending' if i % 3 else 'approved',
+            )
+
+        # مؤتمرات بنفس created_at للتأكد من أن المؤشر لا يكرر ولا يتخطى أي صف
+        same_time = timezone.now() - timedelta(days=1)
+        Conference.objects.filter(id__in=Conference.objects.order_by('id').values('id')[:5]).update(created_at=same_time)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        # الجلسة + المستخدم مع ملفه الشخصي + المؤتمرات (التصنيفات والمدن من ذاكرة البيانات المرجعية)
+        get_categories(), get_cities(), get_site_settings()
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('conferences_list'))
+        self.assertEqual(len(response.context['conferences']), CONFERENCES_PAGE_SIZE)
+        first = response.context['conferences'][0]
+        self.assertContains(response, first.organizer.user.get_full_name())
+
+    def test_keyset_pagination_visits_every_conference_once(self):
+        seen = []
+        url = reverse('conferences_list')
+        while url:
+            response = self.client.get(url)
+            seen.extend(response.context['conferences'])
+            next_url = response.context['next_url']
+            url = reverse('conferences_list') + next_url if next_url else None
+
+        self.assertEqual(len(seen), Conference.objects.count())
+        self.assertEqual(len({conference.id for conference in seen}), len(seen))
+        keys = [(conference.created_at, conference.id) for conference in seen]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+
+    def test_filters(self):
+        response = self.client.get(reverse('conferences_list'), {
+            'status': 'approved',
+            'category': self.category.id,
+        })
+        conferences = response.context['conferences']
+        self.assertTrue(conferences)
+        for conference in conferences:
+            self.assertEqual(conference.status, 'approved')
+            self.assertEqual(conference.category_id, self.category.id)
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        response = self.client.get(reverse('conferences_list'), {'after': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context['first_url'])
+
+
+class ManageUsersTests(TestCase):
+    """إدارة المستخدمين: إجراءات جماعية على المحددين أو على كل نتائج الفلتر، وترقيم الصفحات"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.city = SyrianCity.objects.create(name='حلب', governorate='حلب')
+        cls.admin = User.objects.create_user('admin')
+        cls.admin_profile = UserProfile.objects.create(user=cls.admin, user_type='admin', is_approved=True)
+        for i in range(USERS_PAGE_SIZE + 10):
+            UserProfile.objects.create(user=User.objects.create_user(f'attendee{i}'), city=cls.city)
+        for i in range(3):
+            UserProfile.objects.create(user=User.objects.create_user(f'speaker{i}'), user_type='speaker')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def _assert_counters_match(self):
+        counters = get_counters()
+        for field, value in compute_counters().items():
+            self.assertEqual(getattr(counters, field), value, field)
+
+    def test_approve_all_filtered_users_with_one_update(self):
+        get_counters()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse('manage_users'), {
+                'action': 'approve', 'scope': 'filtered', 'user_type': 'attendee', 'city': self.city.id,
+            })
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE "conference_userprofile"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(UserProfile.objects.filter(user_type='attendee', is_approved=True).count(), USERS_PAGE_SIZE + 10)
+        self.assertFalse(UserProfile.objects.filter(user_type='speaker', is_approved=True).exists())
+        self._assert_counters_match()
+
+        # تكرار الإجراء لا يغيّر شيئاً
+        self.assertEqual(set_users_approval(UserProfile.objects.filter(user_type='attendee'), True), 0)
+
+    def test_bulk_delete_never_deletes_current_user(self):
+        get_counters()
+        speakers = list(UserProfile.objects.filter(user_type='speaker').values_list('id', flat=True))
+        response = self.client.post(reverse('manage_users'), {
+            'action': 'delete', 'user_ids': [self.admin_profile.id, *speakers[:2]],
+        }, follow=True)
+        self.assertTrue(User.objects.filter(id=self.admin.id).exists())
+        self.assertEqual(UserProfile.objects.filter(user_type='speaker').count(), 1)
+        self.assertEqual(
+            [(m.level_tag, m.message) for m in response.context['messages']],
+            [('success', 'تم حذف 2 مستخدم بنجاح'), ('error', 'لم يُحذف 1 حساب: لا يمكن حذف حسابك أو حسابات المدراء')],
+        )
+
+        response = self.client.post(
+            reverse('manage_users'), {'action': 'delete', 'user_ids': [self.admin_profile.id]}, follow=True,
+        )
+        self.assertTrue(User.objects.filter(id=self.admin.id).exists())
+        self.assertEqual([m.level_tag for m in response.context['messages']], ['error'])
+        self.assertEqual(delete_users(UserProfile.objects.filter(user_type='speaker'), self.admin), (1, 0))
+        self._assert_counters_match()
+
+    def test_filtered_scope_requires_a_filter_and_never_deletes(self):
+        other_admin = User.objects.create_user('admin2')
+        UserProfile.objects.create(user=other_admin, user_type='admin', is_approved=True)
+        users = User.objects.count()
+
+        for action in ('delete', 'approve', 'reject'):
+            self.client.post(reverse('manage_users'), {'action': action, 'scope': 'filtered'})
+        self.client.post(reverse('manage_users'), {'action': 'delete', 'scope': 'filtered', 'user_type': 'attendee'})
+        self.assertEqual(User.objects.count(), users)
+        self.assertEqual(UserProfile.objects.filter(is_approved=True).count(), 2)
+
+        # المدراء لا يُحذفون حتى لو حُددوا صراحة
+        self.assertEqual(delete_users(UserProfile.objects.filter(user_type='admin'), self.admin), (0, 2))
+        self.assertTrue(User.objects.filter(id=other_admin.id).exists())
+
+    def test_pages_use_constant_queries(self):
+        self.client.get(reverse('manage_users'))
+        get_cities(), get_site_settings()
+        # الجلسة + المستخدم مع ملفه الشخصي + العدد + الصفحة (المدن من ذاكرة البيانات المرجعية)
+        for page in (1, 2):
+            with self.assertNumQueries(4):
+                response = self.client.get(reverse('manage_users'), {'user_type': 'attendee', 'page': page})
+            self.assertContains(response, 'attendee')
+        self.assertEqual(len(response.context['users']), 10)
+        self.assertEqual(response.context['page_obj'].paginator.count, USERS_PAGE_SIZE + 10)
+        self.assertEqual(response.context['filter_query'], 'user_type=attendee')
+
+
+class ReviewConferenceRequestsTests(TestCase):
+    """المراجعة الجماعية لطلبات المؤتمرات"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user('admin')
+        UserProfile.objects.create(user=self.admin, user_type='admin', is_approved=True)
+        organizer = UserProfile.objects.create(user=User.objects.create_user('organizer'), user_type='organizer')
+        start = timezone.now() + timedelta(days=10)
+        self.requests = [
+            ConferenceRequest.objects.create(
+                conference=Conference.objects.create(
+                    title=f'مؤتمر {i}', description='وصف', organizer=organizer,
+                    start_date=start, end_date=start + timedelta(days=1), location='قاعة',
+                ),
+                requested_by=organizer,
+                request_type='approval',
+            )
+            for i in range(3)
+        ]
+
+    def test_batch_approve_updates_requests_and_conferences(self):
+        ids = [req.id for req in self.requests]
+        with self.assertNumQueries(8):
+            processed = review_conference_requests(ids, 'approve', self.admin)
+        self.assertCountEqual(processed, ids)
+        self.assertFalse(ConferenceRequest.objects.exclude(status='approved').exists())
+        self.assertFalse(Conference.objects.exclude(status='approved').exists())
+
+    def test_already_reviewed_requests_are_skipped(self):
+        ids = [req.id for req in self.requests]
+        review_conference_requests(ids[:1], 'reject', self.admin)
+        processed = review_conference_requests(ids, 'approve', self.admin)
+        self.assertCountEqual(processed, ids[1:])
+        self.assertEqual(ConferenceRequest.objects.get(id=ids[0]).status, 'rejected')
+        self.assertEqual(review_conference_requests(ids, 'approve', self.admin), [])
+
+
+class RatingSummaryTests(TestCase):
+    """ملخص التقييمات المحسوب مسبقاً"""
+
+    def setUp(self):
+        self.organizer = UserProfile.objects.create(user=User.objects.create_user('organizer'), user_type='organizer')
+        start = timezone.now() + timedelta(days=10)
+        self.conference = Conference.objects.create(
+            title='مؤتمر', description='وصف', organizer=self.organizer,
+            start_date=start, end_date=start + timedelta(days=1), location='قاعة',
+        )
+        self.users = [
+            UserProfile.objects.create(user=User.objects.create_user(f'user{i}'))
+            for i in range(4)
+        ]
+
+    def assertSummaryMatchesRatings(self):
+        summary = ConferenceRatingSummary.objects.get(conference=self.conference)
+        expected = compute_rating_summaries([self.conference.id])[self.conference.id]
+        self.assertEqual({field: getattr(summary, field) for field in expected}, expected)
+        return summary
+
+    def test_summary_follows_create_update_delete(self):
+        ratings = [
+            Rating.objects.create(conference=self.conference, user=user, rating=stars)
+            for user, stars in zip(self.users, [5, 4, 4, 1])
+        ]
+        summary = self.assertSummaryMatchesRatings()
+        self.assertEqual(summary.average, 3.5)
+
+        ratings[3].rating = 3
+        ratings[3].save()
+        Rating.objects.get(id=ratings[0].id).delete()
+        summary = self.assertSummaryMatchesRatings()
+        self.assertEqual((summary.rating_count, summary.stars_5, summary.stars_1), (3, 0, 0))
+
+    def test_repair_fixes_drift(self):
+        Rating.objects.create(conference=self.conference, user=self.users[0], rating=2)
+        ConferenceRatingSummary.objects.filter(conference=self.conference).update(rating_count=10, rating_sum=0)
+        self.assertEqual(repair_rating_summaries(), 1)
+        self.assertSummaryMatchesRatings()
+
+
+class AttendanceRegistrationStressTests(TransactionTestCase):
+    """تسجيلات متزامنة لا تتجاوز الحد الأقصى للمؤتمر"""
+
+    CAPACITY = 50
+    USERS = 200
+    THREADS = 16
+
+    def setUp(self):
+        organizer = UserProfile.objects.create(user=User.objects.create_user('organizer'), user_type='organizer')
+        start = timezone.now() + timedelta(days=10)
+        self.conference = Conference.objects.create(
+            title='مؤتمر', description='وصف', organizer=organizer,
+            start_date=start, end_date=start + timedelta(days=1), location='قاعة',
+            status='approved', max_attendees=self.CAPACITY,
+        )
+        self.profiles = [
+            UserProfile.objects.create(user=User.objects.create_user(f'user{i}'))
+            for i in range(self.USERS)
+        ]
+
+    def test_concurrent_registrations_never_oversubscribe(self):
+        results = []
+        errors = []
+        start = threading.Barrier(self.THREADS)
+
+        def worker(profiles):
+            try:
+                start.wait()
+                for profile in profiles:
+                    # كل مستخدم يحاول مرتين لمحاكاة النقر المزدوج
+                    results.append(register_attendance(self.conference.id, profile))
+                    results.append(register_attendance(self.conference.id, profile))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=worker, args=(self.profiles[i::self.THREADS],))
+            for i in range(self.THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.conference.refresh_from_db()
+        attendances = Attendance.objects.filter(conference=self.conference).count()
+        self.assertEqual(results.count(REGISTERED), self.CAPACITY)
+        self.assertEqual(attendances, self.CAPACITY)
+        self.assertEqual(self.conference.current_attendees, self.CAPACITY)
+        self.assertEqual(results.count(CONFERENCE_FULL), 2 * (self.USERS - self.CAPACITY))
+
+    def test_connection_uses_wal(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+
+    def test_cancel_frees_a_seat(self):
+        self.conference.max_attendees = 1
+        self.conference.save()
+        first, second = self.profiles[:2]
+        self.assertEqual(register_attendance(self.conference.id, first), REGISTERED)
+        self.assertEqual(register_attendance(self.conference.id, second), CONFERENCE_FULL)
+        self.assertTrue(cancel_attendance(self.conference.id, first))
+        self.assertEqual(register_attendance(self.conference.id, second), REGISTERED)
+
+
+class ConferenceSearchTests(TestCase):
+    """البحث في المؤتمرات مع التطبيع العربي"""
+
+    def setUp(self):
+        organizer = UserProfile.objects.create(user=User.objects.create_user('organizer'), user_type='organizer')
+        start = timezone.now() + timedelta(days=10)
+
+        def create(title, description='وصف', location='قاعة'):
+            return Conference.objects.create(
+                title=title, description=description, organizer=organizer,
+                start_date=start, end_date=start + timedelta(days=1), location=location,
+            )
+
+        self.in_title = create('مؤتمر الإدارة الحديثة')
+        self.in_description = create('مؤتمر', description='أساليب إدارة المشاريع')
+        self.other = create('مؤتمر المكتبة الرقمية', location='حلب')
+
+    def test_normalize_arabic(self):
+        self.assertEqual(normalize_arabic('الإِدَارَةُ مكتبةٌ أحمد مستشفى'), 'الاداره مكتبه احمد مستشفي')
+
+    def test_search_matches_variants_and_ranks_title_first(self):
+        for query in ['الإدارة', 'الادارة', 'اداره', 'إدارَة']:
+            self.assertEqual(
+                search_conferences(Conference.objects.all(), query),
+                [self.in_title, self.in_description],
+            )
+        self.assertEqual(search_conferences(Conference.objects.all(), 'المكتبه حلب'), [self.other])
+
+    def test_search_follows_saves_and_filters(self):
+        self.other.title = 'مؤتمر الإدارة'
+        self.other.save()
+        results = search_conferences(Conference.objects.exclude(id=self.in_title.id), 'إدارة')
+        self.assertCountEqual(results, [self.in_description, self.other])
+
+        self.other.delete()
+        self.assertEqual(search_conferences(Conference.objects.all(), 'المكتبة'), [])
+
+
+class HomePageCacheTests(TestCase):
+    """تخزين الصفحة الرئيسية وإبطالها عند تغيّر المؤتمرات"""
+
+    def setUp(self):
+        cache.clear()
+        organizer = UserProfile.objects.create(user=User.objects.create_user('organizer'), user_type='organizer')
+        start = timezone.now() + timedelta(days=10)
+        self.conference = Conference.objects.create(
+            title='مؤتمر قيد المراجعة', description='وصف', organizer=organizer,
+            start_date=start, end_date=start + timedelta(days=1), location='قاعة',
+        )
+        self.request = ConferenceRequest.objects.create(
+            conference=self.conference, requested_by=organizer, request_type='approval'
+        )
+
+    def test_anonymous_hits_skip_the_database(self):
+        self.client.get(reverse('home'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('home'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_cache_key_ignores_unread_and_free_text_params(self):
+        self.client.get(reverse('home'), {'utm_source': 'a'})
+        with self.assertNumQueries(0):
+            self.client.get(reverse('home'), {'utm_source': 'b', 'junk': 'x'})
+
+        # صفحات البحث لا تُخزن كاملة، ونتائجها في ذاكرة البحث المنفصلة
+        entries = len(cache._cache)
+        for query in ('أ', 'ب', 'ج'):
+            self.assertEqual(self.client.get(reverse('home'), {'q': query}).status_code, 200)
+        self.assertEqual(len(cache._cache), entries)
+
+    def test_approval_shows_up_immediately(self):
+        self.assertNotContains(self.client.get(reverse('home')), self.conference.title)
+        with self.captureOnCommitCallbacks(execute=True):
+            review_conference_requests([self.request.id], 'approve', User.objects.create_user('admin'))
+        self.assertContains(self.client.get(reverse('home')), self.conference.title)
+
+
+class QueryPlanAuditTests(TestCase):
+    """الاستعلامات المتكررة لا تمسح الجداول الكبيرة بالكامل"""
+
+    def test_hot_queries_use_indexes(self):
+        call_command('audit_query_plans', stdout=StringIO())
+
+    def test_full_scan_is_detected(self):
+        plan = explain(Conference.objects.filter(location='قاعة'))
+        self.assertEqual(full_table_scans(plan), [Conference._meta.db_table])
+
+    def test_scan_through_an_index_is_a_full_scan(self):
+        table = Conference._meta.db_table
+        for line in (f'SCAN {table} USING INDEX conference_created_idx',
+                     f'SCAN {table} USING COVERING INDEX conference_status_idx'):
+            self.assertEqual(full_table_scans([line]), [table])
+        # صفحة محدودة بترتيب الفهرس تتوقف بعد LIMIT صف
+        self.assertEqual(full_table_scans([f'SCAN {table} USING INDEX conference_created_idx'], limited=True), [])
+        self.assertEqual(full_table_scans(
+            [f'SCAN {table} USING INDEX conference_status_idx', 'USE TEMP B-TREE FOR ORDER BY'], limited=True,
+        ), [table])
+
+
+class ReplicaRoutingTests(TestCase):
+    """توجيه القراءة إلى النسخة مع إبقاء الكتابة والقراءة بعد الكتابة على القاعدة الأساسية"""
+
+    def setUp(self):
+        self.organizer = UserProfile.objects.create(
+            user=User.objects.create_user('organizer', password='pass'), user_type='organizer'
+        )
+        start = timezone.now() + timedelta(days=10)
+        self.conference = Conference.objects.create(
+            title='مؤتمر', description='وصف', organizer=self.organizer,
+            start_date=start, end_date=start + timedelta(days=1), location='قاعة',
+            status='approved', max_attendees=10,
+        )
+
+    def test_reads_fall_back_to_primary_without_replica(self):
+        # في الاختبارات النسخة مرآة للقاعدة الأساسية
+        self.assertFalse(db_router.replica_available())
+        with db_router.use_replica():
+            self.assertEqual(Conference.objects.all().db, 'default')
+
+    def test_reads_inside_block_go_to_replica_until_a_write(self):
+        with mock.patch.object(db_router, 'replica_available', return_value=True):
+            self.assertEqual(Conference.objects.all().db, 'default')
+            with db_router.use_replica():
+                self.assertEqual(Conference.objects.all().db, 'replica')
+                self.assertEqual(Conference.objects.filter(id=self.conference.id).update(is_featured=True), 1)
+                self.assertEqual(Conference.objects.all().db, 'default')
+            with db_router.use_replica():
+                self.assertEqual(Conference.objects.all().db, 'replica')
+
+    def test_export_rows_keep_the_database_chosen_by_the_view(self):
+        with mock.patch.object(db_router, 'replica_available', return_value=True):
+            with db_router.use_replica():
+                streamed = db_router.pin_read_database(Conference.objects.all())
+            # الصفوف المتدفقة تُقرأ بعد خروج الـ view من السياق
+            self.assertEqual(streamed.db, 'replica')
+            self.assertEqual(db_router.pin_read_database(Conference.objects.all()).db, 'default')
+
+    def test_write_pins_browser_to_primary(self):
+        self.assertNotIn(db_router.REPLICA_PIN_COOKIE, self.client.get(reverse('home')).cookies)
+        self.client.login(username='organizer', password='pass')
+        response = self.client.post(reverse('register_for_conference', args=[self.conference.id]))
+        self.assertIn(db_router.REPLICA_PIN_COOKIE, response.cookies)
+
+
+class SyntheticDataTests(TestCase):
+    """البيانات المولدة بالإدخال الجماعي تبقي العدادات والملخصات متسقة"""
+
+    def test_generated_data_is_consistent(self):
+        counts = generate_synthetic_data(scale=0.05, seed=1)
+        self.assertEqual(counts['users'], UserProfile.objects.count())
+        self.assertEqual(counts['conferences'], Conference.objects.count())
+
+        counters = get_counters()
+        for field, value in compute_counters().items():
+            self.assertEqual(getattr(counters, field), value, field)
+
+        summaries = ConferenceRatingSummary.objects.order_by('conference_id')
+        expected = compute_rating_summaries([summary.conference_id for summary in summaries])
+        self.assertEqual(len(summaries), counts['conferences'])
+        for summary in summaries:
+            self.assertEqual(summary.rating_count, expected[summary.conference_id]['rating_count'])
+        for conference in Conference.objects.all():
+            self.assertLessEqual(conference.current_attendees, conference.max_attendees)
+            self.assertEqual(conference.current_attendees, conference.attendance_set.count())
+
+        # الحضور الفعلي لكل صف على حدة، والتسجيلات موزعة على الأيام الماضية
+        self.assertFalse(Attendance.objects.filter(attended=False, attended_at__isnull=False).exists())
+        self.assertFalse(Attendance.objects.filter(attended=True, attended_at__isnull=True).exists())
+        self.assertGreater(Attendance.objects.dates('registered_at', 'day').count(), 10)
+        self.assertFalse(Attendance.objects.filter(registered_at__gt=timezone.now()).exists())
+
+
+class RequestMetricsTests(TestCase):
+    """ترويسة Server-Timing وسجل الطلبات البطيئة"""
+
+    def setUp(self):
+        cache.clear()
+        get_site_settings()
+
+    @mock.patch.object(request_metrics, 'REQUEST_METRICS_SAMPLE_RATE', 1.0)
+    def test_sampled_request_reports_server_timing(self):
+        response = self.client.get(reverse('home'))
+        timing = response['Server-Timing']
+        for name in ('sql', 'template', 'view', 'total'):
+            self.assertIn(f'{name};dur=', timing)
+        self.assertIn('desc="1 queries"', timing)
+
+    @mock.patch.object(request_metrics, 'REQUEST_METRICS_SAMPLE_RATE', 1.0)
+    @mock.patch.object(request_metrics, 'REQUEST_MAX_QUERIES', 0)
+    def test_chatty_request_is_logged_with_repeated_queries(self):
+        with self.assertLogs('conference.request_metrics', 'WARNING') as logs:
+            self.client.get(reverse('home'))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'home')
+        self.assertEqual(record['sql_count'], 1)
+        self.assertEqual(record['repeated_queries'], [])
+
+    def test_template_time_is_measured_without_patching_django(self):
+        self.assertIs(DjangoTemplate.render, DjangoTemplate.__dict__['render'])
+        template = engines['django'].from_string('{% for i in items %}{{ i }}{% endfor %}')
+        self.assertIsInstance(template, request_metrics.TimedTemplate)
+        self.assertEqual(template.render({'items': [1, 2]}), '12')
+
+        metrics = request_metrics.RequestMetrics()
+        token = request_metrics._current.set(metrics)
+        try:
+            template.render({'items': range(1000)})
+        finally:
+            request_metrics._current.reset(token)
+        self.assertGreater(metrics.template_time, 0)
+
+    def test_repeated_queries_are_grouped(self):
+        metrics = request_metrics.RequestMetrics()
+        with connection.execute_wrapper(metrics):
+            for _ in range(3):
+                list(Conference.objects.filter(id=1))
+            Category.objects.count()
+        top = metrics.repeated_queries()
+        self.assertEqual(metrics.sql_count, 4)
+        self.assertEqual(len(top), 1)
+        self.assertEqual(top[0]['count'], 3)
+
+
+class ReferenceDataCacheTests(TestCase):
+    """البيانات المرجعية تُقرأ من الذاكرة وتُبطل عند الحفظ"""
+
+    def setUp(self):
+        cache.clear()
+        SyrianCity.objects.create(name='حلب', governorate='حلب')
+        self.admin = User.objects.create_user('admin')
+        UserProfile.objects.create(user=self.admin, user_type='admin', is_approved=True)
+
+    def test_cities_are_cached_until_saved(self):
+        self.assertEqual([city.name for city in get_cities()], ['حلب'])
+        with self.assertNumQueries(0):
+            get_cities()
+        with self.captureOnCommitCallbacks(execute=True):
+            SyrianCity.objects.create(name='دمشق', governorate='دمشق')
+        self.assertEqual([city.name for city in get_cities()], ['حلب', 'دمشق'])
+
+    def test_changes_from_other_processes_are_seen_after_max_age(self):
+        get_cities()
+        # تعديل من عملية أخرى: لا يصل رقم الإصدار إلى ذاكرة هذه العملية
+        SyrianCity.objects.update(name='دمشق')
+        self.assertEqual([city.name for city in get_cities()], ['حلب'])
+        with mock.patch('conference.reference_data.REFERENCE_DATA_MAX_AGE', 0):
+            self.assertEqual([city.name for city in get_cities()], ['دمشق'])
+
+    def test_settings_are_saved_with_one_upsert(self):
+        save_site_settings({'site_name': 'منصة تجريبية'}, self.admin)
+        with self.assertNumQueries(1):
+            save_site_settings({'site_name': 'منصة معدلة', 'contact_email': 'info@example.com'}, self.admin)
+        self.assertEqual(SystemSetting.objects.count(), len(SITE_SETTING_LABELS))
+        self.assertEqual(SystemSetting.objects.get(key='site_name').value, 'منصة معدلة')
+
+    def test_site_name_reaches_templates_after_save(self):
+        self.client.force_login(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('system_settings'), {'site_name': 'منصة تجريبية'})
+        self.assertEqual(get_site_settings()['site_name'], 'منصة تجريبية')
+        self.assertContains(self.client.get(reverse('home')), 'منصة تجريبية')
+
+
+class RoleRequiredTests(TestCase):
+    """تحميل الملف الشخصي مع المستخدم والتحقق من الدور الحالي في كل طلب"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('admin')
+        self.profile = UserProfile.objects.create(user=self.user, user_type='admin', is_approved=True)
+        self.client.force_login(self.user, backend='conference.accounts.ProfileModelBackend')
+
+    def test_profile_is_loaded_with_the_user(self):
+        user = ProfileModelBackend().get_user(self.user.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(user.userprofile.user_type, 'admin')
+
+    def test_admin_page_skips_the_profile_query(self):
+        get_cities(), get_site_settings()
+        self.client.get(reverse('manage_users'))
+        # الجلسة + المستخدم مع ملفه + عدد المستخدمين + صفحة المستخدمين
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('manage_users'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_role_change_applies_on_the_next_request(self):
+        self.assertEqual(self.client.get(reverse('manage_categories')).status_code, 200)
+        # تحديث مباشر (كما من عملية أخرى): لا إشارات ولا ذاكرة لإبطالها
+        UserProfile.objects.filter(id=self.profile.id).update(user_type='attendee')
+        self.assertRedirects(
+            self.client.get(reverse('manage_categories')), reverse('home'), fetch_redirect_response=False
+        )
+
+
+class AvatarPipelineTests(TestCase):
+    """النسخ المصغرة للصورة الشخصية"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = User.objects.create_user('photo')
+        self.profile = UserProfile.objects.create(user=self.user, phone='0', address='دمشق')
+
+    def _upload(self):
+        # صورة أفقية مع اتجاه EXIF يدوّرها إلى عمودية
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        buffer = BytesIO()
+        Image.new('RGB', (400, 200), 'red').save(buffer, 'JPEG', exif=exif)
+        self.profile.profile_picture = SimpleUploadedFile('me.jpg', buffer.getvalue(), 'image/jpeg')
+        self.profile.save()
+
+    def test_variants_are_square_and_stripped(self):
+        self._upload()
+        self.assertTrue(process_avatar(self.profile.id))
+        self.profile.refresh_from_db()
+        self.assertIsNotNone(self.profile.avatar_processed_at)
+
+        px = AVATAR_SIZES['medium']
+        for ext, image_format in (('webp', 'WEBP'), ('jpg', 'JPEG')):
+            name = avatar_variant_name(self.profile.profile_picture.name, px, ext)
+            with Image.open(f'{self.media_root}/{name}') as image:
+                self.assertEqual((image.format, image.size), (image_format, (px, px)))
+                self.assertNotIn(0x0112, image.getexif())
+
+        response = self.client.get(reverse('avatar_file', args=[name.split('/', 1)[1]]))
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        with open(f'{self.media_root}/{name}', 'rb') as f:
+            self.assertEqual(b''.join(response.streaming_content), f.read())
+        # الصورة الأصلية خارج مجلد النسخ لا تُخدم من هذا المسار
+        original = self.profile.profile_picture.name
+        self.assertEqual(self.client.get(reverse('avatar_file', args=[f'../{original}'])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('avatar_file', args=['missing.jpg'])).status_code, 404)
+
+    def test_profile_page_uses_variant_once_processed(self):
+        self._upload()
+        self.client.force_login(self.user)
+        self.assertContains(self.client.get(reverse('user_profile')), self.profile.profile_picture.url)
+
+        process_avatar(self.profile.id)
+        response = self.client.get(reverse('user_profile'))
+        self.assertContains(response, '<source type="image/webp"')
+        self.assertContains(response, 'width="150" height="150"')
+
+    def test_users_list_uses_small_variant(self):
+        self._upload()
+        process_avatar(self.profile.id)
+        admin = UserProfile.objects.create(user=User.objects.create_user('admin'), user_type='admin')
+        self.client.force_login(admin.user)
+        px = AVATAR_SIZES['small']
+        name = avatar_variant_name(self.profile.profile_picture.name, px * 2, 'webp')
+        response = self.client.get(reverse('manage_users'))
+        self.assertContains(response, f'width="{px}" height="{px}"')
+        self.assertContains(response, name)
+
+    def test_new_upload_resets_processed_variants(self):
+        self._upload()
+        process_avatar(self.profile.id)
+        self.profile.refresh_from_db()
+        self._upload()
+        self.profile.refresh_from_db()
+        self.assertIsNone(self.profile.avatar_processed_at)
+
+
+class StaticFilesPipelineTests(TestCase):
+    """الأسماء المشفرة والنسخ المضغوطة مسبقاً وخدمتها من داخل العملية"""
+
+    css = b'body { color: #333; }\n' * 200
+
+    def setUp(self):
+        source = tempfile.mkdtemp()
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, source)
+        self.addCleanup(shutil.rmtree, root)
+        with open(f'{source}/style.css', 'wb') as f:
+            f.write(self.css)
+        override = override_settings(STATICFILES_DIRS=[source], STATIC_ROOT=root)
+        override.enable()
+        self.addCleanup(override.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        self.url = staticfiles_storage.url('style.css')
+        self.middleware = StaticFilesMiddleware(lambda request: HttpResponse('app'))
+
+    def _get(self, url, **headers):
+        response = self.middleware(RequestFactory().get(url, **headers))
+        return response, b''.join(response.streaming_content) if response.streaming else response.content
+
+    def test_hashed_file_is_immutable_and_precompressed(self):
+        self.assertRegex(self.url, r'/static/style\.[0-9a-f]{12}\.css$')
+        response, body = self._get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(body), self.css)
+
+        response, _ = self._get(self.url, HTTP_IF_NONE_MATCH=response['ETag'], HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 304)
+
+    def test_identity_and_unhashed_names(self):
+        response, body = self._get(self.url, HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(body, self.css)
+
+        response, _ = self._get('/static/style.css')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+        self.assertEqual(self._get('/static/missing.css')[1], b'app')
+
+
+class DailyRollupTests(TestCase):
+    """الإحصاءات اليومية: التحديث التدريجي والقراءة لأي فترة"""
+
+    def setUp(self):
+        self.organizer = UserProfile.objects.create(
+            user=User.objects.create_user('organizer'), user_type='organizer'
+        )
+        start = timezone.now() + timedelta(days=10)
+        self.conference = Conference.objects.create(
+            title='مؤتمر', description='وصف', organizer=self.organizer,
+            start_date=start, end_date=start + timedelta(days=1), location='قاعة', status='approved',
+        )
+
+    def _register(self, username, registered_at):
+        attendee = UserProfile.objects.create(user=User.objects.create_user(username))
+        attendance = Attendance.objects.create(conference=self.conference, user=attendee)
+        Attendance.objects.filter(id=attendance.id).update(registered_at=registered_at)
+
+    def test_incremental_update_matches_full_rebuild(self):
+        now = timezone.now()
+        self._register('old', now - timedelta(days=800))
+        self._register('today', now)
+        update_daily_stats()
+
+        # سجل جديد بعد التحديث: يُحسب في التحديث التدريجي التالي دون إعادة حساب التاريخ كله
+        self._register('late', now)
+        with CaptureQueriesContext(connection) as queries:
+            update_daily_stats(metrics=['registrations'])
+        self.assertIn('"registered_at" >=', ' '.join(query['sql'] for query in queries.captured_queries))
+        incremental = sorted(DailyStat.objects.filter(metric='registrations').values_list('date', 'count'))
+
+        update_daily_stats(metrics=['registrations'], rebuild=True)
+        rebuilt = sorted(DailyStat.objects.filter(metric='registrations').values_list('date', 'count'))
+        self.assertEqual(incremental, rebuilt)
+        self.assertEqual(rebuilt[-1], (timezone.localdate(now), 2))
+
+    def test_rollups_are_not_keyed_by_conference_status(self):
+        self._register('old', timezone.now() - timedelta(days=30))
+        Conference.objects.filter(id=self.conference.id).update(created_at=timezone.now() - timedelta(days=30))
+        update_daily_stats()
+        Conference.objects.filter(id=self.conference.id).update(status='completed')
+        update_daily_stats()
+        for metric in ('registrations', 'new_conferences'):
+            self.assertEqual(
+                list(DailyStat.objects.filter(metric=metric).values_list('status', 'count')), [('', 1)], metric
+            )
+
+    def test_multi_year_series_from_rollups(self):
+        now = timezone.now()
+        self._register('old', now - timedelta(days=800))
+        self._register('today', now)
+        update_daily_stats()
+
+        start = timezone.localdate(now) - timedelta(days=900)
+        with self.assertNumQueries(1):
+            trend = get_time_series(start, timezone.localdate(now), 'month', category_id=None)
+        self.assertEqual(trend['interval'], 'month')
+        self.assertEqual(sum(trend['series']['registrations']), 2)
+        self.assertEqual(sum(trend['series']['new_conferences']), 1)
+
+        # الدقة اليومية لعدة سنوات تتجاوز حد النقاط فتُرفع إلى الأسبوع
+        self.assertEqual(get_time_series(start, timezone.localdate(now), 'day')['interval'], 'week')
+
+    def test_statistics_page_reads_range(self):
+        admin = UserProfile.objects.create(user=User.objects.create_user('admin'), user_type='admin')
+        self.client.force_login(admin.user)
+        self._register('old', timezone.make_aware(datetime(2019, 6, 1)))
+        update_daily_stats()
+        response = self.client.get(reverse('platform_statistics'), {'start': '2020-01-01', 'interval': 'year'})
+        self.assertEqual(response.status_code, 200)
+        trend = json.loads(response.context['trend_data_json'])
+        self.assertEqual(trend['labels'][0], '2020-01-01')
+        self.assertEqual(trend['interval'], 'year')
+
+    def test_out_of_range_dates_are_clamped(self):
+        admin = UserProfile.objects.create(user=User.objects.create_user('admin'), user_type='admin')
+        self.client.force_login(admin.user)
+        self._register('old', timezone.make_aware(datetime(2019, 6, 1)))
+        update_daily_stats()
+        response = self.client.get(reverse('platform_statistics'), {
+            'start': '0001-01-01', 'end': '9999-12-30', 'interval': 'month',
+        })
+        self.assertEqual(response.status_code, 200)
+        trend = json.loads(response.context['trend_data_json'])
+        self.assertEqual(trend['interval'], 'month')
+        self.assertEqual(trend['labels'][0], '2019-06-01')
+        self.assertEqual(trend['labels'][-1], timezone.localdate().replace(day=1).isoformat())
+
+        # عدد الفترات يُحسب دون بناء قائمة لكل دقة مرشحة
+        self.assertEqual(chart_interval(date(1, 1, 1), date(9999, 12, 30), 'day'), 'year')
+
+
+class AnalyticsApiTests(TestCase):
+    """التحليلات المتجهة تطابق الحلقة المباشرة وتُخزن لكل مجموعة معاملات"""
+
+    def setUp(self):
+        cache.clear()
+        damascus = SyrianCity.objects.create(name='دمشق', governorate='دمشق')
+        category = Category.objects.create(name='التعليم')
+        self.admin = UserProfile.objects.create(user=User.objects.create_user('admin'), user_type='admin')
+        organizer = UserProfile.objects.create(user=User.objects.create_user('organizer'), user_type='organizer')
+        start = timezone.now() + timedelta(days=10)
+        for i, (city, max_attendees) in enumerate([(damascus, 4), (None, 10)]):
+            conference = Conference.objects.create(
+                title=f'مؤتمر {i}', description='وصف', organizer=organizer, category=category, city=city,
+                start_date=start, end_date=start + timedelta(days=1), location='قاعة',
+                status='active', max_attendees=max_attendees,
+            )
+            for j in range(2):
+                attendee = UserProfile.objects.create(user=User.objects.create_user(f'a{i}{j}'))
+                register_attendance(conference.id, attendee)
+                Attendance.objects.filter(conference=conference, user=attendee).update(attended=j == 0)
+                Rating.objects.create(conference=conference, user=attendee, rating=3 + j)
+        self.client.force_login(self.admin.user)
+
+    def test_breakdown_matches_naive_loop(self):
+        response = self.client.get(reverse('analytics_api'), {'group_by': 'city'})
+        self.assertEqual(response.status_code, 200)
+        rows = response.json()['rows']
+        by_city = lambda row: row['city']
+        self.assertEqual(sorted(rows, key=by_city), sorted(naive_breakdown(['city']), key=by_city))
+        damascus = next(row for row in rows if row['city'] == 'دمشق')
+        self.assertEqual((damascus['attendance_rate'], damascus['avg_rating'], damascus['fill_ratio']), (0.5, 3.5, 0.5))
+
+    def test_results_are_cached_per_parameters(self):
+        self.client.get(reverse('analytics_api'), {'group_by': 'category,month'})
+        with self.assertNumQueries(2):  # الجلسة والمستخدم فقط
+            self.client.get(reverse('analytics_api'), {'group_by': 'category,month'})
+        with self.assertNumQueries(5):
+            self.client.get(reverse('analytics_api'), {'group_by': 'category,month', 'status': 'active'})
+
+    def test_invalid_dimension_is_rejected(self):
+        response = self.client.get(reverse('analytics_api'), {'group_by': 'title'})
+        self.assertEqual(response.status_code, 400)
+
+
+class BulkImportTests(TestCase):
+    """استيراد CSV/XLSX على دفعات مع تقرير بأخطاء الصفوف"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        # المدن والتصنيفات المحملة في اختبار سابق لا تتضمن ما يُنشأ هنا
+        cache.clear()
+        self.city = SyrianCity.objects.create(name='حمص', governorate='حمص')
+        self.category = Category.objects.create(name='الطب')
+        self.admin = UserProfile.objects.create(user=User.objects.create_user('admin'), user_type='admin')
+
+    def _csv(self, rows):
+        output = StringIO()
+        csv.writer(output).writerows(rows)
+        return BytesIO(output.getvalue().encode('utf-8-sig'))
+
+    def _assert_counters_match(self):
+        counters = get_counters()
+        for field, value in compute_counters().items():
+            self.assertEqual(getattr(counters, field), value, field)
+
+    def test_users_are_created_in_chunks_with_row_errors(self):
+        rows = [['username', 'email', 'password', 'نوع المستخدم', 'المدينة', 'is_approved']]
+        rows += [[f'student{i}', f's{i}@uni.sy', 'initial-pass' if i % 2 else '', 'مشارك', 'حمص', 'نعم'] for i in range(5)]
+        rows += [['student1', '', '', '', '', ''], ['other', 'bad-email', '', '', '', ''], ['x', '', '', '', 'تدمر', '']]
+        report = run_import('users', self._csv(rows), 'students.csv', chunk_size=2)
+
+        self.assertEqual((report.rows, report.created), (8, 5))
+        self.assertEqual([row for row, _ in report.errors], [7, 8, 9])
+        profile = UserProfile.objects.select_related('user').get(user__username='student1')
+        self.assertEqual((profile.city_id, profile.user_type, profile.is_approved), (self.city.id, 'attendee', True))
+        self.assertTrue(profile.user.check_password('initial-pass'))
+        self.assertFalse(User.objects.get(username='student0').has_usable_password())
+        self._assert_counters_match()
+
+    def test_dry_run_validates_without_saving(self):
+        report = run_import('users', self._csv([['username'], ['new1'], ['new1']]), 'u.csv', dry_run=True)
+        self.assertEqual((report.created, len(report.errors)), (1, 1))
+        self.assertFalse(User.objects.filter(username='new1').exists())
+
+    def test_conferences_from_xlsx_are_indexed_and_summarized(self):
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(['عنوان المؤتمر', 'وصف المؤتمر', 'اسم المنظم', 'التصنيف', 'تاريخ البدء', 'تاريخ الانتهاء', 'المكان', 'الحالة'])
+        start = timezone.now().replace(tzinfo=None, microsecond=0) + timedelta(days=5)
+        sheet.append(['مؤتمر القلب', 'وصف', 'admin', 'الطب', start, start + timedelta(days=1), 'قاعة', 'مقبول'])
+        sheet.append(['مؤتمر بلا منظم', 'وصف', 'nobody', '', '2030-01-01', '2030-01-02', 'قاعة', ''])
+        buffer = BytesIO()
+        workbook.save(buffer)
+        buffer.seek(0)
+
+        report = run_import('conferences', buffer, 'conferences.xlsx')
+        self.assertEqual((report.created, [row for row, _ in report.errors]), (1, [3]))
+        conference = Conference.objects.get(title='مؤتمر القلب')
+        self.assertEqual((conference.status, conference.category_id), ('approved', self.category.id))
+        self.assertTrue(ConferenceRatingSummary.objects.filter(conference=conference).exists())
+        self.assertEqual(list(search_conferences(Conference.objects.all(), 'القلب')), [conference])
+        self._assert_counters_match()
+
+    def test_date_cells_in_other_columns_are_row_errors(self):
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(['title', 'description', 'organizer', 'category', 'start_date', 'end_date', 'location', 'status', 'max_attendees'])
+        start = datetime(2030, 1, 1, 9, 0)
+        base = ['مؤتمر', 'وصف', 'admin', '', start, start + timedelta(days=1), 'قاعة', '', '']
+        for column in (3, 7, 8):
+            row = list(base)
+            row[column] = start
+            sheet.append(row)
+        buffer = BytesIO()
+        workbook.save(buffer)
+        buffer.seek(0)
+
+        report = run_import('conferences', buffer, 'conferences.xlsx')
+        self.assertEqual((report.created, [row for row, _ in report.errors]), (0, [2, 3, 4]))
+        self.assertFalse(Conference.objects.exists())
+
+    def test_attendance_respects_capacity_and_duplicates(self):
+        start = timezone.now() + timedelta(days=5)
+        conference = Conference.objects.create(
+            title='ورشة', description='وصف', organizer=self.admin, start_date=start,
+            end_date=start + timedelta(days=1), location='قاعة', status='approved', max_attendees=2,
+        )
+        for name in ('a', 'b', 'c'):
+            UserProfile.objects.create(user=User.objects.create_user(name))
+        register_attendance(conference.id, UserProfile.objects.get(user__username='a'))
+
+        rows = [['conference_id', 'username', 'attended'], [conference.id, 'a', ''], [conference.id, 'b', '1'], [conference.id, 'c', '']]
+        report = run_import('attendance', self._csv(rows), 'attendance.csv')
+        self.assertEqual(report.created, 1)
+        self.assertEqual([row for row, _ in report.errors], [2, 4])
+        conference.refresh_from_db()
+        self.assertEqual(conference.current_attendees, 2)
+        self.assertTrue(Attendance.objects.get(conference=conference, user__user__username='b').attended)
+        self._assert_counters_match()
+
+    def test_admin_page_queues_job_and_keeps_error_report(self):
+        self.client.force_login(self.admin.user)
+        upload = SimpleUploadedFile('list.csv', self._csv([['username'], ['ok1'], ['bad name!']]).getvalue())
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(reverse('import_data'), {'kind': 'users', 'file': upload})
+        self.assertRedirects(response, reverse('import_data'))
+
+        # خادم الويب لا ينفذ المهمة: تبقى معلقة حتى يلتقطها import_data --pending
+        self.assertEqual(callbacks, [])
+        job = ImportJob.objects.get()
+        self.assertEqual(job.status, 'pending')
+        self.assertTrue(run_import_job(job.id, workers=1))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.created_rows, job.error_rows), ('completed', 1, 1))
+        self.assertFalse(job.file)
+        self.assertRegex(job.report.name, r'^imports/reports/[0-9a-f]{32}\.csv$')
+        response = self.client.get(reverse('import_job_report', args=[job.id]))
+        self.assertIn(f'import_{job.id}_errors.csv', response['Content-Disposition'])
+        self.assertIn('bad name!', b''.join(response.streaming_content).decode('utf-8-sig'))
+        self.assertEqual(self.client.get(reverse('import_job_status', args=[job.id])).json()['status'], 'completed')
+
+    def test_missing_required_column_fails_whole_file(self):
+        job = ImportJob.objects.create(
+            kind='conferences', original_name='c.csv', file=SimpleUploadedFile('c.csv', b'title\r\nx\r\n'),
+        )
+        run_import_job(job.id, workers=1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertIn('description', job.error)
+        self.assertFalse(Conference.objects.exists())
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class BulkImportPoolTests(TransactionTestCase):
+    """تجزئة كلمات المرور في مجمع عمليات من الأمر import_data"""
+
+    def test_command_hashes_passwords_in_process_pool(self):
+        rows = [['username', 'password']] + [[f'user{i}', f'pass-{i}'] for i in range(IMPORT_POOL_MIN_PASSWORDS + 4)]
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8', newline='') as f:
+            csv.writer(f).writerows(rows)
+            f.flush()
+            with mock.patch('conference.imports.ProcessPoolExecutor', wraps=ProcessPoolExecutor) as pool:
+                call_command('import_data', 'users', f.name, workers=2, stdout=StringIO())
+
+        pool.assert_called_once()
+        self.assertEqual(User.objects.count(), len(rows) - 1)
+        self.assertTrue(User.objects.get(username='user0').check_password('pass-0'))
+        self.assertTrue(User.objects.get(username=f'user{IMPORT_POOL_MIN_PASSWORDS}').check_password(f'pass-{IMPORT_POOL_MIN_PASSWORDS}'))
+
+
+class CountingEmailBackend(LocmemEmailBackend):
+    """locmem مع عدّ مرات فتح الاتصال"""
+    opened = 0
+
+    def open(self):
+        CountingEmailBackend.opened += 1
+        return super().open()
+
+
+class FailingEmailBackend(LocmemEmailBackend):
+    """يرفض الرسائل الموجهة إلى عنوان محدد"""
+
+    def send_messages(self, messages):
+        if any('bounce@' in address for message in messages for address in message.to):
+            raise OSError('550 mailbox unavailable')
+        return super().send_messages(messages)
+
+
+class NotificationOutboxTests(TestCase):
+    """صندوق الصادر والإرسال على دفعات"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user('admin')
+        organizer = UserProfile.objects.create(
+            user=User.objects.create_user('organizer', 'organizer@example.com'), user_type='organizer',
+        )
+        start = timezone.now() + timedelta(days=10)
+        self.conference = Conference.objects.create(
+            title='مؤتمر الطاقة', description='وصف', organizer=organizer, status='approved',
+            start_date=start, end_date=start + timedelta(days=1), location='قاعة',
+        )
+        for i in range(5):
+            attendee = UserProfile.objects.create(user=User.objects.create_user(f'a{i}', f'a{i}@example.com'))
+            register_attendance(self.conference.id, attendee)
+        self.request = ConferenceRequest.objects.create(
+            conference=self.conference, requested_by=organizer, request_type='cancellation',
+        )
+
+    def test_review_writes_one_outbox_row_and_fans_out_in_pages(self):
+        review_conference_requests([self.request.id], 'reject', self.admin)
+        notification = Notification.objects.get()
+        self.assertEqual((notification.event, notification.conference_id), ('conference_rejected', self.conference.id))
+        self.assertFalse(NotificationDelivery.objects.exists())
+
+        pages = []
+        while Notification.objects.filter(status='pending').exists():
+            pages.append(expand_notifications(page_size=2))
+        self.assertEqual(pages, [3, 2, 1])  # المنظم مع الصفحة الأولى
+        self.assertEqual(NotificationDelivery.objects.count(), 6)
+
+    def test_outbox_row_is_rolled_back_with_the_change(self):
+        profiles = UserProfile.objects.filter(user__username__in=['a0', 'a1'])
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            set_users_approval(profiles, True)
+            raise RuntimeError
+        self.assertFalse(Notification.objects.exists())
+
+        self.assertEqual(set_users_approval(profiles, True), 2)
+        self.assertEqual(set_users_approval(profiles, True), 0)
+        self.assertEqual(
+            sorted(Notification.objects.values_list('event', 'user__username')),
+            [('account_approved', 'a0'), ('account_approved', 'a1')],
+        )
+
+    def test_approval_runs_in_pages_and_notifies_only_changed_accounts(self):
+        UserProfile.objects.filter(user__username='a2').update(is_approved=True)
+        attendees = UserProfile.objects.filter(user__username__startswith='a')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(set_users_approval(attendees, True, batch_size=2), 4)
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE "conference_userprofile"')]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(
+            sorted(Notification.objects.values_list('user__username', flat=True)), ['a0', 'a1', 'a3', 'a4'],
+        )
+
+    @override_settings(EMAIL_BACKEND='conference.tests.CountingEmailBackend')
+    def test_batch_is_sent_over_one_connection(self):
+        Conference.objects.filter(id=self.conference.id).update(status='pending')
+        review_conference_requests([self.request.id], 'approve', self.admin)
+        expand_notifications()
+        CountingEmailBackend.opened = 0
+        self.assertEqual(deliver_notifications(batch_size=4), (4, 0))
+        self.assertEqual(deliver_notifications(batch_size=4), (2, 0))
+        self.assertEqual(CountingEmailBackend.opened, 2)
+        self.assertEqual(len(mail.outbox), 6)
+        self.assertIn('مؤتمر الطاقة', mail.outbox[0].subject)
+        self.assertFalse(NotificationDelivery.objects.exclude(status='sent').exists())
+
+    @override_settings(EMAIL_BACKEND='conference.tests.FailingEmailBackend')
+    def test_failed_delivery_is_retried_with_backoff(self):
+        User.objects.filter(username='a0').update(email='bounce@example.com')
+        set_users_approval(UserProfile.objects.filter(user__username__in=['a0', 'a1']), True)
+        expand_notifications()
+        self.assertEqual(deliver_notifications(), (1, 1))
+
+        delivery = NotificationDelivery.objects.get(user__username='a0')
+        self.assertEqual((delivery.status, delivery.attempts), ('pending', 1))
+        self.assertGreater(delivery.next_attempt_at, timezone.now() + timedelta(seconds=30))
+        self.assertIn('550', delivery.last_error)
+        self.assertEqual(deliver_notifications(), (0, 0))  # لم يحن موعد المحاولة التالية
+
+        with mock.patch('conference.notifications.NOTIFICATION_MAX_ATTEMPTS', 2):
+            NotificationDelivery.objects.filter(id=delivery.id).update(next_attempt_at=timezone.now())
+            deliver_notifications()
+        self.assertEqual(NotificationDelivery.objects.get(id=delivery.id).status, 'failed')
@@ -10,6 +10,18 @@ urlpatterns = [
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
     path('dashboard/', views.admin_dashboard, name='dashboard'),
+    path('api/stats/', views.live_stats, name='live_stats'),
+    path('api/stats/stream/', views.live_stats_stream, name='live_stats_stream'),
+    path('api/analytics/', views.analytics_api, name='analytics_api'),
+    path('api/conference-requests/review/', views.review_requests_api, name='review_requests_api'),
+    path('api/conferences/<int:conference_id>/register/', views.register_for_conference_api, name='register_for_conference_api'),
+    path('conference/<int:conference_id>/register/', views.register_for_conference, name='register_for_conference'),
+    path('conference/export/jobs/<int:job_id>/', views.export_job_status, name='export_job_status'),
+    path('conference/export/jobs/<int:job_id>/download/', views.export_job_download, name='export_job_download'),
+    path('conference/import/', views.import_data, name='import_data'),
+    path('conference/import/jobs/<int:job_id>/', views.import_job_status, name='import_job_status'),
+    path('conference/import/jobs/<int:job_id>/report/', views.import_job_report, name='import_job_report'),
+    path(f"{settings.MEDIA_URL.strip('/')}/avatars/<path:path>", views.avatar_file, name='avatar_file'),
     path('conference/', include('conference.urls')),
 ]
 
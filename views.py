@@ -1,33 +1,86 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_POST
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.db.models import Count, Q, Avg, Sum
+from django.core.paginator import Paginator
+from django.db.models import Q, Sum
 from django.utils import timezone
-from django.http import HttpResponse
-import pandas as pd
+from django.utils.functional import SimpleLazyObject
+from django.http import Http404, HttpResponse, JsonResponse, FileResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
+from django.core.files.storage import default_storage
 import json
-from django.db.models.functions import ExtractMonth
 from datetime import datetime, timedelta
-from io import BytesIO
 from django.contrib.auth.forms import PasswordChangeForm
 from django.contrib.auth import update_session_auth_hash
 
 from .models import (
     UserProfile, Conference, Category, ConferenceRequest, 
-    Rating, Attendance, SystemSetting, SyrianCity
+    Rating, SyrianCity, ExportJob, DailyStat, ImportJob
 )
+from .exports import REPORTS, export_to_excel_stream, export_to_csv_stream
+from .export_jobs import download_filename, request_export
+from .imports import IMPORTERS, request_import
+from .forms import ImportForm
+from .counters import get_counters, USER_TYPE_FIELDS, CONFERENCE_STATUS_FIELDS
+from .live_stats import get_stats_snapshot, iter_stats_events, supports_streaming
+from .moderation import (
+    set_users_approval, delete_users, review_conference_requests, REVIEW_DECISIONS
+)
+from .rating_summary import get_rating_summary
+from .search import search_conferences
+from .page_cache import cache_anonymous_page, get_listings_version, PAGE_CACHE_TIMEOUT, SEARCH_CACHE_ALIAS
+from .db_router import replica_reads
+from .accounts import get_user_role, role_required
+from .reference_data import (
+    SITE_SETTING_LABELS, get_categories, get_cities, get_site_settings, save_site_settings
+)
+from .registration import (
+    register_attendance, REGISTERED, ALREADY_REGISTERED, CONFERENCE_FULL, REGISTRATION_CLOSED
+)
+from .avatars import AVATAR_DIR
+from .rollups import CHART_INTERVALS, clamp_chart_range, get_time_series
+from .analytics import ANALYTICS_DIMENSIONS, MAX_GROUP_BY, get_breakdown
+from asgiref.sync import sync_to_async
 
-def home(request):
-    """الصفحة الرئيسية"""
-    conferences = Conference.objects.filter(
+HOME_SEARCH_RESULTS = 30
+
+# الفترة الافتراضية لرسم الاتجاهات في صفحة الإحصائيات (بالأشهر)
+CHART_DEFAULT_MONTHS = 12
+
+def upcoming_conferences():
+    """المؤتمرات المتاحة للتسجيل في الصفحة الرئيسية"""
+    return Conference.objects.filter(
         Q(status='approved') | Q(status='active'),
         start_date__gte=timezone.now()
-    ).order_by('start_date')[:6]
+    ).order_by('start_date')
+
+@cache_anonymous_page
+@replica_reads(anonymous_only=True)
+def home(request):
+    """الصفحة الرئيسية"""
+    available = upcoming_conferences()
+    
+    # البحث في المؤتمرات المتاحة مرتبة حسب الصلة
+    # (كسول: لا يُنفذ إذا كان جزء القائمة مخزناً)
+    query = request.GET.get('q', '').strip()
+    if query:
+        conferences = SimpleLazyObject(
+            lambda: search_conferences(available, query, limit=HOME_SEARCH_RESULTS)
+        )
+    else:
+        conferences = available[:6]
     
     context = {
         'conferences': conferences,
+        'query': query,
+        'listings_version': get_listings_version(),
+        'cache_timeout': PAGE_CACHE_TIMEOUT,
+        # جزء نتائج البحث (نسخة لكل عبارة) في ذاكرة منفصلة محدودة
+        'fragment_cache': SEARCH_CACHE_ALIAS if query else 'default',
     }
     return render(request, 'conference/list.html', context)
 
@@ -65,47 +118,87 @@ def logout_view(request):
     return redirect('login')
 
 @login_required
+@role_required('admin')
+@replica_reads
 def admin_dashboard(request):
     """لوحة تحكم المدير"""
-    # التحقق من صلاحيات المدير
-    try:
-        profile = request.user.userprofile
-        if profile.user_type != 'admin':
-            messages.error(request, 'ليس لديك صلاحية للوصول إلى هذه الصفحة')
-            return redirect('home')
-    except UserProfile.DoesNotExist:
-        messages.error(request, 'يرجى تحديث الملف الشخصي')
-        return redirect('home')
-    
     # الإحصائيات
     today = timezone.now().date()
     week_ago = today - timedelta(days=7)
     month_ago = today - timedelta(days=30)
     
+    # العدادات محسوبة مسبقاً في صف واحد (انظر counters.py)
+    counters = get_counters()
     stats = {
-        'total_users': UserProfile.objects.count(),
-        'new_users_week': UserProfile.objects.filter(created_at__date__gte=week_ago).count(),
-        'total_conferences': Conference.objects.count(),
-        'pending_conferences': Conference.objects.filter(status='pending').count(),
-        'active_conferences': Conference.objects.filter(status='active').count(),
-        'total_ratings': Rating.objects.count(),
-        'pending_requests': ConferenceRequest.objects.filter(status='pending').count(),
+        'total_users': counters.total_users,
+        'new_users_week': UserProfile.objects.filter(
+            created_at__gte=timezone.make_aware(datetime.combine(week_ago, datetime.min.time()))
+        ).count(),
+        'total_conferences': counters.total_conferences,
+        'pending_conferences': counters.pending_conferences,
+        'active_conferences': counters.active_conferences,
+        'total_ratings': counters.total_ratings,
+        'pending_requests': counters.pending_requests,
     }
     
     # آخر المؤتمرات
     recent_conferences = Conference.objects.all().order_by('-created_at')[:10]
     
     # آخر المستخدمين
-    recent_users = UserProfile.objects.all().order_by('-created_at')[:10]
+    recent_users = UserProfile.objects.select_related('user').order_by('-created_at')[:10]
     
     context = {
         'stats': stats,
         'recent_conferences': recent_conferences,
         'recent_users': recent_users,
+        # تحت WSGI تستعلم اللوحة دورياً بدلاً من فتح اتصال SSE
+        'live_stats_stream': supports_streaming(request),
     }
     
     return render(request, 'dashboard/admin_dashboard.html', context)
 
+def _is_admin_user(user):
+    """هل المستخدم مدير للنظام"""
+    if not user.is_authenticated:
+        return False
+    try:
+        return user.userprofile.user_type == 'admin'
+    except UserProfile.DoesNotExist:
+        return False
+
+@login_required
+def live_stats(request):
+    """إحصائيات لوحة التحكم (JSON) مع دعم ETag للاستعلام الدوري"""
+    if not _is_admin_user(request.user):
+        return JsonResponse({'error': 'ليس لديك صلاحية'}, status=403)
+    
+    data, etag = get_stats_snapshot()
+    etag = f'"{etag}"'
+    
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponse(status=304)
+    else:
+        response = JsonResponse(data)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+async def live_stats_stream(request):
+    """بث مباشر لإحصائيات لوحة التحكم (Server-Sent Events عبر ASGI)"""
+    if not await sync_to_async(_is_admin_user)(request.user):
+        return HttpResponse(status=403)
+    if not supports_streaming(request):
+        # 204 يوقف إعادة اتصال EventSource، والمتصفح يعود إلى الاستعلام الدوري
+        return HttpResponse(status=204)
+    
+    response = StreamingHttpResponse(
+        iter_stats_events(request.headers.get('Last-Event-ID')),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 @login_required
 def user_profile(request):
     """عرض الملف الشخصي"""
@@ -155,11 +248,9 @@ def edit_profile(request):
         messages.success(request, 'تم تحديث البيانات الشخصية بنجاح')
         return redirect('user_profile')
     
-    cities = SyrianCity.objects.all()
-    
     context = {
         'profile': profile,
-        'cities': cities,
+        'cities': get_cities(),
     }
     return render(request, 'accounts/edit_profile.html', context)
 
@@ -184,131 +275,313 @@ def change_password(request):
     }
     return render(request, 'accounts/change_password.html', context)
 
+USERS_PAGE_SIZE = 50
+
+def filter_user_profiles(profiles, params):
+    """تطبيق فلاتر قائمة المستخدمين (نوع المستخدم، المدينة، حالة التفعيل)"""
+    if params.get('user_type'):
+        profiles = profiles.filter(user_type=params['user_type'])
+    if str(params.get('city', '')).isdigit():
+        profiles = profiles.filter(city_id=params['city'])
+    if params.get('is_approved') in ('0', '1'):
+        profiles = profiles.filter(is_approved=params['is_approved'] == '1')
+    return profiles
+
+def list_user_profiles(filters):
+    """المستخدمون في صفحة الإدارة (الأحدث أولاً) بعد تطبيق الفلاتر"""
+    return filter_user_profiles(
+        UserProfile.objects.select_related('user', 'city').order_by('-created_at', '-id'),
+        filters,
+    )
+
+# الإجراءات المسموحة على جميع نتائج الفلتر (الحذف للمحددين فقط)
+FILTERED_USER_ACTIONS = ('approve', 'reject')
+
 @login_required
+@role_required('admin')
 def manage_users(request):
     """إدارة المستخدمين"""
-    # التحقق من صلاحيات المدير
-    try:
-        if request.user.userprofile.user_type != 'admin':
-            messages.error(request, 'ليس لديك صلاحية للوصول إلى هذه الصفحة')
-            return redirect('home')
-    except UserProfile.DoesNotExist:
-        messages.error(request, 'يرجى تحديث الملف الشخصي')
-        return redirect('home')
-    
-    users = UserProfile.objects.all().order_by('-created_at')
-    
     if request.method == 'POST':
-        user_id = request.POST.get('user_id')
         action = request.POST.get('action')
         
-        if user_id and action:
-            user_profile = get_object_or_404(UserProfile, id=user_id)
-            
-            if action == 'approve':
-                user_profile.is_approved = True
-                user_profile.save()
-                messages.success(request, f'تم تفعيل حساب {user_profile.user.get_full_name()}')
-            elif action == 'reject':
-                user_profile.is_approved = False
-                user_profile.save()
-                messages.warning(request, f'تم تعطيل حساب {user_profile.user.get_full_name()}')
-            elif action == 'delete':
-                user_profile.user.delete()
-                messages.success(request, f'تم حذف المستخدم بنجاح')
+        if request.POST.get('scope') == 'filtered':
+            # جميع المستخدمين المطابقين للفلاتر الحالية: للتفعيل/التعطيل فقط،
+            # ويجب تحديد فلتر واحد على الأقل حتى لا يشمل الإجراء كل الحسابات
+            targets = filter_user_profiles(UserProfile.objects.all(), request.POST)
+            if action not in FILTERED_USER_ACTIONS or not targets.query.where:
+                messages.error(request, 'يجب تحديد فلتر واحد على الأقل، والحذف الجماعي متاح للمحددين فقط')
+                return redirect(request.get_full_path())
+        else:
+            # المستخدمون المحددون (أو مستخدم واحد من زر الصف)
+            ids = request.POST.getlist('user_ids') or [request.POST.get('user_id', '')]
+            targets = UserProfile.objects.filter(id__in=[i for i in ids if i.isdigit()])
+        
+        if action == 'approve':
+            changed = set_users_approval(targets, True)
+            messages.success(request, f'تم تفعيل {changed} حساب')
+        elif action == 'reject':
+            changed = set_users_approval(targets, False)
+            messages.warning(request, f'تم تعطيل {changed} حساب')
+        elif action == 'delete':
+            deleted, skipped = delete_users(targets, request.user)
+            if deleted:
+                messages.success(request, f'تم حذف {deleted} مستخدم بنجاح')
+            if skipped:
+                messages.error(request, f'لم يُحذف {skipped} حساب: لا يمكن حذف حسابك أو حسابات المدراء')
+            elif not deleted:
+                messages.warning(request, 'لم يُحذف أي مستخدم')
+        
+        return redirect(request.get_full_path())
+    
+    filters = {
+        'user_type': request.GET.get('user_type', ''),
+        'city': request.GET.get('city', ''),
+        'is_approved': request.GET.get('is_approved', ''),
+    }
+    users = list_user_profiles(filters)
+    page = Paginator(users, USERS_PAGE_SIZE).get_page(request.GET.get('page'))
+    
+    params = request.GET.copy()
+    params.pop('page', None)
     
     context = {
-        'users': users,
+        'users': page,
+        'page_obj': page,
+        'filters': filters,
+        'filter_query': params.urlencode(),
+        'user_types': UserProfile.USER_TYPES,
+        'cities': get_cities(),
     }
     return render(request, 'accounts/users_list.html', context)
 
+CONFERENCES_PAGE_SIZE = 25
+
+def encode_conference_cursor(conference):
+    """مؤشر الصفحة التالية: (created_at, id) لآخر مؤتمر معروض"""
+    raw = f"{conference.created_at.isoformat()}|{conference.id}"
+    return urlsafe_base64_encode(raw.encode('utf-8'))
+
+def decode_conference_cursor(value):
+    """فك المؤشر، أو None إذا كان غير صالح"""
+    if not value:
+        return None
+    try:
+        created_at, conference_id = urlsafe_base64_decode(value).decode('utf-8').split('|')
+        return datetime.fromisoformat(created_at), int(conference_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+def filter_conferences(filters, cursor=None):
+    """مؤتمرات القائمة (الأحدث أولاً) بعد الفلاتر، بدءاً من المؤشر إن وُجد"""
+    conferences = (
+        Conference.objects
+        .select_related('organizer__user', 'rating_summary')
+        .order_by('-created_at', '-id')
+    )
+    if filters['status']:
+        conferences = conferences.filter(status=filters['status'])
+    if filters['category'].isdigit():
+        conferences = conferences.filter(category_id=filters['category'])
+    if filters['city'].isdigit():
+        conferences = conferences.filter(city_id=filters['city'])
+    
+    # الصفحة التالية تبدأ بعد آخر مؤتمر في الصفحة السابقة
+    if cursor:
+        created_at, conference_id = cursor
+        conferences = conferences.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=conference_id)
+        )
+    return conferences
+
 @login_required
 def conferences_list(request):
-    """قائمة المؤتمرات"""
-    conferences = Conference.objects.all().order_by('-created_at')
+    """قائمة المؤتمرات (ترقيم بالمؤشر على created_at و id)"""
+    # الفلاتر
+    filters = {
+        'q': request.GET.get('q', '').strip(),
+        'status': request.GET.get('status', ''),
+        'category': request.GET.get('category', ''),
+        'city': request.GET.get('city', ''),
+    }
+    
+    # نتائج البحث مرتبة حسب الصلة في صفحة واحدة، دون مؤشر
+    cursor = None if filters['q'] else decode_conference_cursor(request.GET.get('after', ''))
+    conferences = filter_conferences(filters, cursor)
+    if filters['q']:
+        conferences = search_conferences(conferences, filters['q'], limit=CONFERENCES_PAGE_SIZE)
+    
+    page = list(conferences[:CONFERENCES_PAGE_SIZE + 1])
+    next_url = None
+    if len(page) > CONFERENCES_PAGE_SIZE:
+        page = page[:CONFERENCES_PAGE_SIZE]
+        params = request.GET.copy()
+        params['after'] = encode_conference_cursor(page[-1])
+        next_url = f'?{params.urlencode()}'
+    
+    first_url = None
+    if cursor:
+        params = request.GET.copy()
+        params.pop('after')
+        first_url = f'?{params.urlencode()}'
     
     context = {
-        'conferences': conferences,
+        'conferences': page,
+        'filters': filters,
+        'status_choices': Conference.STATUS_CHOICES,
+        'categories': get_categories(),
+        'cities': get_cities(),
+        'next_url': next_url,
+        'first_url': first_url,
+        'is_admin': _is_admin_user(request.user),
     }
     return render(request, 'conference/conferences_list.html', context)
 
+def pending_conference_requests():
+    """طلبات المؤتمرات بانتظار المراجعة (الأحدث أولاً)"""
+    return (
+        ConferenceRequest.objects
+        .filter(status='pending')
+        .select_related('conference', 'requested_by__user')
+        .order_by('-created_at')
+    )
+
 @login_required
+@role_required('admin')
 def manage_conference_requests(request):
     """إدارة طلبات المؤتمرات"""
-    # التحقق من صلاحيات المدير
-    try:
-        if request.user.userprofile.user_type != 'admin':
-            messages.error(request, 'ليس لديك صلاحية للوصول إلى هذه الصفحة')
-            return redirect('home')
-    except UserProfile.DoesNotExist:
-        messages.error(request, 'يرجى تحديث الملف الشخصي')
-        return redirect('home')
-    
-    requests = ConferenceRequest.objects.filter(status='pending').order_by('-created_at')
-    
     if request.method == 'POST':
-        request_id = request.POST.get('request_id')
         action = request.POST.get('action')
+        # الطلبات المحددة، أو طلب واحد من زر الصف
+        ids = request.POST.getlist('request_ids') or [request.POST.get('request_id', '')]
+        ids = [int(i) for i in ids if i.isdigit()]
         
-        if request_id and action:
-            conf_request = get_object_or_404(ConferenceRequest, id=request_id)
+        if ids and action in REVIEW_DECISIONS:
+            processed = review_conference_requests(ids, action, request.user)
+            skipped = len(ids) - len(processed)
             
-            if action == 'approve':
-                conf_request.status = 'approved'
-                conf_request.reviewed_by = request.user
-                conf_request.reviewed_at = timezone.now()
-                conf_request.save()
-                
-                # تحديث حالة المؤتمر
-                conf_request.conference.status = 'approved'
-                conf_request.conference.save()
-                
-                messages.success(request, 'تم الموافقة على الطلب')
-            elif action == 'reject':
-                conf_request.status = 'rejected'
-                conf_request.reviewed_by = request.user
-                conf_request.reviewed_at = timezone.now()
-                conf_request.save()
-                
-                # تحديث حالة المؤتمر
-                conf_request.conference.status = 'rejected'
-                conf_request.conference.save()
-                
-                messages.warning(request, 'تم رفض الطلب')
+            if processed and action == 'approve':
+                messages.success(request, f'تمت الموافقة على {len(processed)} طلب')
+            elif processed:
+                messages.warning(request, f'تم رفض {len(processed)} طلب')
+            if skipped:
+                messages.info(request, f'تم تخطي {skipped} طلب سبقت مراجعته')
+        
+        return redirect('conference_requests')
     
     context = {
-        'pending_requests': requests,
+        'pending_requests': pending_conference_requests(),
     }
     return render(request, 'conference/requests.html', context)
 
+@login_required
+@require_POST
+def review_requests_api(request):
+    """واجهة API لمراجعة مجموعة طلبات دفعة واحدة
+
+    الجسم: {"request_ids": [1, 2, 3], "action": "approve" | "reject"}
+    """
+    if not _is_admin_user(request.user):
+        return JsonResponse({'error': 'ليس لديك صلاحية'}, status=403)
+    
+    try:
+        payload = json.loads(request.body)
+        ids = [int(i) for i in payload.get('request_ids', [])]
+        action = payload.get('action')
+    except (ValueError, TypeError, AttributeError):
+        return JsonResponse({'error': 'بيانات الطلب غير صالحة'}, status=400)
+    
+    if action not in REVIEW_DECISIONS:
+        return JsonResponse({'error': 'الإجراء غير صالح'}, status=400)
+    
+    processed = review_conference_requests(ids, action, request.user)
+    processed_set = set(processed)
+    return JsonResponse({
+        'processed': processed,
+        'skipped': [i for i in ids if i not in processed_set],
+    })
+
+RATINGS_PAGE_SIZE = 20
+
+def conference_ratings_queryset(conference_id):
+    """تقييمات مؤتمر (الأحدث أولاً) مع أصحابها"""
+    return (
+        Rating.objects
+        .filter(conference_id=conference_id)
+        .select_related('user__user')
+        .order_by('-created_at', '-id')
+    )
+
 @login_required
 def conference_ratings(request, conference_id):
     """عرض تقييمات مؤتمر"""
-    conference = get_object_or_404(Conference, id=conference_id)
-    ratings = Rating.objects.filter(conference=conference).order_by('-created_at')
+    conference = get_object_or_404(Conference.objects.select_related('rating_summary'), id=conference_id)
     
-    # متوسط التقييم
-    avg_rating = ratings.aggregate(avg=Avg('rating'))['avg'] or 0
+    # الملخص محسوب مسبقاً، فلا حاجة لاستعلام تجميع أو عدّ
+    summary = get_rating_summary(conference)
+    
+    paginator = Paginator(conference_ratings_queryset(conference.id), RATINGS_PAGE_SIZE)
+    # العدد معروف من الملخص، فلا حاجة لاستعلام COUNT
+    paginator.count = summary.rating_count
+    page = paginator.get_page(request.GET.get('page'))
     
     context = {
         'conference': conference,
-        'ratings': ratings,
-        'avg_rating': round(avg_rating, 1),
+        'ratings': page,
+        'summary': summary,
+        'avg_rating': summary.average,
     }
     return render(request, 'conference/ratings.html', context)
 
+REGISTRATION_MESSAGES = {
+    REGISTERED: 'تم تسجيلك في المؤتمر بنجاح',
+    ALREADY_REGISTERED: 'أنت مسجل في هذا المؤتمر مسبقاً',
+    CONFERENCE_FULL: 'عذراً، اكتمل عدد المشاركين في هذا المؤتمر',
+    REGISTRATION_CLOSED: 'التسجيل غير متاح لهذا المؤتمر',
+}
+
+REGISTRATION_STATUS_CODES = {
+    REGISTERED: 201,
+    ALREADY_REGISTERED: 200,
+    CONFERENCE_FULL: 409,
+    REGISTRATION_CLOSED: 403,
+}
+
 @login_required
-def manage_categories(request):
-    """إدارة التصنيفات (إضافة، تعديل، حذف)"""
-    # التحقق من صلاحيات المدير
+@require_POST
+def register_for_conference(request, conference_id):
+    """التسجيل في مؤتمر"""
+    try:
+        profile = request.user.userprofile
+    except UserProfile.DoesNotExist:
+        messages.error(request, 'يجب إكمال الملف الشخصي أولاً')
+        return redirect('conferences_list')
+    
+    result = register_attendance(conference_id, profile)
+    if result == REGISTERED:
+        messages.success(request, REGISTRATION_MESSAGES[result])
+    else:
+        messages.warning(request, REGISTRATION_MESSAGES[result])
+    return redirect('conference_ratings', conference_id=conference_id)
+
+@login_required
+@require_POST
+def register_for_conference_api(request, conference_id):
+    """واجهة API للتسجيل في مؤتمر"""
     try:
-        if request.user.userprofile.user_type != 'admin':
-            messages.error(request, 'ليس لديك صلاحية للوصول إلى هذه الصفحة')
-            return redirect('home')
+        profile = request.user.userprofile
     except UserProfile.DoesNotExist:
-        messages.error(request, 'يرجى تحديث الملف الشخصي')
-        return redirect('home')
+        return JsonResponse({'error': 'يجب إكمال الملف الشخصي أولاً'}, status=403)
     
+    result = register_attendance(conference_id, profile)
+    return JsonResponse(
+        {'status': result, 'message': REGISTRATION_MESSAGES[result]},
+        status=REGISTRATION_STATUS_CODES[result],
+    )
+
+@login_required
+@role_required('admin')
+def manage_categories(request):
+    """إدارة التصنيفات (إضافة، تعديل، حذف)"""
     categories = Category.objects.all().order_by('-created_at')
     
     if request.method == 'POST':
@@ -350,53 +623,78 @@ def manage_categories(request):
     }
     return render(request, 'categories/list.html', context)
 
+def _parse_date(value, default):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return default
+
 @login_required
+@role_required('admin')
+@replica_reads
 def platform_statistics(request):
     """إحصائيات شاملة عن عمل المنصة"""
-    # التحقق من صلاحيات المدير
-    try:
-        if request.user.userprofile.user_type != 'admin':
-            messages.error(request, 'ليس لديك صلاحية للوصول إلى هذه الصفحة')
-            return redirect('home')
-    except UserProfile.DoesNotExist:
-        messages.error(request, 'يرجى تحديث الملف الشخصي')
-        return redirect('home')
+    counters = get_counters()
     
     # الإحصائيات العامة
     total_stats = {
-        'total_users': UserProfile.objects.count(),
-        'total_conferences': Conference.objects.count(),
-        'total_ratings': Rating.objects.count(),
-        'total_attendances': Attendance.objects.count(),
+        'total_users': counters.total_users,
+        'total_conferences': counters.total_conferences,
+        'total_ratings': counters.total_ratings,
+        'total_attendances': counters.total_attendances,
     }
     
     # إحصائيات المستخدمين (للجدول)
-    user_stats_query = UserProfile.objects.values('user_type').annotate(
-        count=Count('id'),
-        approved=Count('id', filter=Q(is_approved=True))
-    )
+    user_stats_query = [
+        {'user_type': user_type, 'count': getattr(counters, field)}
+        for user_type, field in USER_TYPE_FIELDS.items()
+        if getattr(counters, field)
+    ]
     
     # تجهيز بيانات المستخدمين للرسم البياني (JSON)
     user_data_list = [{'user_type': s['user_type'], 'count': s['count']} for s in user_stats_query]
     
     # إحصائيات المؤتمرات
-    conference_stats = Conference.objects.values('status').annotate(
-        count=Count('id')
-    )
-    
-    # المؤتمرات حسب الشهر (JSON) للسنة الحالية
-    monthly_query = Conference.objects.filter(
-        created_at__year=timezone.now().year
-    ).annotate(month=ExtractMonth('created_at')).values('month').annotate(
-        count=Count('id')
-    ).order_by('month')
-    
-    monthly_data_list = [{'month': m['month'], 'count': m['count']} for m in monthly_query]
+    conference_stats = [
+        {'status': status, 'count': getattr(counters, field)}
+        for status, field in CONFERENCE_STATUS_FIELDS.items()
+        if getattr(counters, field)
+    ]
+    
+    # السلاسل الزمنية من جداول الإحصاءات اليومية لأي فترة (لا مسح للجداول الأصلية)
+    today = timezone.localdate()
+    year, month = divmod(today.year * 12 + today.month - CHART_DEFAULT_MONTHS, 12)
+    default_start = today.replace(year=year, month=month + 1, day=1)
+    chart_start = _parse_date(request.GET.get('start'), default_start)
+    chart_end = _parse_date(request.GET.get('end'), today)
+    if chart_start > chart_end:
+        chart_start, chart_end = chart_end, chart_start
+    chart_start, chart_end = clamp_chart_range(chart_start, chart_end)
+    interval = request.GET.get('interval', 'month')
+    if interval not in CHART_INTERVALS:
+        interval = 'month'
+    dimensions = {}
+    for key in ('category_id', 'city_id'):
+        value = request.GET.get(key.replace('_id', ''))
+        if value and value.isdigit():
+            dimensions[key] = int(value)
+    
+    trend = get_time_series(chart_start, chart_end, interval, **dimensions)
+    metric_labels = dict(DailyStat.METRIC_CHOICES)
+    trend_data = {
+        'interval': trend['interval'],
+        'labels': trend['labels'],
+        'datasets': [
+            {'metric': metric, 'label': metric_labels[metric], 'data': values}
+            for metric, values in trend['series'].items()
+        ],
+        'average_rating': trend['average_rating'],
+    }
     
     # إحصاءات الحضور
     attendance_stats = {
-        'total_registered': Attendance.objects.count(),
-        'total_attended': Attendance.objects.filter(attended=True).count(),
+        'total_registered': counters.total_attendances,
+        'total_attended': counters.total_attended,
         'attendance_rate': 0
     }
     
@@ -411,167 +709,93 @@ def platform_statistics(request):
         'conference_stats': conference_stats,
         'attendance_stats': attendance_stats,
         # هذه المتغيرات ضرورية جداً لعمل الرسم البياني في القالب
-        'monthly_data_json': json.dumps(monthly_data_list),
+        'trend_data_json': json.dumps(trend_data),
+        'chart_start': chart_start,
+        'chart_end': chart_end,
+        'chart_interval': trend['interval'],
+        'chart_filters': dimensions,
+        'categories': get_categories(),
+        'cities': get_cities(),
         'user_data_json': json.dumps(user_data_list),
     }
     return render(request, 'dashboard/stats.html', context)
 
-# ====== دوال التصدير ======
+@login_required
+@replica_reads
+def analytics_api(request):
+    """تحليلات مجمعة (JSON): نسبة الحضور ومتوسط التقييم ونسبة الامتلاء حسب بعد أو بعدين
 
-def get_user_type_arabic(user_type):
-    """تحويل نوع المستخدم إلى عربي"""
-    user_type_map = {
-        'admin': 'مدير النظام',
-        'organizer': 'منظم المؤتمر',
-        'speaker': 'متحدث',
-        'attendee': 'مشارك',
-    }
-    return user_type_map.get(user_type, user_type)
-
-def get_status_arabic(status):
-    """تحويل حالة المؤتمر إلى عربي"""
-    status_map = {
-        'pending': 'قيد الانتظار',
-        'approved': 'مقبول',
-        'rejected': 'مرفوض',
-        'active': 'نشط',
-        'completed': 'منتهي',
-        'cancelled': 'ملغي',
-    }
-    return status_map.get(status, status)
-
-def export_users_report_data():
-    """جلب بيانات تقرير المستخدمين"""
-    users_data = []
-    for profile in UserProfile.objects.select_related('user', 'city').all():
-        users_data.append({
-            'اسم المستخدم': profile.user.username,
-            'الاسم الأول': profile.user.first_name or '',
-            'الاسم الأخير': profile.user.last_name or '',
-            'الاسم الكامل': f"{profile.user.first_name or ''} {profile.user.last_name or ''}".strip(),
-            'البريد الإلكتروني': profile.user.email or '',
-            'نوع المستخدم': get_user_type_arabic(profile.user_type),
-            'رقم الهاتف': profile.phone or '',
-            'المدينة': profile.city.name if profile.city else '',
-            'المحافظة': profile.city.governorate if profile.city else '',
-            'مفعل': 'نعم' if profile.is_approved else 'لا',
-            'تاريخ التسجيل': profile.created_at.replace(tzinfo=None) if profile.created_at else '',
-        })
-    
-    return pd.DataFrame(users_data)
-
-def export_conferences_report_data():
-    """جلب بيانات تقرير المؤتمرات"""
-    conferences_data = []
-    for conference in Conference.objects.select_related('organizer__user', 'category', 'city').all():
-        conferences_data.append({
-            'عنوان المؤتمر': conference.title,
-            'وصف المؤتمر': conference.description[:100] + '...' if conference.description else '',
-            'اسم المنظم': conference.organizer.user.username if conference.organizer else '',
-            'الاسم الكامل للمنظم': f"{conference.organizer.user.first_name or ''} {conference.organizer.user.last_name or ''}".strip(),
-            'التصنيف': conference.category.name if conference.category else '',
-            'تاريخ البدء': conference.start_date.replace(tzinfo=None) if conference.start_date else '',
-            'تاريخ الانتهاء': conference.end_date.replace(tzinfo=None) if conference.end_date else '',
-            'المكان': conference.location,
-            'المدينة': conference.city.name if conference.city else '',
-            'الحالة': get_status_arabic(conference.status),
-            'الحد الأقصى': conference.max_attendees,
-            'عدد المشاركين الحالي': conference.current_attendees,
-            'مميز': 'نعم' if conference.is_featured else 'لا',
-            'تاريخ الإنشاء': conference.created_at.replace(tzinfo=None) if conference.created_at else '',
-        })
-    
-    return pd.DataFrame(conferences_data)
-
-def export_ratings_report_data():
-    """جلب بيانات تقرير التقييمات"""
-    ratings_data = []
-    for rating in Rating.objects.select_related('conference', 'user__user').all():
-        ratings_data.append({
-            'عنوان المؤتمر': rating.conference.title,
-            'اسم المستخدم': rating.user.user.username,
-            'الاسم الكامل': f"{rating.user.user.first_name or ''} {rating.user.user.last_name or ''}".strip(),
-            'التقييم': rating.rating,
-            'النجوم': '★' * rating.rating + '☆' * (5 - rating.rating),
-            'التعليق': rating.comment or '',
-            'تاريخ التقييم': rating.created_at.replace(tzinfo=None) if rating.created_at else '',
-        })
-    
-    return pd.DataFrame(ratings_data)
-
-def export_to_excel(df, filename):
-    """تصدير DataFrame إلى Excel"""
-    output = BytesIO()
-    
-    # استخدام ExcelWriter مع openpyxl
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='تقرير')
-        
-        # تحسين عرض الأعمدة
-        worksheet = writer.sheets['تقرير']
-        for column in df:
-            column_width = max(df[column].astype(str).map(len).max(), len(column)) + 2
-            col_idx = df.columns.get_loc(column)
-            worksheet.column_dimensions[chr(65 + col_idx)].width = min(column_width, 50)
-    
-    output.seek(0)
-    
-    response = HttpResponse(
-        output.read(),
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    المعاملات: group_by (category, city, governorate, organizer, month مفصولة بفاصلة)،
+    وstatus، وstart/end لتاريخ بدء المؤتمر (YYYY-MM-DD).
+    """
+    role = get_user_role(request)
+    if role is None:
+        return JsonResponse({'error': 'يرجى تحديث الملف الشخصي'}, status=403)
+    if role != 'admin':
+        return JsonResponse({'error': 'ليس لديك صلاحية'}, status=403)
+    
+    group_by = [name for name in request.GET.get('group_by', 'category').split(',') if name]
+    valid = (
+        0 < len(group_by) <= MAX_GROUP_BY
+        and len(set(group_by)) == len(group_by)
+        and all(name in ANALYTICS_DIMENSIONS for name in group_by)
     )
-    response['Content-Disposition'] = f'attachment; filename="{filename}.xlsx"'
-    
-    return response
+    if not valid:
+        return JsonResponse({
+            'error': 'أبعاد التجميع غير صالحة',
+            'dimensions': ANALYTICS_DIMENSIONS,
+        }, status=400)
+    
+    status = request.GET.get('status') or None
+    if status is not None and status not in dict(Conference.STATUS_CHOICES):
+        return JsonResponse({'error': 'حالة المؤتمر غير صالحة'}, status=400)
+    
+    return JsonResponse(get_breakdown(
+        group_by,
+        status=status,
+        start=_parse_date(request.GET.get('start'), None),
+        end=_parse_date(request.GET.get('end'), None),
+    ))
 
-def export_to_csv(df, filename):
-    """تصدير DataFrame إلى CSV"""
-    response = HttpResponse(content_type='text/csv; charset=utf-8-sig')
-    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
-    
-    df.to_csv(response, index=False, encoding='utf-8-sig')
-    
-    return response
+# ====== دوال التصدير ======
 
 @login_required
+@role_required('admin')
+@replica_reads
 def export_reports(request):
     """تصدير التقارير"""
-    # التحقق من صلاحيات المدير
-    try:
-        if request.user.userprofile.user_type != 'admin':
-            messages.error(request, 'ليس لديك صلاحية للوصول إلى هذه الصفحة')
-            return redirect('home')
-    except UserProfile.DoesNotExist:
-        messages.error(request, 'يرجى تحديث الملف الشخصي')
-        return redirect('home')
-    
     if request.method == 'GET' and 'type' in request.GET:
         report_type = request.GET.get('type', 'users')
         format_type = request.GET.get('format', 'excel')
         
-        try:
-            if report_type == 'users':
-                df = export_users_report_data()
-                filename = f"تقرير_المستخدمين_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}"
-                
-            elif report_type == 'conferences':
-                df = export_conferences_report_data()
-                filename = f"تقرير_المؤتمرات_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}"
-                
-            elif report_type == 'ratings':
-                df = export_ratings_report_data()
-                filename = f"تقرير_التقييمات_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}"
-                
-            else:
-                messages.error(request, 'نوع التقرير غير صالح')
+        if report_type not in REPORTS:
+            messages.error(request, 'نوع التقرير غير صالح')
+            return redirect('export_reports')
+        
+        # التصدير في الخلفية: ينفذه العامل run_export_worker ويُحفظ الملف للتحميل لاحقاً
+        if request.GET.get('mode') == 'background':
+            if format_type not in dict(ExportJob.FORMAT_CHOICES):
+                messages.error(request, 'تنسيق التصدير غير صالح')
                 return redirect('export_reports')
             
+            job, created = request_export(request.user, report_type, format_type)
+            if created:
+                messages.success(request, 'تمت إضافة التقرير إلى قائمة التصدير في الخلفية')
+            else:
+                messages.info(request, 'يوجد تقرير حديث بنفس المواصفات، تم استخدامه بدلاً من إنشاء تقرير جديد')
+            return redirect('export_reports')
+        
+        iter_rows, columns, filename_prefix = REPORTS[report_type]
+        filename = f"{filename_prefix}_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}"
+        
+        try:
             # تصدير حسب النوع المطلوب
             if format_type == 'excel':
-                return export_to_excel(df, filename)
+                return export_to_excel_stream(iter_rows(), columns, filename)
                 
             elif format_type == 'csv':
-                return export_to_csv(df, filename)
+                # تصدير متدفق: الصفوف تُجلب وتُرسل على دفعات
+                return export_to_csv_stream(iter_rows(), columns, filename)
                 
             else:
                 messages.error(request, 'تنسيق التصدير غير صالح')
@@ -584,50 +808,151 @@ def export_reports(request):
             return redirect('export_reports')
     
     # إذا كان طلب GET بدون معاملات، عرض صفحة التصدير
+    counters = get_counters()
     context = {
-        'total_users': UserProfile.objects.count(),
-        'total_conferences': Conference.objects.count(),
-        'total_ratings': Rating.objects.count(),
+        'total_users': counters.total_users,
+        'total_conferences': counters.total_conferences,
+        'total_ratings': counters.total_ratings,
+        'export_jobs': ExportJob.objects.select_related('requested_by').order_by('-created_at')[:10],
     }
     
     return render(request, 'reports/export.html', context)
 
 @login_required
-def system_settings(request):
-    """إدارة إعدادات النظام للحقول الأربعة المحددة فقط"""
-    try:
-        if request.user.userprofile.user_type != 'admin':
-            messages.error(request, 'ليس لديك صلاحية للوصول إلى هذه الصفحة')
-            return redirect('home')
-    except UserProfile.DoesNotExist:
-        messages.error(request, 'يرجى تحديث الملف الشخصي')
-        return redirect('home')
-
-    # تعريف المفاتيح المطلوبة
-    required_settings = {
-        'site_name': 'اسم المنصة',
-        'site_description': 'وصف المنصة',
-        'contact_email': 'بريد التواصل',
-        'contact_phone': 'رقم التواصل'
+def export_job_status(request, job_id):
+    """حالة مهمة التصدير (للاستعلام الدوري من صفحة التصدير)"""
+    role = get_user_role(request)
+    if role is None:
+        return JsonResponse({'error': 'يرجى تحديث الملف الشخصي'}, status=403)
+    if role != 'admin':
+        return JsonResponse({'error': 'ليس لديك صلاحية'}, status=403)
+    
+    job = get_object_or_404(ExportJob, id=job_id)
+    
+    return JsonResponse({
+        'id': job.id,
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'progress': job.progress,
+        'processed_rows': job.processed_rows,
+        'total_rows': job.total_rows,
+        'download_url': reverse('export_job_download', args=[job.id]) if job.is_downloadable else None,
+    })
+
+@login_required
+@role_required('admin')
+def export_job_download(request, job_id):
+    """تحميل ملف تقرير جاهز"""
+    job = get_object_or_404(ExportJob, id=job_id)
+    if not job.is_downloadable:
+        messages.error(request, 'التقرير غير متوفر أو انتهت صلاحيته')
+        return redirect('export_reports')
+    
+    return FileResponse(
+        job.file.open('rb'),
+        as_attachment=True,
+        filename=download_filename(job),
+    )
+
+# ====== دوال الاستيراد ======
+
+@login_required
+@role_required('admin')
+def import_data(request):
+    """استيراد المستخدمين والمؤتمرات والحضور من ملفات CSV/XLSX (يُنفذ في الخلفية)"""
+    if request.method == 'POST':
+        form = ImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            request_import(
+                request.user,
+                form.cleaned_data['kind'],
+                form.cleaned_data['file'],
+                form.cleaned_data['dry_run'],
+            )
+            messages.success(request, 'تم رفع الملف وسيستورده عامل الاستيراد في الخلفية، تابع حالته في الجدول أدناه')
+            return redirect('import_data')
+    else:
+        form = ImportForm()
+    
+    # الأعمدة المقبولة لكل نوع (الاسم الإنجليزي أو عنوان العمود في ملفات التصدير)
+    import_columns = [
+        (label, [
+            (names[0], names[1], field in IMPORTERS[kind].required)
+            for field, names in IMPORTERS[kind].columns.items()
+        ])
+        for kind, label in ImportJob.KIND_CHOICES
+    ]
+    context = {
+        'form': form,
+        'import_columns': import_columns,
+        'import_jobs': ImportJob.objects.select_related('requested_by').order_by('-created_at')[:10],
     }
+    return render(request, 'reports/import.html', context)
+
+@login_required
+def import_job_status(request, job_id):
+    """حالة مهمة الاستيراد (للاستعلام الدوري من صفحة الاستيراد)"""
+    role = get_user_role(request)
+    if role is None:
+        return JsonResponse({'error': 'يرجى تحديث الملف الشخصي'}, status=403)
+    if role != 'admin':
+        return JsonResponse({'error': 'ليس لديك صلاحية'}, status=403)
+    
+    job = get_object_or_404(ImportJob, id=job_id)
+    
+    return JsonResponse({
+        'id': job.id,
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'processed_rows': job.processed_rows,
+        'created_rows': job.created_rows,
+        'error_rows': job.error_rows,
+        'error': job.error,
+        'report_url': reverse('import_job_report', args=[job.id]) if job.report else None,
+    })
 
+@login_required
+@role_required('admin')
+def import_job_report(request, job_id):
+    """تحميل تقرير أخطاء الصفوف لمهمة استيراد"""
+    job = get_object_or_404(ImportJob, id=job_id)
+    if not job.report:
+        messages.error(request, 'لا يوجد تقرير أخطاء لهذه المهمة')
+        return redirect('import_data')
+    
+    return FileResponse(
+        job.report.open('rb'),
+        as_attachment=True,
+        filename=f'import_{job.id}_errors.csv',
+    )
+
+@login_required
+@role_required('admin')
+def system_settings(request):
+    """إدارة إعدادات النظام للحقول الأربعة المحددة فقط"""
     if request.method == 'POST':
-        for key in required_settings.keys():
-            value = request.POST.get(key, '')
-            setting, created = SystemSetting.objects.get_or_create(key=key)
-            setting.value = value
-            setting.description = required_settings[key]
-            setting.updated_by = request.user
-            setting.save()
-        
+        # جميع المفاتيح بإدخال/تحديث جماعي واحد
+        save_site_settings(request.POST, request.user)
         messages.success(request, 'تم حفظ إعدادات النظام بنجاح')
         return redirect('system_settings')
 
-    # جلب الإعدادات الحالية لعرضها في القالب
-    settings_data = {s.key: s.value for s in SystemSetting.objects.filter(key__in=required_settings.keys())}
-    
+    # الإعدادات الحالية من ذاكرة البيانات المرجعية
     context = {
-        'settings': settings_data,
-        'labels': required_settings
+        'settings': get_site_settings(),
+        'labels': SITE_SETTING_LABELS
     }
-    return render(request, 'dashboard/settings.html', context)
\ No newline at end of file
+    return render(request, 'dashboard/settings.html', context)
+
+def avatar_file(request, path):
+    """النسخ المصغرة للصور الشخصية مع ترويسات تخزين لمدة سنة
+
+    اسم كل نسخة مشتق من اسم الصورة الأصلية فلا يتغير محتواه أبداً. عند خدمة
+    media من خادم الويب مباشرة يجب ضبط الترويسة نفسها هناك.
+    """
+    # أسماء النسخ بلا مجلدات فرعية: لا يُقبل إلا اسم ملف داخل مجلد النسخ
+    name = f'{AVATAR_DIR}/{path}'
+    if '/' in path or path.startswith('.') or not default_storage.exists(name):
+        raise Http404('الصورة غير موجودة')
+    response = FileResponse(default_storage.open(name, 'rb'))
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response